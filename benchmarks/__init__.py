@@ -0,0 +1,6 @@
+""" Benchmarks de desempenho do dashboard da Curry Company.
+
+    Execute a partir da raiz do repositório, por exemplo:
+
+        python -m benchmarks.bench_clean_code
+"""
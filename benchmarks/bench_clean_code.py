@@ -0,0 +1,85 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import pandas as pd
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.data import clean_code
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def clean_code_legacy( df1 ):
+    """ Versão original de clean_code ( cinco cópias e um lambda por linha ),
+        mantida aqui apenas como referência para o benchmark.
+
+        Input: Dataframe
+        Output: Dataframe
+    """
+    linhas_selecionadas = df1['Delivery_person_Age'] != 'NaN '
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype('int64')
+
+    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype( float )
+
+    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format='%d-%m-%Y' )
+
+    linhas_selecionadas = df1['multiple_deliveries'] != 'NaN '
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype('int64')
+
+    linhas_selecionadas = df1['Road_traffic_density'] != 'NaN '
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+
+    linhas_selecionadas = df1['Weatherconditions'] != 'NaN '
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+
+    linhas_selecionadas = df1['City'] != 'NaN '
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+
+    linhas_selecionadas = df1['Festival'] != 'NaN '
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+
+    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip()
+    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip()
+    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
+    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
+    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
+    df1.loc[:, 'Delivery_person_ID'] = df1.loc[:, 'Delivery_person_ID'].str.strip()
+    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
+
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply( lambda x: x.split( '(min) ' )[1])
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype('int64')
+
+    return df1
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara o clean_code original com a versão vetorizada.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 1_000_000, 10_000_000 ] )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    df = read_raw()
+
+    print( f"{'linhas':>12} {'original (s)':>14} {'vetorizado (s)':>16} {'speedup':>9}" )
+
+    for n_rows in args.sizes:
+        df_raw = scale_raw( df, n_rows )
+
+        t_legacy, df_legacy = timeit( clean_code_legacy, df_raw, repeat=args.repeat )
+        t_new, df_new = timeit( clean_code, df_raw, repeat=args.repeat )
+
+        # As duas versões precisam produzir exatamente o mesmo dataframe
+        pd.testing.assert_frame_equal( df_legacy, df_new )
+
+        print( f'{n_rows:>12,} {t_legacy:>14.3f} {t_new:>16.3f} {t_legacy / t_new:>8.1f}x' )
+
+        del df_raw, df_legacy, df_new
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import folium
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.data import clean_code
+from utils.geomap import build_country_map, render_map_html
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def markers_map_html( df1 ):
+    """ Referência: um folium.Marker por entrega, adicionado linha a linha com iterrows.
+
+        Input: Dataframe
+        Output: String com o HTML do mapa
+    """
+    map = folium.Map()
+
+    for index, location_info in df1.iterrows():
+        folium.Marker( [location_info['Delivery_location_latitude'],
+                        location_info['Delivery_location_longitude']] ).add_to( map )
+
+    return render_map_html( map )
+
+# ================================================================================
+
+def heatmap_html( df1 ):
+    """ Mapa de calor sobre as células + medianas, como exibido na página.
+
+        Input: Dataframe
+        Output: String com o HTML do mapa
+    """
+    return render_map_html( build_country_map( df1 ) )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Mede tempo e tamanho do HTML do mapa de entregas.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 500_000, 2_000_000 ] )
+    parser.add_argument( '--marker-limit', type=int, default=20_000,
+                         help='Maior tamanho medido com um marcador por entrega ( lento )' )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    df = clean_code( read_raw() )
+
+    print( f"{'entregas':>12} {'marcadores (s)':>15} {'HTML (MB)':>10} {'calor (s)':>10} {'HTML (MB)':>10}" )
+
+    for n_rows in args.sizes:
+        df1 = scale_raw( df, n_rows )
+
+        if n_rows <= args.marker_limit:
+            t_markers, html_markers = timeit( markers_map_html, df1, repeat=1 )
+            markers = f'{t_markers:>15.2f} {len( html_markers ) / 1e6:>10.1f}'
+        else:
+            markers = f"{'-':>15} {'-':>10}"
+
+        t_heat, html_heat = timeit( heatmap_html, df1, repeat=args.repeat )
+
+        print( f'{n_rows:>12,} {markers} {t_heat:>10.2f} {len( html_heat ) / 1e6:>10.2f}' )
+
+
+if __name__ == '__main__':
+    main()
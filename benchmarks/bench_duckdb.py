@@ -0,0 +1,156 @@
+# Libraries
+import argparse
+import json
+import time
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from benchmarks.common import timeit
+from utils.cube import build_cube, filter_cube
+from utils.data import DATASET_PATH, load_snapshot
+from utils.duck import connect_duckdb, DuckDBRows
+from utils.filters import FilterIndex
+from utils.ranking import top_couriers
+from utils.synthetic import write_synthetic_csv
+from utils.visao_empresa import ( order_by_week, order_metric, order_share_by_week, traffic_order_city,
+                                  traffic_order_share )
+from utils.visao_entregadores import ratings_by
+from utils.visao_restaurantes import ( avg_std_time_by, avg_std_time_graph, avg_std_time_on_traffic, distance_mean,
+                                      time_by_city_order )
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Filtros comparados ( data limite, trânsito, clima ); o último seleciona poucas linhas
+FILTERS = [ ( '2022-04-13', None, None ),
+            ( '2022-03-20', [ 'Low', 'Jam' ], None ),
+            ( '2022-03-01', [ 'High' ], [ 'conditions Sunny', 'conditions Fog' ] ),
+            ( '2022-02-14', [ 'Jam' ], [ 'conditions Windy' ] ) ]
+
+# Funções comparadas: nome -> função ( df_cube, df1 ); no DuckDB os dois argumentos são o mesmo DuckDBRows
+CASES = {
+    'order_metric': lambda df_cube, df1: order_metric( df_cube ),
+    'traffic_order_share': lambda df_cube, df1: traffic_order_share( df_cube ),
+    'traffic_order_city': lambda df_cube, df1: traffic_order_city( df_cube ),
+    'order_by_week': lambda df_cube, df1: order_by_week( df_cube ),
+    'order_share_by_week': lambda df_cube, df1: order_share_by_week( df1 ),
+    'avg_std_time_on_traffic': lambda df_cube, df1: avg_std_time_on_traffic( df_cube ),
+    'avg_std_time_graph': lambda df_cube, df1: avg_std_time_graph( df_cube ),
+    'time_by_city_order': lambda df_cube, df1: time_by_city_order( df_cube ),
+    'avg_std_time_by': lambda df_cube, df1: avg_std_time_by( df_cube, 'Festival' ),
+    'distance_mean': lambda df_cube, df1: distance_mean( df_cube, False ),
+    'ratings_by_traffic': lambda df_cube, df1: ratings_by( df_cube, 'Road_traffic_density' ),
+    'top_couriers': lambda df_cube, df1: top_couriers( df1, k=10 ),
+}
+
+# Tolerância relativa dos números ( o cubo soma momentos, o DuckDB calcula direto nas linhas )
+RTOL = 1e-9
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _normalize( valor ):
+    # Converte um resultado em estruturas comparáveis ( figuras viram o JSON do plotly )
+    if isinstance( valor, go.Figure ):
+        return json.loads( valor.to_json() )
+
+    if isinstance( valor, pd.DataFrame ):
+        return json.loads( valor.to_json( orient='split', date_format='iso' ) )
+
+    if isinstance( valor, tuple ):
+        return [ _normalize( item ) for item in valor ]
+
+    if hasattr( valor, 'item' ):
+        return valor.item()
+
+    return valor
+
+# ================================================================================
+
+def assert_parity( esperado, obtido, nome ):
+    """ Esta função compara o resultado do pandas com o do DuckDB.
+
+        Textos, datas e estrutura devem ser iguais; números podem diferir só pelo arredondamento ( RTOL ).
+
+        Input: Resultado do pandas, resultado do DuckDB, nome ( para a mensagem de erro )
+        Output: Nenhum ( AssertionError quando diferem )
+    """
+    def comparar( a, b, caminho ):
+        if isinstance( a, dict ):
+            assert isinstance( b, dict ) and a.keys() == b.keys(), caminho
+            for chave in a:
+                comparar( a[chave], b[chave], f'{caminho}.{chave}' )
+
+        elif isinstance( a, list ):
+            assert isinstance( b, list ) and len( a ) == len( b ), caminho
+            for i, ( x, y ) in enumerate( zip( a, b ) ):
+                comparar( x, y, f'{caminho}[{i}]' )
+
+        elif isinstance( a, float ) or isinstance( b, float ):
+            assert a is not None and b is not None and np.isclose( a, b, rtol=RTOL, atol=0 ), ( caminho, a, b )
+
+        else:
+            assert a == b, ( caminho, a, b )
+
+    comparar( _normalize( esperado ), _normalize( obtido ), nome )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara o backend DuckDB com o caminho pandas ( paridade e tempos ).' )
+    parser.add_argument( '--dataset', default=DATASET_PATH )
+    parser.add_argument( '--rows', type=int, nargs='+', help='Gera datasets sintéticos com estes tamanhos em vez de usar --dataset' )
+    parser.add_argument( '--sources', nargs='+', default=[ 'parquet', 'csv' ] )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    paths = [ args.dataset ]
+    if args.rows:
+        paths = [ write_synthetic_csv( f'dataset/bench_duckdb_{n_rows}.csv', n_rows ) for n_rows in args.rows ]
+
+    for path in paths:
+        # Caminho pandas: linhas limpas em memória ( índice de filtros ) e cubo pré-agregado
+        inicio = time.perf_counter()
+        df1 = load_snapshot( path )
+        filter_index = FilterIndex( df1 )
+        df_cube_full = build_cube( df1 )
+        t_pandas = time.perf_counter() - inicio
+
+        print( f'\n{path}: {len( df1 ):,} linhas | carga pandas {t_pandas:.2f} s' )
+
+        for source in args.sources:
+            inicio = time.perf_counter()
+            rows = DuckDBRows( connect_duckdb( path, source ) )
+            print( f'DuckDB ( {source} ): conexão {time.perf_counter() - inicio:.2f} s' )
+            print( f"{'função':>26} {'pandas (ms)':>12} {'duckdb (ms)':>12}" )
+
+            tempos = { nome: [ 0.0, 0.0 ] for nome in CASES }
+
+            for data, traffic, weather in FILTERS:
+                data = pd.Timestamp( data )
+                df_cube = filter_cube( df_cube_full, data, traffic, weather )
+                df_rows = filter_index.select( data, traffic, weather )
+                df_duck = filter_cube( rows, data, traffic, weather )
+
+                for nome, func in CASES.items():
+                    t_a, esperado = timeit( func, df_cube, df_rows, repeat=args.repeat )
+                    t_b, obtido = timeit( func, df_duck, df_duck, repeat=args.repeat )
+
+                    assert_parity( esperado, obtido, f'{nome} {data.date()} {traffic} {weather}' )
+
+                    tempos[nome][0] += t_a
+                    tempos[nome][1] += t_b
+
+            for nome, ( t_a, t_b ) in tempos.items():
+                print( f'{nome:>26} {1000 * t_a / len( FILTERS ):>12.2f} {1000 * t_b / len( FILTERS ):>12.2f}' )
+
+            print( f'Paridade ok ( {len( CASES )} funções x {len( FILTERS )} filtros )' )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import numpy as np
+from haversine import haversine
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.geo import delivery_distance, haversine_np
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def distance_apply( df1 ):
+    """ Cálculo original da distância: uma chamada de haversine() por linha via apply.
+
+        Input: Dataframe com as coordenadas
+        Output: Série com a distância em km
+    """
+    cols = ['Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude']
+
+    return ( df1.loc[:, cols]
+                .apply( lambda x: haversine( (x['Restaurant_latitude'], x['Restaurant_longitude']),
+                        (x['Delivery_location_latitude'], x['Delivery_location_longitude']) ), axis=1 ) )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara haversine() via apply com a versão vetorizada.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 1_000_000 ] )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    df = read_raw()
+
+    print( f"{'linhas':>12} {'apply (s)':>12} {'numpy (s)':>12} {'speedup':>9} {'erro rel. máx':>15}" )
+
+    for n_rows in args.sizes:
+        df_raw = scale_raw( df, n_rows )
+
+        t_apply, esperado = timeit( distance_apply, df_raw, repeat=1 )
+        t_numpy, _ = timeit( haversine_np, df_raw['Restaurant_latitude'], df_raw['Restaurant_longitude'],
+                             df_raw['Delivery_location_latitude'], df_raw['Delivery_location_longitude'],
+                             repeat=args.repeat )
+
+        # Equivalência: float64 igual à biblioteca, float32 ( coluna gravada ) dentro da precisão do tipo
+        calculado = haversine_np( df_raw['Restaurant_latitude'], df_raw['Restaurant_longitude'],
+                                  df_raw['Delivery_location_latitude'], df_raw['Delivery_location_longitude'] )
+        np.testing.assert_allclose( calculado, esperado.to_numpy(), rtol=1e-12, atol=1e-9 )
+
+        coluna = delivery_distance( df_raw )
+        np.testing.assert_allclose( coluna, esperado.to_numpy(), rtol=1e-6, atol=1e-4 )
+
+        erro = np.max( np.abs( coluna - esperado.to_numpy() ) / np.maximum( esperado.to_numpy(), 1e-9 ) )
+
+        print( f'{n_rows:>12,} {t_apply:>12.3f} {t_numpy:>12.4f} {t_apply / t_numpy:>8.0f}x {erro:>15.2e}' )
+
+
+if __name__ == '__main__':
+    main()
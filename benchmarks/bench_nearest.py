@@ -0,0 +1,71 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import numpy as np
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.data import clean_code
+from utils.geo import haversine_np
+from utils.nearest import RestaurantTree
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def nearest_brute_force( tree, latitudes, longitudes, block=256 ):
+    """ Referência: haversine de cada ponto contra todos os restaurantes ( em blocos ).
+
+        Input: RestaurantTree ( só a tabela de restaurantes é usada ), arrays dos pontos
+        Output: Array com a distância em km até o restaurante mais próximo
+    """
+    rest_lat = tree.restaurants['latitude'].to_numpy( dtype='float64' )[None, :]
+    rest_lon = tree.restaurants['longitude'].to_numpy( dtype='float64' )[None, :]
+
+    latitudes = np.asarray( latitudes, dtype='float64' )
+    longitudes = np.asarray( longitudes, dtype='float64' )
+    distancia = np.empty( len( latitudes ) )
+
+    for inicio in range( 0, len( latitudes ), block ):
+        fim = inicio + block
+        distancia[inicio:fim] = haversine_np( latitudes[inicio:fim, None], longitudes[inicio:fim, None],
+                                              rest_lat, rest_lon ).min( axis=1 )
+
+    return distancia
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara a busca do restaurante mais próximo por força bruta com a KD-tree.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 1_000_000 ] )
+    parser.add_argument( '--brute-force-points', type=int, default=2_000,
+                         help='Pontos consultados por força bruta ( o tempo é extrapolado para todos )' )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    df = clean_code( read_raw() )
+
+    print( f"{'linhas':>12} {'restaurantes':>13} {'árvore (s)':>11} {'kd-tree (s)':>12} {'força bruta (s)':>16} {'speedup':>9}" )
+
+    for n_rows in args.sizes:
+        df1 = scale_raw( df, n_rows )
+        latitudes = df1['Delivery_location_latitude'].to_numpy()
+        longitudes = df1['Delivery_location_longitude'].to_numpy()
+
+        t_build, tree = timeit( RestaurantTree, df1, repeat=1 )
+        t_tree, ( distancia, _ ) = timeit( tree.nearest, latitudes, longitudes, repeat=args.repeat )
+
+        # Força bruta só em uma amostra dos pontos; o tempo total é extrapolado
+        amostra = min( args.brute_force_points, n_rows )
+        t_brute, esperado = timeit( nearest_brute_force, tree, latitudes[:amostra], longitudes[:amostra], repeat=1 )
+        t_brute *= n_rows / amostra
+
+        # Equivalência: mesma distância ao restaurante mais próximo na amostra
+        np.testing.assert_allclose( distancia[:amostra, 0], esperado, rtol=1e-6, atol=1e-6 )
+
+        print( f'{n_rows:>12,} {len( tree.restaurants ):>13,} {t_build:>11.3f} {t_tree:>12.3f} '
+               f'{t_brute:>16.1f} {t_brute / t_tree:>8.0f}x' )
+
+
+if __name__ == '__main__':
+    main()
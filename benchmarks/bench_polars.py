@@ -0,0 +1,92 @@
+# Libraries
+import argparse
+import time
+
+# bibliotecas necessarias
+import pandas as pd
+
+from benchmarks.bench_duckdb import CASES, FILTERS, assert_parity
+from benchmarks.common import timeit
+from utils.cube import build_cube, filter_cube
+from utils.data import DATASET_PATH, prepare_dataset, read_dataset
+from utils.filters import FilterIndex
+from utils.lazy import LazyRows, scan_dataset
+from utils.synthetic import write_synthetic_csv
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def pandas_pipeline( path ):
+    """ Caminho pandas atual a partir do CSV: leitura, limpeza, colunas derivadas, tipos
+        compactos, índice de filtros e cubo ( cada etapa materializa uma cópia ).
+
+        Input: Caminho do arquivo CSV
+        Output: Tupla ( índice de filtros, cubo )
+    """
+    df1 = prepare_dataset( read_dataset( path ) )
+
+    return FilterIndex( df1 ), build_cube( df1 )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara o caminho Polars ( lazy frames ) com o pipeline pandas.' )
+    parser.add_argument( '--dataset', default=DATASET_PATH )
+    parser.add_argument( '--rows', type=int, nargs='+', help='Gera datasets sintéticos com estes tamanhos em vez de usar --dataset' )
+    parser.add_argument( '--sources', nargs='+', default=[ 'csv', 'parquet' ] )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    paths = [ args.dataset ]
+    if args.rows:
+        paths = [ write_synthetic_csv( f'dataset/bench_polars_{n_rows}.csv', n_rows ) for n_rows in args.rows ]
+
+    for path in paths:
+        # Do CSV ao primeiro gráfico: o pandas limpa e indexa tudo antes; o Polars lê só o que o gráfico usa
+        data, traffic, weather = FILTERS[1]
+        data = pd.Timestamp( data )
+
+        inicio = time.perf_counter()
+        filter_index, df_cube_full = pandas_pipeline( path )
+        CASES['order_metric']( filter_cube( df_cube_full, data, traffic, weather ), None )
+        t_pandas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        CASES['order_metric']( filter_cube( LazyRows( scan_dataset( path, 'csv' ) ), data, traffic, weather ), None )
+        t_polars = time.perf_counter() - inicio
+
+        print( f'\n{path}: {len( filter_index.df1 ):,} linhas' )
+        print( f'CSV -> primeiro gráfico: pandas {t_pandas:.2f} s | polars ( csv ) {t_polars:.2f} s' )
+
+        for source in args.sources:
+            rows = LazyRows( scan_dataset( path, source ) )
+
+            print( f'\nPolars ( {source} ), média por filtro' )
+            print( f"{'função':>26} {'pandas (ms)':>12} {'polars (ms)':>12}" )
+
+            tempos = { nome: [ 0.0, 0.0 ] for nome in CASES }
+
+            for data, traffic, weather in FILTERS:
+                data = pd.Timestamp( data )
+                df_cube = filter_cube( df_cube_full, data, traffic, weather )
+                df_rows = filter_index.select( data, traffic, weather )
+                df_lazy = filter_cube( rows, data, traffic, weather )
+
+                for nome, func in CASES.items():
+                    t_a, esperado = timeit( func, df_cube, df_rows, repeat=args.repeat )
+                    t_b, obtido = timeit( func, df_lazy, df_lazy, repeat=args.repeat )
+
+                    assert_parity( esperado, obtido, f'{nome} {data.date()} {traffic} {weather}' )
+
+                    tempos[nome][0] += t_a
+                    tempos[nome][1] += t_b
+
+            for nome, ( t_a, t_b ) in tempos.items():
+                print( f'{nome:>26} {1000 * t_a / len( FILTERS ):>12.2f} {1000 * t_b / len( FILTERS ):>12.2f}' )
+
+            print( f'Paridade ok ( {len( CASES )} funções x {len( FILTERS )} filtros )' )
+
+
+if __name__ == '__main__':
+    main()
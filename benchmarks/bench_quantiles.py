@@ -0,0 +1,81 @@
+# Libraries
+import argparse
+import time
+
+# bibliotecas necessarias
+import numpy as np
+
+from benchmarks.bench_sketch import random_filters
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.cube import filter_cube
+from utils.data import prepare_dataset
+from utils.quantiles import LOCATION_MEASURES, PERCENTILES, QUANTILE_DIMENSIONS, QUANTILE_MEASURES, QuantileSketches
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def exact_quantiles( df1, filtros, measure, dimensions ):
+    """ Referência exata: quantile() do pandas nas linhas de cada combinação de filtros.
+
+        Input: Dataframe limpo, combinações de filtros, medida, dimensões
+        Output: Lista de arrays ( grupos x percentis )
+    """
+    return [ filter_cube( df1, *filtro ).groupby( dimensions, observed=True )[measure]
+                                        .quantile( PERCENTILES ).unstack().to_numpy()
+             for filtro in filtros ]
+
+# ================================================================================
+
+def sketch_quantiles( sketches, filtros, measure, dimensions ):
+    """ Percentis pelos sketches de cada combinação de filtros.
+
+        Input: QuantileSketches, combinações de filtros, medida, dimensões
+        Output: Lista de arrays ( grupos x percentis )
+    """
+    return [ sketches.filter( *filtro ).quantiles_by( measure, dimensions ).iloc[:, len( dimensions ):].to_numpy()
+             for filtro in filtros ]
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara os percentis exatos do pandas com os sketches de quantis.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 500_000 ] )
+    parser.add_argument( '--filters', type=int, default=50 )
+    parser.add_argument( '--repeat', type=int, default=1 )
+    args = parser.parse_args()
+
+    df_raw = read_raw()
+
+    # Tempo ( sempre ) e coordenadas ( só no modo streaming )
+    measures = { **QUANTILE_MEASURES, **LOCATION_MEASURES }
+
+    print( f"{'linhas':>12} {'medida':>28} {'montagem (s)':>13} {'sketch MB':>10} {'exato (ms)':>11} "
+           f"{'sketch (ms)':>12} {'erro máx':>10} {'meia faixa':>11}" )
+
+    for n_rows in args.sizes:
+        df1 = prepare_dataset( scale_raw( df_raw, n_rows ) ).loc[:, QUANTILE_DIMENSIONS + list( measures )]
+        filtros = random_filters( df1, args.filters )
+
+        inicio = time.perf_counter()
+        sketches = QuantileSketches.from_rows( df1, measures )
+        t_montagem = time.perf_counter() - inicio
+
+        for measure, width in measures.items():
+            memoria = sketches.counts[measure].memory_usage( deep=True ).sum() / 2**20
+
+            t_exato, exato = timeit( exact_quantiles, df1, filtros, measure, [ 'City' ], repeat=args.repeat )
+            t_sketch, estimado = timeit( sketch_quantiles, sketches, filtros, measure, [ 'City' ], repeat=args.repeat )
+
+            # Mesmos grupos; a diferença fica dentro de meia faixa de valores
+            erro = max( [ np.abs( a - b ).max() for a, b in zip( exato, estimado ) if a.size ], default=0.0 )
+            assert all( a.shape == b.shape for a, b in zip( exato, estimado ) ), measure
+            assert erro <= width / 2 + 1e-9, ( measure, erro )
+
+            print( f'{n_rows:>12,} {measure:>28} {t_montagem:>13.2f} {memoria:>10.2f} '
+                   f'{1000 * t_exato / len( filtros ):>11.2f} {1000 * t_sketch / len( filtros ):>12.2f} '
+                   f'{erro:>10.4f} {width / 2:>11.4f}' )
+
+
+if __name__ == '__main__':
+    main()
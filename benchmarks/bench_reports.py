@@ -0,0 +1,102 @@
+# Libraries
+import argparse
+import json
+import os
+import re
+import time
+
+# bibliotecas necessarias
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.data import DATASET_PATH
+from utils.reports import ( TRAFFIC_OPTIONS, WEATHER_OPTIONS, build_page_report, build_reports, load_report,
+                            report_grid )
+from utils.synthetic import write_synthetic_csv
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Grade medida: 4 datas x 3 conjuntos de trânsito x 2 conjuntos de clima
+DATES = [ '2022-04-13', '2022-03-31', '2022-03-15', '2022-02-28' ]
+TRAFFIC_SETS = [ TRAFFIC_OPTIONS, [ 'Low', 'Medium' ], [ 'High', 'Jam' ] ]
+WEATHER_SETS = [ WEATHER_OPTIONS, [ 'conditions Sunny', 'conditions Cloudy' ] ]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def assert_same_artifact( esperado, obtido, nome ):
+    """ Esta função compara um artefato calculado com o lido do relatório.
+
+        Input: Artefato calculado, artefato do relatório, nome ( para a mensagem de erro )
+        Output: Nenhum ( AssertionError quando diferem )
+    """
+    if isinstance( esperado, pd.DataFrame ):
+        pd.testing.assert_frame_equal( esperado, obtido, check_dtype=False, check_categorical=False,
+                                       check_index_type=False, obj=nome )
+
+    elif isinstance( esperado, go.Figure ):
+        assert json.loads( esperado.to_json() ) == json.loads( obtido.to_json() ), nome
+
+    elif isinstance( esperado, tuple ):
+        for a, b in zip( esperado, obtido ):
+            assert_same_artifact( a, b, nome )
+
+    elif isinstance( esperado, dict ):
+        assert { k: float( v ) for k, v in esperado.items() } == { k: float( v ) for k, v in obtido.items() }, nome
+
+    elif isinstance( esperado, str ):
+        # Os ids dos elementos do folium são aleatórios a cada renderização
+        limpar = lambda html: re.sub( r'_[0-9a-f]{32}', '', html )
+        assert limpar( esperado ) == limpar( obtido ), nome
+
+    else:
+        assert esperado == obtido, ( nome, esperado, obtido )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Mede a geração dos relatórios pré-calculados e compara com o cálculo ao vivo.' )
+    parser.add_argument( '--dataset', default=DATASET_PATH )
+    parser.add_argument( '--rows', type=int, help='Gera um dataset sintético com este tamanho em vez de usar --dataset' )
+    parser.add_argument( '--workers', type=int, nargs='+', default=sorted( { 1, os.cpu_count() } ) )
+    args = parser.parse_args()
+
+    path = args.dataset
+    if args.rows:
+        path = write_synthetic_csv( f'dataset/bench_reports_{args.rows}.csv', args.rows )
+
+    tarefas = report_grid( DATES, TRAFFIC_SETS, WEATHER_SETS )
+    print( f'{len( tarefas )} relatórios ( {path} )' )
+
+    print( f"{'processos':>10} {'tempo (s)':>10}" )
+    for workers in args.workers:
+        inicio = time.perf_counter()
+        build_reports( DATES, TRAFFIC_SETS, WEATHER_SETS, workers=workers, path=path )
+        print( f'{workers:>10} {time.perf_counter() - inicio:>10.2f}' )
+
+    # Equivalência e custo por rerun: relatório lido x artefatos calculados ao vivo
+    t_leitura = t_calculo = 0.0
+
+    for page, data, traffic, weather in tarefas:
+        inicio = time.perf_counter()
+        report = load_report( page, data, traffic, weather, path )
+        artefatos = { nome: report.get( nome, None ) for nome in report.artifacts }
+        t_leitura += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        esperados = build_page_report( page, data, traffic, weather, path )
+        t_calculo += time.perf_counter() - inicio
+
+        assert set( artefatos ) == set( esperados ), page
+        for nome, esperado in esperados.items():
+            assert_same_artifact( esperado, artefatos[nome], f'{page}.{nome}' )
+
+    print( f'Equivalência ok. Por relatório: leitura {1000 * t_leitura / len( tarefas ):.1f} ms, '
+           f'cálculo ao vivo {1000 * t_calculo / len( tarefas ):.1f} ms' )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# Libraries
+import argparse
+import time
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.cube import filter_cube
+from utils.data import prepare_dataset
+from utils.sketch import HLL_RELATIVE_ERROR, SKETCH_COLUMN, SKETCH_DIMENSIONS, CourierSketches
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+TRAFFIC_OPTIONS = [ 'Low', 'Medium', 'High', 'Jam' ]
+WEATHER_OPTIONS = [ 'conditions Cloudy', 'conditions Fog', 'conditions Sandstorms',
+                    'conditions Stormy', 'conditions Sunny', 'conditions Windy' ]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def random_filters( df1, n_filters, seed=42 ):
+    """ Esta função sorteia combinações de filtros da barra lateral ( data, trânsito e clima ).
+
+        Input: Dataframe limpo, quantidade de combinações
+        Output: Lista de tuplas ( data limite, trânsito, clima )
+    """
+    rng = np.random.default_rng( seed )
+    datas = df1['Order_Date'].drop_duplicates().sort_values().to_numpy()
+    filtros = []
+
+    for _ in range( n_filters ):
+        data = pd.Timestamp( datas[rng.integers( 1, len( datas ) )] )
+        traffic = [ t for t in TRAFFIC_OPTIONS if rng.random() < 0.6 ] or TRAFFIC_OPTIONS[:1]
+        weather = [ w for w in WEATHER_OPTIONS if rng.random() < 0.6 ] or WEATHER_OPTIONS[:1]
+        filtros.append( ( data, traffic, weather ) )
+
+    return filtros
+
+# ================================================================================
+
+def exact_distinct( df1, filtros ):
+    """ Referência exata: nunique dos entregadores nas linhas de cada combinação de filtros.
+
+        Input: Dataframe limpo, combinações de filtros
+        Output: Array com as contagens
+    """
+    return np.array( [ filter_cube( df1, *filtro )[SKETCH_COLUMN].nunique() for filtro in filtros ] )
+
+# ================================================================================
+
+def sketch_distinct( sketches, filtros ):
+    """ Estimativa pelos sketches de cada combinação de filtros.
+
+        Input: CourierSketches, combinações de filtros
+        Output: Array com as estimativas
+    """
+    return np.array( [ sketches.filter( *filtro ).distinct() for filtro in filtros ] )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara a contagem exata de entregadores únicos com os sketches HyperLogLog.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 500_000 ] )
+    parser.add_argument( '--filters', type=int, default=100 )
+    parser.add_argument( '--repeat', type=int, default=1 )
+    args = parser.parse_args()
+
+    df_raw = read_raw()
+
+    print( f'Erro padrão esperado: {HLL_RELATIVE_ERROR:.2%}' )
+    print( f"{'linhas':>12} {'montagem (s)':>13} {'sketch MB':>10} {'exato (ms)':>11} {'sketch (ms)':>12} "
+           f"{'erro médio':>11} {'erro máx':>9}" )
+
+    for n_rows in args.sizes:
+        df1 = prepare_dataset( scale_raw( df_raw, n_rows ) ).loc[:, SKETCH_DIMENSIONS + [ SKETCH_COLUMN ]]
+        filtros = random_filters( df1, args.filters )
+
+        inicio = time.perf_counter()
+        sketches = CourierSketches.from_rows( df1 )
+        t_montagem = time.perf_counter() - inicio
+
+        t_exato, exato = timeit( exact_distinct, df1, filtros, repeat=args.repeat )
+        t_sketch, estimado = timeit( sketch_distinct, sketches, filtros, repeat=args.repeat )
+
+        # Seleções vazias: as duas contagens são zero
+        assert ( estimado[exato == 0] == 0 ).all()
+
+        erro = np.abs( estimado[exato > 0] / exato[exato > 0] - 1 )
+
+        print( f'{n_rows:>12,} {t_montagem:>13.2f} {sketches.memory_mb:>10.1f} '
+               f'{1000 * t_exato / len( filtros ):>11.2f} {1000 * t_sketch / len( filtros ):>12.2f} '
+               f'{erro.mean():>11.2%} {erro.max():>9.2%}' )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.data import add_derived_columns, clean_code
+from utils.geo import GRID_CELL_DEGREES
+from utils.spatial import SpatialIndex
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def hot_spots_scan( df1, n=10 ):
+    """ Referência: varre todas as linhas, calcula a célula e agrupa a cada consulta.
+
+        Input: Dataframe, quantidade de células
+        Output: Dataframe com as n células com mais pedidos
+    """
+    df_aux = pd.DataFrame( { 'lat': np.floor( ( df1['Delivery_location_latitude'] + 90 ) / GRID_CELL_DEGREES ),
+                             'lon': np.floor( ( df1['Delivery_location_longitude'] + 180 ) / GRID_CELL_DEGREES ),
+                             'Time_taken(min)': df1['Time_taken(min)'] } )
+
+    return ( df_aux.groupby( ['lat', 'lon'] )['Time_taken(min)']
+                   .agg( [ 'count', 'mean' ] )
+                   .nlargest( n, 'count' ) )
+
+# ================================================================================
+
+def lookup_scan( df1, latitude, longitude ):
+    """ Referência: filtra as linhas da célula de uma coordenada com uma máscara completa.
+
+        Input: Dataframe, latitude e longitude em graus
+        Output: Quantidade de pedidos da célula
+    """
+    lat = np.floor( ( latitude + 90 ) / GRID_CELL_DEGREES )
+    lon = np.floor( ( longitude + 180 ) / GRID_CELL_DEGREES )
+
+    mascara = ( ( np.floor( ( df1['Delivery_location_latitude'] + 90 ) / GRID_CELL_DEGREES ) == lat )
+                & ( np.floor( ( df1['Delivery_location_longitude'] + 180 ) / GRID_CELL_DEGREES ) == lon ) )
+
+    return int( mascara.sum() )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara consultas espaciais por varredura com o índice de células.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 1_000_000 ] )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    df = read_raw()
+
+    print( f"{'linhas':>12} {'índice (s)':>11} {'hot scan (s)':>13} {'hot índice (s)':>15} "
+           f"{'lookup scan (s)':>16} {'lookup índice (s)':>18}" )
+
+    for n_rows in args.sizes:
+        df1 = add_derived_columns( clean_code( scale_raw( df, n_rows ) ) )
+        latitude = float( df1['Delivery_location_latitude'].iloc[0] )
+        longitude = float( df1['Delivery_location_longitude'].iloc[0] )
+
+        t_build, index = timeit( SpatialIndex, df1, repeat=1 )
+        t_hot_scan, esperado = timeit( hot_spots_scan, df1, repeat=args.repeat )
+        t_hot_index, calculado = timeit( index.hot_spots, 10, repeat=args.repeat )
+        t_lookup_scan, contagem = timeit( lookup_scan, df1, latitude, longitude, repeat=args.repeat )
+        t_lookup_index, celula = timeit( index.lookup, latitude, longitude, repeat=args.repeat )
+
+        # Equivalência: mesmas contagens nos hot spots e na célula consultada
+        np.testing.assert_array_equal( np.sort( calculado['count'].to_numpy() ), np.sort( esperado['count'].to_numpy() ) )
+        assert contagem == int( celula['count'] )
+
+        print( f'{n_rows:>12,} {t_build:>11.3f} {t_hot_scan:>13.4f} {t_hot_index:>15.5f} '
+               f'{t_lookup_scan:>16.4f} {t_lookup_index:>18.6f}' )
+
+
+if __name__ == '__main__':
+    main()
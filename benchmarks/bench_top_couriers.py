@@ -0,0 +1,77 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timeit
+from utils.ranking import top_couriers
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def synthetic_deliveries( n_rows, n_couriers, n_cities=3, seed=42 ):
+    """ Esta função gera entregas sintéticas com muitos entregadores distintos.
+
+        Input: Quantidade de linhas, de entregadores e de cidades
+        Output: Dataframe com City, Delivery_person_ID e Time_taken(min)
+    """
+    rng = np.random.default_rng( seed )
+    cidades = [ f'City{i}' for i in range( n_cities ) ]
+    entregadores = np.char.add( 'DEL', np.arange( n_couriers ).astype( str ) )
+
+    return pd.DataFrame( { 'City': pd.Categorical( np.array( cidades )[rng.integers( 0, n_cities, n_rows )] ),
+                           'Delivery_person_ID': pd.Categorical( entregadores[rng.integers( 0, n_couriers, n_rows )] ),
+                           'Time_taken(min)': rng.integers( 10, 55, n_rows ).astype( 'int16' ) } )
+
+# ================================================================================
+
+def top_couriers_sort( df1, k=10 ):
+    """ Referência com ordenação completa: duas ordenações da tabela de médias inteira
+        ( por cidade e tempo, com a chave desempatando ) e head( k ) por cidade.
+
+        Input: Dataframe, quantidade k
+        Output: Tupla ( mais rápidos, mais lentos )
+    """
+    df2 = ( df1.loc[:, ['City', 'Delivery_person_ID', 'Time_taken(min)']]
+               .groupby( ['City', 'Delivery_person_ID'], observed=True )
+               .mean()
+               .reset_index() )
+
+    rapidos = ( df2.sort_values( ['City', 'Time_taken(min)'], ascending=[True, True], kind='stable' )
+                   .groupby( 'City', observed=True ).head( k ) )
+    lentos = ( df2.sort_values( ['City', 'Time_taken(min)'], ascending=[True, False], kind='stable' )
+                  .groupby( 'City', observed=True ).head( k ) )
+
+    return rapidos.reset_index( drop=True ).round( 2 ), lentos.reset_index( drop=True ).round( 2 )
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara o top-k por seleção parcial com a ordenação completa.' )
+    parser.add_argument( '--couriers', type=int, nargs='+', default=[ 1_300, 100_000, 500_000 ] )
+    parser.add_argument( '--rows-per-courier', type=int, default=4 )
+    parser.add_argument( '--k', type=int, default=10 )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    args = parser.parse_args()
+
+    print( f"{'entregadores':>14} {'linhas':>12} {'sort (s)':>10} {'top-k (s)':>10} {'speedup':>9}" )
+
+    for n_couriers in args.couriers:
+        n_rows = n_couriers * args.rows_per_courier
+        df1 = synthetic_deliveries( n_rows, n_couriers )
+
+        t_sort, esperado = timeit( top_couriers_sort, df1, args.k, repeat=args.repeat )
+        t_topk, calculado = timeit( top_couriers, df1, args.k, repeat=args.repeat )
+
+        # Equivalência: mesmas linhas, na mesma ordem, para as duas tabelas
+        for df_esperado, df_calculado in zip( esperado, calculado ):
+            pd.testing.assert_frame_equal( df_calculado, df_esperado, check_dtype=False, check_categorical=False )
+
+        print( f'{n_couriers:>14,} {n_rows:>12,} {t_sort:>10.3f} {t_topk:>10.3f} {t_sort / t_topk:>8.1f}x' )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Libraries
+import argparse
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_duckdb import FILTERS
+from utils.cube import filter_cube, load_cube
+from utils.data import DATASET_PATH
+from utils.filters import load_filter_index
+from utils.visao_restaurantes import avg_std_time_by, stat_value
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Filtros verificados: os do bench_duckdb ( o último não tem pedidos com Festival 'Yes' ) e uma seleção vazia
+CHECK_FILTERS = FILTERS + [ ( '2022-04-13', [], None ) ]
+
+# Valores de Festival exibidos na página 3
+FESTIVAL_VALUES = [ 'Yes', 'No' ]
+
+# Diferença máxima: avg_std_time_by arredonda para 2 casas
+TOLERANCE = 0.005 + 1e-9
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def expected_stats( df1 ):
+    """ Referência direta: groupby do Festival nas linhas limpas e filtradas.
+
+        Input: Dataframe limpo e filtrado
+        Output: Dataframe indexado pelo Festival com as colunas avg_time, std_time e count
+    """
+    df_aux = df1.groupby( 'Festival', observed=True )['Time_taken(min)'].agg( [ 'mean', 'std', 'count' ] )
+
+    return df_aux.rename( columns={ 'mean': 'avg_time', 'std': 'std_time' } )
+
+# ================================================================================
+
+def check_filter( filter_index, df_cube_full, date_limit, traffic, weather ):
+    """ Esta função compara os quatro indicadores de Festival do cubo com a referência.
+
+        Input: Índice de filtros, cubo completo, data limite, trânsito, clima
+        Output: Lista com os valores de Festival ausentes no filtro ( AssertionError quando diferem )
+    """
+    df_stats = avg_std_time_by( filter_cube( df_cube_full, date_limit, traffic, weather ), 'Festival' )
+    df_expected = expected_stats( filter_index.select( date_limit, traffic, weather ) )
+
+    ausentes = []
+    for value in FESTIVAL_VALUES:
+        if value not in df_expected.index:
+            # valor sem pedidos: os metrics mostram '-'
+            assert all( stat_value( df_stats, value, op ) == '-' for op in [ 'avg_time', 'std_time', 'count' ] ), value
+            ausentes.append( value )
+            continue
+
+        for op in [ 'avg_time', 'std_time' ]:
+            obtido, esperado = stat_value( df_stats, value, op ), df_expected.loc[value, op]
+            assert ( np.isnan( obtido ) and np.isnan( esperado ) ) or abs( obtido - esperado ) <= TOLERANCE, \
+                   ( value, op, obtido, esperado )
+
+        assert stat_value( df_stats, value, 'count' ) == df_expected.loc[value, 'count'], value
+
+    return ausentes
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Compara os indicadores de Festival do cubo com um groupby direto.' )
+    parser.add_argument( '--dataset', default=DATASET_PATH )
+    args = parser.parse_args()
+
+    filter_index = load_filter_index( args.dataset )
+    df_cube_full = load_cube( args.dataset )
+
+    casos = set()
+    for date_limit, traffic, weather in CHECK_FILTERS:
+        ausentes = check_filter( filter_index, df_cube_full, pd.Timestamp( date_limit ), traffic, weather )
+        casos.add( len( ausentes ) )
+
+        print( f"ok {date_limit} {traffic} {weather}: ausentes {ausentes or '-'}" )
+
+    # Os filtros precisam cobrir um valor ausente ( ex.: só 'No' ) e a seleção vazia ( os dois ausentes )
+    assert { 1, 2 } <= casos, casos
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Libraries
+import argparse
+import runpy
+import sys
+import traceback
+
+# bibliotecas necessarias
+import streamlit as st
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Páginas verificadas e as seções de cada uma ( None = página sem seletor de seção )
+PAGES = { 'pages/1_visao_empresa.py': [ 'Visão Gerencial', 'Visão Tática', 'Visão Goegráfica' ],
+          'pages/2_visao_entregadores.py': [ None ],
+          'pages/3_visao_restaurantes.py': [ None ] }
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def render_page( page, secao=None, empty=False ):
+    """ Esta função executa uma página fora do servidor do Streamlit ( modo bare ).
+
+        Os widgets retornam o valor padrão; com empty=True os multiselects da barra lateral
+        retornam uma lista vazia ( nenhum pedido selecionado ).
+
+        Input: Caminho da página, seção exibida ( None = padrão ), seleção vazia
+        Output: Nenhum ( propaga a exceção da página )
+    """
+    multiselect, radio = st.sidebar.multiselect, st.radio
+
+    if empty:
+        st.sidebar.multiselect = lambda *args, **kwargs: []
+    if secao is not None:
+        st.radio = lambda *args, **kwargs: secao
+
+    try:
+        runpy.run_path( page, run_name='__main__' )
+    finally:
+        st.sidebar.multiselect, st.radio = multiselect, radio
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Verifica se as páginas renderizam com a seleção padrão e vazia.' )
+    parser.add_argument( '--pages', nargs='+', default=list( PAGES ) )
+    args = parser.parse_args()
+
+    falhas = 0
+
+    for page in args.pages:
+        for secao in PAGES.get( page, [ None ] ):
+            for empty in [ False, True ]:
+                nome = ' '.join( [ page ] + ( [ secao ] if secao else [] )
+                                 + [ f"( {'seleção vazia' if empty else 'seleção padrão'} )" ] )
+
+                try:
+                    render_page( page, secao, empty )
+                    print( f'ok {nome}' )
+                except Exception:
+                    falhas += 1
+                    print( f'FALHA {nome}' )
+                    traceback.print_exc()
+
+    sys.exit( 1 if falhas else 0 )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Libraries
+import os
+import time
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from utils.data import DATASET_PATH
+from utils.synthetic import generate_raw
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Linhas geradas quando o dataset não existe ( mesmo tamanho do dataset original )
+SYNTHETIC_ROWS = 45_000
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def read_raw( path=DATASET_PATH ):
+    """ Esta função lê o CSV bruto, sem nenhuma limpeza.
+
+        Se o arquivo não existe, usa um dataset sintético no mesmo formato ( utils.synthetic ),
+        para os benchmarks rodarem sem os dados reais.
+
+        Input: Caminho do arquivo CSV
+        Output: Dataframe bruto
+    """
+    if not os.path.exists( path ):
+        print( f'{path} não encontrado: usando {SYNTHETIC_ROWS:,} linhas sintéticas' )
+        return generate_raw( SYNTHETIC_ROWS )
+
+    return pd.read_csv( path )
+
+# ================================================================================
+
+def scale_raw( df, n_rows, seed=42 ):
+    """ Esta função gera um dataframe bruto com n_rows linhas sorteando ( com reposição )
+        linhas do dataframe original, para medir o custo em tamanhos maiores.
+
+        Input: Dataframe bruto, quantidade de linhas desejada
+        Output: Dataframe bruto com n_rows linhas
+    """
+    rng = np.random.default_rng( seed )
+    linhas = rng.integers( 0, len( df ), size=n_rows )
+
+    return df.iloc[linhas].reset_index( drop=True )
+
+# ================================================================================
+
+def timeit( func, *args, repeat=3 ):
+    """ Esta função mede o melhor tempo de execução de func(*args).
+
+        Input: Função e seus argumentos, quantidade de repetições
+        Output: Tupla ( melhor tempo em segundos, resultado da última execução )
+    """
+    best = float( 'inf' )
+
+    for _ in range( repeat ):
+        start = time.perf_counter()
+        result = func( *args )
+        best = min( best, time.perf_counter() - start )
+
+    return best, result
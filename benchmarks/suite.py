@@ -0,0 +1,208 @@
+# Libraries
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import read_raw, scale_raw, timeit
+from utils.cube import build_cube, filter_cube
+from utils.data import clean_code, prepare_dataset
+from utils.filters import FilterIndex
+from utils.geomap import build_country_map, render_map_html
+from utils.nearest import RestaurantTree
+from utils.ranking import top_couriers
+from utils.spatial import SpatialIndex
+from utils.visao_empresa import ( order_by_week, order_metric, order_share_by_week, traffic_order_city,
+                                  traffic_order_share )
+from utils.visao_entregadores import ratings_by, ratings_per_deliver
+from utils.visao_restaurantes import ( avg_std_time_by, avg_std_time_graph, avg_std_time_on_traffic, distance_mean,
+                                      restaurant_coverage_graph, time_by_city_order )
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Pasta padrão dos resultados ( ignorada pelo git )
+RESULTS_DIR = 'benchmarks/results'
+
+# Filtros usados nas medições ( todas as datas e todas as densidades de trânsito )
+DATE_LIMIT = datetime.datetime( 2022, 4, 13 )
+TRAFFIC_OPTIONS = [ 'Low', 'Medium', 'High', 'Jam' ]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def build_cases( df_raw, df1, df_cube, tree, filter_index ):
+    """ Esta função lista as funções medidas e os argumentos de cada uma.
+
+        Input: Dataframe bruto, dataframe limpo, cubo, árvore dos restaurantes e índice de filtros
+        Output: Lista de tuplas ( nome, função, argumentos )
+    """
+    return [
+        # Carga
+        ( 'clean_code', clean_code, ( df_raw, ) ),
+        ( 'prepare_dataset', prepare_dataset, ( df_raw, ) ),
+        ( 'build_cube', build_cube, ( df1, ) ),
+        ( 'filter_index.select', filter_index.select, ( DATE_LIMIT, TRAFFIC_OPTIONS ) ),
+        ( 'filter_cube', filter_cube, ( df_cube, DATE_LIMIT, TRAFFIC_OPTIONS ) ),
+
+        # Visão Empresa
+        ( 'order_metric', order_metric, ( df_cube, ) ),
+        ( 'traffic_order_share', traffic_order_share, ( df_cube, ) ),
+        ( 'traffic_order_city', traffic_order_city, ( df_cube, ) ),
+        ( 'order_by_week', order_by_week, ( df_cube, ) ),
+        ( 'order_share_by_week', order_share_by_week, ( df1, ) ),
+        ( 'country_maps', lambda df: render_map_html( build_country_map( df ) ), ( df1, ) ),
+        ( 'spatial_index', SpatialIndex, ( df1, ) ),
+
+        # Visão Entregadores
+        ( 'top_delivers', top_couriers, ( df1, ) ),
+        ( 'ratings_per_deliver', ratings_per_deliver, ( df1, ) ),
+        ( 'ratings_by', ratings_by, ( df_cube, 'Road_traffic_density' ) ),
+
+        # Visão Restaurantes
+        ( 'distance_mean', distance_mean, ( df_cube, False ) ),
+        ( 'distance_mean_fig', distance_mean, ( df_cube, True ) ),
+        ( 'avg_std_time_graph', avg_std_time_graph, ( df_cube, ) ),
+        ( 'avg_std_time_on_traffic', avg_std_time_on_traffic, ( df_cube, ) ),
+        ( 'avg_std_time_by', avg_std_time_by, ( df_cube, 'Festival' ) ),
+        ( 'time_by_city_order', time_by_city_order, ( df_cube, ) ),
+        ( 'restaurant_tree', RestaurantTree, ( df1, ) ),
+        ( 'restaurant_coverage_graph', restaurant_coverage_graph, ( df1, tree ) ),
+    ]
+
+# ================================================================================
+
+def environment():
+    """ Esta função descreve o ambiente da medição ( versões e commit ), gravado junto dos resultados.
+
+        Input: Nenhum
+        Output: Dicionário com o ambiente
+    """
+    try:
+        commit = subprocess.run( [ 'git', 'rev-parse', '--short', 'HEAD' ], capture_output=True,
+                                 text=True, check=True ).stdout.strip()
+    except ( OSError, subprocess.CalledProcessError ):
+        commit = None
+
+    return { 'timestamp': datetime.datetime.now().isoformat( timespec='seconds' ),
+             'commit': commit,
+             'python': platform.python_version(),
+             'pandas': pd.__version__,
+             'numpy': np.__version__,
+             'platform': platform.platform(),
+             'cpu_count': os.cpu_count() }
+
+# ================================================================================
+
+def run_suite( sizes, repeat=3, only=None ):
+    """ Esta função mede todas as funções para cada tamanho de dataset.
+
+        Input: Lista de tamanhos ( linhas ), repetições, nomes das funções ( None = todas )
+        Output: Lista de dicionários com function, rows e seconds ( melhor tempo )
+    """
+    df = read_raw()
+    resultados = []
+
+    for n_rows in sizes:
+        df_raw = scale_raw( df, n_rows )
+        df1 = prepare_dataset( df_raw )
+        df_cube = build_cube( df1 )
+        tree = RestaurantTree( df1 )
+        filter_index = FilterIndex( df1 )
+
+        for nome, func, argumentos in build_cases( df_raw, df1, df_cube, tree, filter_index ):
+            if only and nome not in only:
+                continue
+
+            segundos, _ = timeit( func, *argumentos, repeat=repeat )
+            resultados.append( { 'function': nome, 'rows': n_rows, 'seconds': segundos } )
+
+            print( f'{nome:>28} {n_rows:>12,} {segundos:>10.4f}', flush=True )
+
+    return resultados
+
+# ================================================================================
+
+def compare( resultados, baseline, tolerance, min_seconds ):
+    """ Esta função compara os resultados com uma execução anterior.
+
+        Uma medição é regressão quando fica mais de tolerance ( fração ) acima da referência;
+        medições abaixo de min_seconds nas duas execuções são ignoradas ( ruído ).
+
+        Input: Resultados atuais, resultados de referência, tolerância, tempo mínimo em segundos
+        Output: Lista de regressões ( dicionários com function, rows, baseline, seconds e ratio )
+    """
+    referencia = { ( r['function'], r['rows'] ): r['seconds'] for r in baseline }
+    regressoes = []
+
+    for r in resultados:
+        anterior = referencia.get( ( r['function'], r['rows'] ) )
+
+        if anterior is None or max( anterior, r['seconds'] ) < min_seconds:
+            continue
+
+        razao = r['seconds'] / max( anterior, 1e-12 )
+
+        if razao > 1 + tolerance:
+            regressoes.append( { 'function': r['function'], 'rows': r['rows'], 'baseline': anterior,
+                                 'seconds': r['seconds'], 'ratio': razao } )
+
+    return regressoes
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Mede as funções de agregação do dashboard e grava os tempos em JSON.' )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 45_000, 500_000 ] )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    parser.add_argument( '--only', nargs='+', help='Mede apenas as funções com estes nomes' )
+    parser.add_argument( '--output', default=None,
+                         help=f'Arquivo JSON de saída ( padrão: {RESULTS_DIR}/<data>_<commit>.json )' )
+    parser.add_argument( '--baseline', help='JSON de uma execução anterior para detectar regressões' )
+    parser.add_argument( '--tolerance', type=float, default=0.25, help='Aumento tolerado ( 0.25 = 25%% )' )
+    parser.add_argument( '--min-seconds', type=float, default=0.005, help='Ignora medições abaixo deste tempo' )
+    args = parser.parse_args()
+
+    ambiente = environment()
+
+    print( f"{'função':>28} {'linhas':>12} {'tempo (s)':>10}" )
+    resultados = run_suite( args.sizes, args.repeat, args.only )
+
+    saida = args.output
+    if saida is None:
+        data = ambiente['timestamp'].replace( ':', '' ).replace( '-', '' )
+        saida = os.path.join( RESULTS_DIR, f"{data}_{ambiente['commit'] or 'local'}.json" )
+
+    os.makedirs( os.path.dirname( saida ) or '.', exist_ok=True )
+    with open( saida, 'w', encoding='utf-8' ) as arquivo:
+        json.dump( { 'environment': ambiente, 'results': resultados }, arquivo, indent=2 )
+
+    print( f'Resultados gravados em {saida}' )
+
+    if args.baseline:
+        with open( args.baseline, encoding='utf-8' ) as arquivo:
+            baseline = json.load( arquivo )['results']
+
+        regressoes = compare( resultados, baseline, args.tolerance, args.min_seconds )
+
+        for r in regressoes:
+            print( f"REGRESSÃO {r['function']} ( {r['rows']:,} linhas ): "
+                   f"{r['baseline']:.4f}s -> {r['seconds']:.4f}s ( {r['ratio']:.2f}x )" )
+
+        if regressoes:
+            sys.exit( 1 )
+
+        print( 'Nenhuma regressão acima da tolerância.' )
+
+
+if __name__ == '__main__':
+    main()
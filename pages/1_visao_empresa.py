@@ -1,243 +1,67 @@
 
 # Libraries
-from haversine import haversine
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 
 # bibliotecas necessarias
-import pandas as pd
 import streamlit as st
 from PIL import Image
-import folium
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
+
+from utils.cube import filter_cube, load_cube
+from utils.data import memory_usage_mb
+from utils.filters import load_filter_index
+from utils.geomap import MAP_HEIGHT, MAP_WIDTH, country_map_html, median_locations_approx
+from utils.perf import RerunTimer, perf_panel
+from utils.quantiles import load_quantiles
+from utils.reports import load_page_artifacts
+from utils.sketch import APPROX_DISTINCT, APPROX_MESSAGE, load_sketches
+from utils.spatial import load_spatial_index
+from utils.streaming import ROWS_UNAVAILABLE_MESSAGE, STREAMING_MODE
+from utils.visao_empresa import ( order_by_week, order_metric, order_share_by_week, order_share_by_week_approx,
+                                  traffic_order_city, traffic_order_share )
 
 st.set_page_config( page_title='Visão Empresa', page_icon='📈', layout='wide')
 
+# Cronômetro das etapas deste rerun ( painel Performance na barra lateral e log em logs/perf.jsonl )
+timer = RerunTimer( 'visao_empresa' )
+
 # ===============================================================
 # Funções
 # ===============================================================
 
-def country_maps( df1 ):
+def country_maps( df1, artefatos, date_limit, traffic_options ):
         
     """ Esta função tem a responsabilidade de plotar o mapa onde consta as localizações por cidades e densidade de tráfego.
 
-        1. Ela calcula a mediana da localização de todas as entregas por Cidade e por tipo de densidade de tráfego.
-    
-        Input: Dataframe
-        Output: Mapa com mediana das entregas das cidades e tipo de densidade de tráfego.
-        
-    """
-    
-    df_aux = ( df1.loc[ :, ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']]
-                .groupby( ['City', 'Road_traffic_density'])
-                .median()
-                .reset_index() )
-    
-    map = folium.Map()
-    
-    for index, location_info in df_aux.iterrows():
-        folium.Marker( [location_info['Delivery_location_latitude'], 
-                        location_info['Delivery_location_longitude']], 
-                        popup=location_info[['City', 'Road_traffic_density']] ).add_to( map )
-    
-    folium_static( map, width=1024, height=600)
-
-    
-
-def order_share_by_week( df1 ):
-    """ Esta função tem a responsabilidade de plotar um gráfico de linhas 
-    onde tem a quantidade de pedidos realizados pelos entregadores por semana.
-
-        1. Ele conta o número de pedidos por semanas.
-        2. Ele conta o número de entregadores únicos por semana.
-    
-        Input: Dataframe
-        Output: Gráfico de linhas com a quantidade de pedidos feito pelos entregadores por semana.
-        
-    """
-    df_aux01 = ( df1.loc[:, [ 'ID', 'week_of_year' ]]
-                        .groupby( 'week_of_year' )
-                        .count()
-                        .reset_index() )
-            
-    df_aux02 = ( df1.loc[:, [ 'Delivery_person_ID', 'week_of_year' ]]
-                        .groupby( 'week_of_year' )
-                        .nunique()
-                        .reset_index() )
-
-    df_aux = pd.merge( df_aux01, df_aux02, how='inner' )
-
-    df_aux[ 'order_by_deliver' ] = df_aux[ 'ID' ] / df_aux[ 'Delivery_person_ID' ]
-
-    fig = px.line( df_aux, x='week_of_year', y='order_by_deliver' )
-            
-    return fig
-
-
-def order_by_week(df1):
-    """ Esta função tem a responsabilidade de plotar um gráfico de linhas 
-    com a quantidade de pedidos realizados por semana.
-
-        1. Ele conta o total de pedidos por cada semana.
-        
-    
-        Input: Dataframe
-        Output: Gráfico de linhas com a quantidade de pedidos feito pelos entregadores por semana.
-        
-    """
-              
-    df1['week_of_year'] = df1['Order_Date'].dt.strftime( '%U' )
-
-    df_aux = df1.loc[:, ['ID','week_of_year']].groupby( 'week_of_year' ).count().reset_index()
-
-    fig = px.line(df_aux, x='week_of_year' , y='ID')
-            
-    return fig
-
-
-def traffic_order_city( df1 ):
-    """ Esta função tem a responsabilidade de plotar um gráfico de bolhas
-    onde tem a quantidade de pedidos realizados por Cidade e por Densidade de trânsito.
-
-    1. Ele conta a quantidade de pedidos por cidade e por densidade de trânsito.
-    
-            
-    Input: Dataframe
-    Output: Gráfico de bolhas com a quantidade de pedidos feito por semana e densidade de trânsito.
-        
-    """
-    df_aux = ( df1.loc[:, ['ID', 'City','Road_traffic_density']]
-                .groupby(['City', 'Road_traffic_density'])
-                .count()
-                .reset_index() )
-    
-    fig = px.scatter( df_aux, x='City', y='Road_traffic_density', size='ID', color='City')
-                    
-    return fig
-
-
-def traffic_order_share( df1 ):
-    """ Esta função tem a responsabilidade de plotar um gráfico de pizza
-    onde tem a porcentagem de entregas realizados por cada densidade de trânsito.
-
-    1. Ele soma a porcentagem de pedidos por densidades de trânsito.
-    
-            
-    Input: Dataframe
-    Output: Gráfico de pizza com a porcentagem de pedidos feito por densidades de trânsito.
-        
-    """
-    df_aux = ( df1.loc[:, ['ID', 'Road_traffic_density']]
-                          .groupby('Road_traffic_density')
-                          .count()
-                          .reset_index() )
-    df_aux['entregas_perc'] = df_aux['ID'] / df_aux['ID'].sum()
-
-    fig = px.pie( df_aux, values='entregas_perc', names='Road_traffic_density')
-
-    return fig
-
-
-def order_metric( df1 ):
-    """ Esta função tem a responsabilidade de plotar um gráfico de barras
-    com a quantidade de pedidos realizados por dia.
-
-    1. Ele soma a quantidade de pedidos por dia.
+        1. Ela agrupa as entregas em células e desenha um mapa de calor com a densidade ( só com as linhas ).
+        2. A mediana da localização das entregas por Cidade e por tipo de densidade de tráfego é exata
+           com as linhas; no modo streaming vem dos sketches de quantis ( utils.quantiles ).
+        3. O HTML do mapa é gerado uma única vez por estado dos filtros ( cache de artefatos ), ou vem
+           do relatório pré-calculado quando existe um para esses filtros.
     
-            
-    Input: Dataframe
-    Output: Gráfico de barras com a quantidade de pedidos feito por dia.
-        
-    """       
-# Colunas
-    cols = ['ID', 'Order_Date']
-
-# Seleção de linhas por agrupamento
-    df_aux = (df1.loc[:, cols]
-        .groupby( 'Order_Date' )
-        .count()
-        .reset_index() )
-
-# Desenhar o gráfico de linhas
-    fig = px.bar( df_aux, x='Order_Date', y='ID' )
-
-    return fig
-
-def clean_code( df1 ):
-
-    """ Esta função tem a responsabilidade de limpar o dataframe 
-    
-        Tipos de limpeza:
-        1. Remoção dos dados NaN
-        2. Mudança do tipo da coluna de dados
-        3. Remoção dos espaços das variáveis de texto
-        4. Formatação da coluna de datas
-        5. Limpeza da coluna de tempo ( remoção do texto da variável numérica )
+        Input: Dataframe ( None no modo streaming ), artefatos da página, data limite, densidades de trânsito
+        Output: Mapa de calor das entregas com a mediana das cidades e tipo de densidade de tráfego.
         
-        Input: Dataframe
-        Output: Dataframe
     """
+    if df1 is not None:
+        html = artefatos.get( 'country_maps', country_map_html, df1 )
+    else:
+        html = artefatos.get( 'country_maps', lambda: country_map_html(
+                              None, median_locations_approx( load_quantiles().filter( date_limit, traffic_options ) ) ) )
 
-# 1. convertendo a coluna Age de texto para número
-#float = decimal
-#int = inteiro
-#str = objetct
-    
-    linhas_selecionadas = df1['Delivery_person_Age'] != 'NaN ' # O simbolo != utiliza quando queremos dados diferentes do modelo que queremos
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype('int64')
-
+    components.html( html, width=MAP_WIDTH, height=MAP_HEIGHT + 10 )
 
-# 2. convertendo a coluna Ratings de texto para numero decimal (Float)
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype( float )
-
-
-# 3. convertendo a coluna order_date de texto para data
-    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format='%d-%m-%Y' )
-
-
-# 4. convertendo a coluna multiple_deliveries de texto para numero inteiro
-    linhas_selecionadas = df1['multiple_deliveries'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype('int64')
-
-    linhas_selecionadas = df1['Road_traffic_density'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = df1['Weatherconditions'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = df1['City'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = df1['Festival'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-# 5 retirando os espaços dentros das strings
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip() 
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip()
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
-    df1.loc[:, 'Delivery_person_ID'] = df1.loc[:, 'Delivery_person_ID'].str.strip()
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
-
-    # 6 Limpando a coluna de time taken
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply( lambda x: x.split( '(min) ' )[1]) 
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype('int64')
-
-    return df1
 
 #================================== Inicio da Estrutura lógica do código ==========================================
 
-# import dataset
-df = pd.read_csv('dataset/train.csv')
-
-df1 = df.copy()
+# Colunas usadas nesta página
+COLUNAS = [ 'ID', 'Order_Date', 'City', 'Road_traffic_density', 'Delivery_person_ID',
+            'Delivery_location_latitude', 'Delivery_location_longitude' ]
 
-# Limpando os dados
-df1 = clean_code( df1)
+# import dataset ( lido, limpo e indexado uma única vez por processo; no modo streaming só o cubo é carregado )
+if not STREAMING_MODE:
+    with timer.stage( 'load_filter_index' ):
+        filter_index = load_filter_index( columns=COLUNAS )
 
 #==================================================================
 # # Barra Lateral
@@ -273,26 +97,42 @@ traffic_options = st.sidebar.multiselect(
 st.sidebar.markdown( """___""" )
 st.sidebar.markdown( '### Powered by Daniel Reis' )
 
-# Filtro de Data
-linhas_selecionadas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas_selecionadas, :]
+# Memória ocupada pelos dados carregados nesta página
+with timer.stage( 'load_cube' ):
+    memoria_cubo = memory_usage_mb( load_cube() )
+if STREAMING_MODE:
+    st.sidebar.caption( f'Memória: cubo {memoria_cubo:.1f} MB' )
+else:
+    st.sidebar.caption( f'Memória: dataset {filter_index.memory_mb:.1f} MB | cubo {memoria_cubo:.1f} MB' )
+
+# Seção exibida: diferente do st.tabs, só o conteúdo da seção selecionada é calculado no rerun
+secao = st.radio( 'Seção', [ 'Visão Gerencial', 'Visão Tática', 'Visão Goegráfica' ],
+                  horizontal=True, label_visibility='collapsed' )
+
+# Filtros de data e trânsito ( busca binária + bitmaps, uma única cópia; a Visão Gerencial usa só o cubo )
+with timer.stage( 'filter_rows' ):
+    df1 = None if STREAMING_MODE or secao == 'Visão Gerencial' else filter_index.select( date_slider, traffic_options )
+
+# Mesmos filtros aplicados ao cubo pré-agregado ( usado pelas contagens de pedidos )
+with timer.stage( 'filter_cube' ):
+    df_cube = filter_cube( load_cube(), date_slider, traffic_options )
 
-#Filtro de trânsito
-linhas_selecionadas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas_selecionadas, :]
+# Artefatos destes filtros: relatório pré-calculado ( python -m utils.reports ), cache do processo ou cálculo
+with timer.stage( 'load_artifacts' ):
+    artefatos = load_page_artifacts( 'visao_empresa', date_slider, traffic_options )
+if artefatos.report:
+    st.sidebar.caption( 'Gráficos servidos do relatório pré-calculado' )
 
 
 #==================================================================
 # Layout no Streamlit
 #==================================================================
-tab1, tab2, tab3 = st.tabs( [ 'Visão Gerencial', 'Visão Tática' ,
-                             'Visão Goegráfica'] )
-
-with tab1:
+if secao == 'Visão Gerencial':
     
     with st.container():
         # Order Metric
-        fig = order_metric( df1 )
+        with timer.stage( 'order_metric' ):
+            fig = artefatos.get( 'order_metric', order_metric, df_cube )
         st.markdown('# Orders by Day')
         st.plotly_chart(fig, use_container_width=True)    
         
@@ -302,32 +142,57 @@ with tab1:
         col1, col2 = st.columns( 2 )
         
         with col1:
-            fig = traffic_order_share( df1 )
+            with timer.stage( 'traffic_order_share' ):
+                fig = artefatos.get( 'traffic_order_share', traffic_order_share, df_cube )
             st.header('Traffic Order Share')
             st.plotly_chart(fig, use_container_width=True)
 
             
         with col2:
-            fig = traffic_order_city( df1 )
+            with timer.stage( 'traffic_order_city' ):
+                fig = artefatos.get( 'traffic_order_city', traffic_order_city, df_cube )
             st.header('Traffic Order City')
             st.plotly_chart(fig, use_container_width=True )
             
             
-with tab2:
+elif secao == 'Visão Tática':
     
     with st.container():
         st.markdown('Order by Week')
-        fig = order_by_week(df1)
+        with timer.stage( 'order_by_week' ):
+            fig = artefatos.get( 'order_by_week', order_by_week, df_cube )
         st.plotly_chart(fig, use_container_width=True)
         
 
     with st.container():
         st.header('Order Share by Week')
-        fig = order_share_by_week( df1 )
-        st.plotly_chart(fig, use_container_width=True)
+        if not APPROX_DISTINCT and ( df1 is not None or 'order_share_by_week' in artefatos ):
+            with timer.stage( 'order_share_by_week' ):
+                fig = artefatos.get( 'order_share_by_week', order_share_by_week, df1 )
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            # Entregadores únicos por semana estimados pelos sketches ( modo aproximado ou streaming )
+            with timer.stage( 'order_share_by_week_approx' ):
+                fig = artefatos.get( 'order_share_by_week_approx', lambda: order_share_by_week_approx(
+                                     df_cube, load_sketches().filter( date_slider, traffic_options ) ) )
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption( APPROX_MESSAGE )
 
 
-with tab3:
+else:
     st.header( "Country Maps")
-    country_maps( df1 )
-    
+    if df1 is None and 'country_maps' not in artefatos:
+        # Sem as linhas, o mapa mostra só as medianas dos sketches ( sem o mapa de calor )
+        st.caption( ROWS_UNAVAILABLE_MESSAGE )
+    with timer.stage( 'country_maps' ):
+        country_maps( df1, artefatos, date_slider, traffic_options )
+
+    if df1 is not None:
+        # Hot spots consultados no índice espacial ( células de ~1 km, todo o período, sem os filtros )
+        st.markdown( '##### Regiões com mais entregas ( todo o período )' )
+        with timer.stage( 'hot_spots' ):
+            df_hot_spots = load_spatial_index().hot_spots( 10 ).reset_index( drop=True ).round( 2 )
+        st.dataframe( df_hot_spots )
+
+# Painel de performance do rerun ( fecha o cronômetro e grava o log )
+perf_panel( timer, st.sidebar )
@@ -1,119 +1,32 @@
 # Libraries
-from haversine import haversine 
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 
 # bibliotecas necessarias
-import pandas as pd
 import streamlit as st
 from PIL import Image
-import folium
-from streamlit_folium import folium_static
-
-st.set_page_config( page_title='Visão Entregadores', page_icon='🚚', layout='wide')
-
-# ===============================================================
-# Funções
-# ===============================================================
-
-def top_delivers(df1, top_asc):
-    """ Esta função tem a responsabilidade de mostrar as tabelas onde tem os top 10 entregadores
-    mais rápidos e os mais lentos por cidades.
-
-    1. Ela calcula a media de tempo de todas as entregas feitas de cada entregador por cidade.
-    
-    Input: Dataframe
-    Output: Dataframe com a média de tempo de entrega dos entregadores por cidades.
-        
-    """
-    df2 = ( df1.loc[:, ['Delivery_person_ID', 'Time_taken(min)', 'City'] ]
-                .groupby( ['City', 'Delivery_person_ID'] )
-                .mean()
-                .sort_values(['Delivery_person_ID', 'Time_taken(min)'], ascending=top_asc)
-                .reset_index()
-                .round(2) )
-    # Selecionando somente as 10 primeiras linhas de cada cidade.
-    df_aux1 = df2.loc[df2[ 'City' ] == 'Metropolitian', : ].head( 10 )
-    df_aux2 = df2.loc[df2['City' ] == 'Urban', : ].head( 10 )
-    df_aux3 = df2.loc[df2[ 'City' ] == 'Semi-Urban', : ].head( 10 )
-                
-    # Concatenação de variáveis recebendo somente as cidades e as 10 primeiras linhas.
-    df_avg_time_max_per_deliver = ( pd.concat( [df_aux1, df_aux2, df_aux3] )
-                                           .reset_index( drop=True ) )
-
-    return df_avg_time_max_per_deliver
-
-
-def clean_code( df1 ):
-    """ Esta função tem a responsabilidade de limpar o dataframe 
-    
-        Tipos de limpeza:
-        1. Remoção dos dados NaN
-        2. Mudança do tipo da coluna de dados
-        3. Remoção dos espaços das variáveis de texto
-        4. Formatação da coluna de datas
-        5. Limpeza da coluna de tempo ( remoção do texto da variável numérica )
-        
-        Input: Dataframe
-        Output: Dataframe
-    """
-
-    # 1. convertendo a coluna Age de texto para número
-    #float = decimal
-    #int = inteiro
-    #str = objetct
-    linhas_selecionadas = df1['Delivery_person_Age'] != 'NaN ' # O simbolo != utiliza quando queremos dados diferentes do modelo que queremos
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype('int64')
-
-
-    # 2. convertendo a coluna Ratings de texto para numero decimal (Float)
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype( float )
-
-
-    # 3. convertendo a coluna order_date de texto para data
-    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format='%d-%m-%Y' )
 
+from utils.cube import filter_cube, load_cube
+from utils.data import memory_usage_mb
+from utils.filters import load_filter_index
+from utils.perf import RerunTimer, perf_panel
+from utils.ranking import top_couriers
+from utils.reports import load_page_artifacts
+from utils.streaming import ROWS_UNAVAILABLE_MESSAGE, STREAMING_MODE
+from utils.visao_entregadores import overall_metrics, ratings_by, ratings_per_deliver
 
-    # 4. convertendo a coluna multiple_deliveries de texto para numero inteiro
-    linhas_selecionadas = df1['multiple_deliveries'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype('int64')
-
-    linhas_selecionadas = df1['Road_traffic_density'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = df1['Weatherconditions'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = df1['City'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = df1['Festival'] != 'NaN '
-    df1 = df1.loc[linhas_selecionadas, :].copy()
-
-
-    # 5 retirando os espaços dentros das strings
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip() 
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip()
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
-    df1.loc[:, 'Delivery_person_ID'] = df1.loc[:, 'Delivery_person_ID'].str.strip()
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
-
-    # 6 Limpando a coluna de time taken
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply( lambda x: x.split( '(min) ' )[1]) 
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype('int64')
+st.set_page_config( page_title='Visão Entregadores', page_icon='🚚', layout='wide')
 
-    return df1
+# Cronômetro das etapas deste rerun ( painel Performance na barra lateral e log em logs/perf.jsonl )
+timer = RerunTimer( 'visao_entregadores' )
 
-# import dataset
-df = pd.read_csv('dataset/train.csv')
+# Colunas usadas nesta página
+COLUNAS = [ 'Order_Date', 'City', 'Road_traffic_density', 'Weatherconditions', 'Delivery_person_ID',
+            'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition', 'Time_taken(min)' ]
 
-# Cleaning Dataset
-df1 = clean_code( df )
+# import dataset ( lido, limpo e indexado uma única vez por processo; no modo streaming só o cubo é carregado )
+if not STREAMING_MODE:
+    with timer.stage( 'load_filter_index' ):
+        filter_index = load_filter_index( columns=COLUNAS )
 
 #==================================================================
 # Barra Lateral
@@ -156,17 +69,27 @@ conditions_options = st.sidebar.multiselect(
 st.sidebar.markdown( """___""" )
 st.sidebar.markdown( '### Powered by Daniel Reis' )
 
-# Filtro de Data
-linhas_selecionadas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas_selecionadas, :]
+# Memória ocupada pelos dados carregados nesta página
+with timer.stage( 'load_cube' ):
+    memoria_cubo = memory_usage_mb( load_cube() )
+if STREAMING_MODE:
+    st.sidebar.caption( f'Memória: cubo {memoria_cubo:.1f} MB' )
+else:
+    st.sidebar.caption( f'Memória: dataset {filter_index.memory_mb:.1f} MB | cubo {memoria_cubo:.1f} MB' )
+
+# Filtros de data, trânsito e condições climáticas ( busca binária + bitmaps, uma única cópia )
+with timer.stage( 'filter_rows' ):
+    df1 = None if STREAMING_MODE else filter_index.select( date_slider, traffic_options, conditions_options )
 
-#Filtro de trânsito
-linhas_selecionadas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas_selecionadas, :]
+# Mesmos filtros aplicados ao cubo pré-agregado ( usado pelas médias e desvios das avaliações )
+with timer.stage( 'filter_cube' ):
+    df_cube = filter_cube( load_cube(), date_slider, traffic_options, conditions_options )
 
-# Filtor de condições climáticas
-linhas_selecionadas = df1['Weatherconditions'].isin(conditions_options)
-df1 = df1.loc[linhas_selecionadas, :]
+# Artefatos destes filtros: relatório pré-calculado ( python -m utils.reports ), cache do processo ou cálculo
+with timer.stage( 'load_artifacts' ):
+    artefatos = load_page_artifacts( 'visao_entregadores', date_slider, traffic_options, conditions_options )
+if artefatos.report:
+    st.sidebar.caption( 'Gráficos servidos do relatório pré-calculado' )
 
 
 
@@ -174,99 +97,92 @@ df1 = df1.loc[linhas_selecionadas, :]
 # Layout no Streamlit
 #==================================================================
 
-tab1, tab2, tab3 = st.tabs( [ 'Visão Gerencial', '', ''] )
-
-with tab1:
+with st.container():
+    st.title( 'Overall Metrics')
     
-    with st.container():
-        st.title( 'Overall Metrics')
-        
+    if df1 is None and 'overall_metrics' not in artefatos:
+        st.info( ROWS_UNAVAILABLE_MESSAGE )
+    else:
         col1, col2, col3, col4 = st.columns( 4, gap='large')
-        
+
+        # Idades e condições dos veículos calculadas de uma vez
+        with timer.stage( 'overall_metrics' ):
+            metricas = artefatos.get( 'overall_metrics', overall_metrics, df1 )
+    
         # =================== IDADES ============================
-       
+   
         with col1:
             # A menor idade dos Entregadores
-            maior_idade = df1.loc[:, 'Delivery_person_Age'].max()
-            col1.metric('Maior de idade', maior_idade )
-            
+            col1.metric('Maior de idade', metricas['maior_idade'] )
+        
         with col2:
             # A maior idade dos Entregadores
-            menor_idade = df1.loc[:, 'Delivery_person_Age'].min()
-            col2.metric('Menor de idade', menor_idade )
-        
+            col2.metric('Menor de idade', metricas['menor_idade'] )
+    
         # ================== CONDIÇÕES VEÍCULOS ============================
-        
+    
         with col3:
             # A melhor condição de veiculos
-            melhor_condicao = df1.loc[:, 'Vehicle_condition'].max()
-            col3.metric('Melhor condição', melhor_condicao )
-          
+            col3.metric('Melhor condição', metricas['melhor_condicao'] )
+      
         with col4:
             # A pior condição de veiculos
-            pior_condicao = df1.loc[:, 'Vehicle_condition'].min()
-            col4.metric('Pior condição', pior_condicao )
-        
-        # ================ Avaliações por Entregador ============================
-   
-    with st.container():
-        st.markdown("""___""")
-        st.title( 'Avaliações ' )
-
-        col1, col2 = st.columns( 2 )
-        with col1:
-            st.markdown( '##### Avaliação média por Entregador' )
-            df_avg_ratings_per_deliver =( df1.loc[:, ['Delivery_person_ID', 'Delivery_person_Ratings']]
-                                         .groupby('Delivery_person_ID')
-                                         .mean()
-                                         .reset_index() )
+            col4.metric('Pior condição', metricas['pior_condicao'] )
+    
+    # ================ Avaliações por Entregador ============================
+
+with st.container():
+    st.markdown("""___""")
+    st.title( 'Avaliações ' )
+
+    col1, col2 = st.columns( 2 )
+    with col1:
+        st.markdown( '##### Avaliação média por Entregador' )
+        if df1 is None and 'ratings_per_deliver' not in artefatos:
+            st.info( ROWS_UNAVAILABLE_MESSAGE )
+        else:
+            with timer.stage( 'ratings_per_deliver' ):
+                df_avg_ratings_per_deliver = artefatos.get( 'ratings_per_deliver', ratings_per_deliver, df1 )
             st.dataframe( df_avg_ratings_per_deliver )
 
-        # ================ Avaliações por Trânsito ============================
-        
-        with col2:
-            st.markdown( '##### Avaliação média por Trânsito' )
-            df_avg_ratings_by_traffic = ( df1.loc[:, ['Delivery_person_Ratings', 'Road_traffic_density']]
-                                             .groupby('Road_traffic_density')
-                                             .agg(['mean', 'std']) )
-            # Mudança de nome das colunas
-            df_avg_ratings_by_traffic.columns = ['Delivery_mean', 'Delivery_std'] 
-            
-            # Reset de Index
-            df_avg_ratinsg_by_traffic = df_avg_ratings_by_traffic.reset_index()
-
-            st.dataframe( df_avg_ratings_by_traffic )
-
-        # ================ Avaliações por Condições Climáticas ============================
-            
-            st.markdown( '##### Avaliação média por clima' )
-            df_avg_ratings_by_weather = ( df1.loc[:, ['Delivery_person_Ratings', 'Weatherconditions']]
-                                             .groupby( 'Weatherconditions' )
-                                             .agg( [ 'mean', 'std' ]  ) )
-
-            # Mudança de nome das colunas
-            df_avg_ratings_by_weather.columns = ['Delivery_mean', 'Delivery_std']
-
-            # Reset do Index
-            df_avg_ratings_by_weather = df_avg_ratings_by_weather.reset_index()
+    # ================ Avaliações por Trânsito ============================
+    
+    with col2:
+        st.markdown( '##### Avaliação média por Trânsito' )
+        with timer.stage( 'ratings_by_traffic' ):
+            df_avg_ratings_by_traffic = artefatos.get( 'ratings_by_traffic', ratings_by, df_cube, 'Road_traffic_density' )
+        st.dataframe( df_avg_ratings_by_traffic )
 
-            st.dataframe( df_avg_ratings_by_weather )
+    # ================ Avaliações por Condições Climáticas ============================
+        
+        st.markdown( '##### Avaliação média por clima' )
+        with timer.stage( 'ratings_by_weather' ):
+            df_avg_ratings_by_weather = artefatos.get( 'ratings_by_weather', ratings_by, df_cube, 'Weatherconditions' )
+        st.dataframe( df_avg_ratings_by_weather )
 
 # ================ CONTAINERS DE VELOCIDADE DE ENTREGA ============================
-    
-    with st.container():
-        st.markdown( """___""" )
-        st.title( 'Velocidade de Entrega' )
 
+with st.container():
+    st.markdown( """___""" )
+    st.title( 'Velocidade de Entrega' )
+
+    if df1 is None and 'top_couriers' not in artefatos:
+        st.info( ROWS_UNAVAILABLE_MESSAGE )
+    else:
         col1, col2 = st.columns( 2 )
 
+        # Médias por ( cidade, entregador ) calculadas uma única vez para as duas tabelas
+        with timer.stage( 'top_couriers' ):
+            df_top_fastest, df_top_slowest = artefatos.get( 'top_couriers', top_couriers, df1, 10 )
+
         with col1:
             st.markdown( '##### Top Entregadores mais rápidos')
-            df_avg_time_max_per_deliver = top_delivers( df1, top_asc=True  ) 
-            st.dataframe( df_avg_time_max_per_deliver )
-        
-        
+            st.dataframe( df_top_fastest )
+    
+    
         with col2:
             st.markdown( '##### Top Entregadores mais lentos')
-            df_avg_time_max_per_deliver = top_delivers( df1, top_asc=False  ) 
-            st.dataframe( df_avg_time_max_per_deliver )     
+            st.dataframe( df_top_slowest )
+
+# Painel de performance do rerun ( fecha o cronômetro e grava o log )
+perf_panel( timer, st.sidebar )
@@ -0,0 +1 @@
+""" Funções compartilhadas entre as páginas do dashboard da Curry Company. """
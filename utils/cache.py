@@ -0,0 +1,217 @@
+# Libraries
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Orçamento de memória ( MB ) do cache de artefatos das páginas ( CURRY_CACHE_MB )
+CACHE_BUDGET_MB = float( os.environ.get( 'CURRY_CACHE_MB', 256 ) )
+
+# Valor ausente ( o cache pode guardar None )
+_MISSING = object()
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def estimate_size( valor ):
+    """ Esta função estima a memória ocupada por um valor guardado no cache.
+
+        1. Dataframes e séries: memory_usage( deep=True ).
+        2. Figuras do plotly: tamanho do JSON da figura ( o que o Streamlit envia ao navegador ).
+        3. Arrays: nbytes; strings: tamanho; tuplas, listas e dicionários: soma dos itens.
+        4. Outros objetos com o atributo nbytes ( ex.: escalares do numpy ) informam o próprio tamanho.
+
+        Input: Valor
+        Output: Tamanho estimado em bytes
+    """
+    if isinstance( valor, pd.DataFrame ):
+        return int( valor.memory_usage( deep=True ).sum() )
+
+    if isinstance( valor, pd.Series ):
+        return int( valor.memory_usage( deep=True ) )
+
+    if isinstance( valor, go.Figure ):
+        return len( valor.to_json() )
+
+    if isinstance( valor, ( str, bytes ) ):
+        return sys.getsizeof( valor )
+
+    if isinstance( valor, ( tuple, list ) ):
+        return sys.getsizeof( valor ) + sum( estimate_size( item ) for item in valor )
+
+    if isinstance( valor, dict ):
+        return sys.getsizeof( valor ) + sum( estimate_size( k ) + estimate_size( v ) for k, v in valor.items() )
+
+    if isinstance( valor, np.ndarray ) or hasattr( valor, 'nbytes' ):
+        return int( valor.nbytes )
+
+    return sys.getsizeof( valor )
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class LRUCache:
+    """ Cache LRU compartilhado entre sessões ( threads ) do processo.
+
+        1. Os valores mais antigos são descartados quando o total estimado passa de
+           max_bytes ou a quantidade passa de max_entries ( None = sem limite ).
+        2. get_or_compute( key, func, *args ) calcula cada chave uma única vez: requisições
+           simultâneas com a mesma chave esperam o primeiro cálculo.
+        3. Contadores de hits, misses e descartes ficam em stats().
+
+        Valores maiores que o orçamento inteiro não são guardados.
+
+        Input: Nome ( exibido nos contadores ), orçamento em bytes, quantidade máxima de valores
+    """
+
+    def __init__( self, name, max_bytes=None, max_entries=None ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.inflight = {}
+
+        register_cache( self )
+
+    def __contains__( self, key ):
+        with self.lock:
+            return key in self.entries
+
+    def get( self, key, default=None ):
+        """ Esta função retorna o valor da chave ( e conta um hit ou um miss ).
+
+            Input: Chave, valor retornado quando a chave não existe
+            Output: Valor guardado ou default
+        """
+        with self.lock:
+            entrada = self.entries.get( key, _MISSING )
+
+            if entrada is _MISSING:
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end( key )
+            self.hits += 1
+
+            return entrada[0]
+
+    def put( self, key, valor, size=None ):
+        """ Esta função guarda o valor e descarta os mais antigos além do orçamento.
+
+            Input: Chave, valor, tamanho em bytes ( None = estimate_size )
+            Output: Nenhum
+        """
+        size = estimate_size( valor ) if size is None else size
+
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop( key )[1]
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self.entries[key] = ( valor, size )
+            self.nbytes += size
+
+            while self.entries and ( ( self.max_bytes is not None and self.nbytes > self.max_bytes ) or
+                                     ( self.max_entries is not None and len( self.entries ) > self.max_entries ) ):
+                self.nbytes -= self.entries.popitem( last=False )[1][1]
+                self.evictions += 1
+
+    def get_or_compute( self, key, func, *args ):
+        """ Esta função retorna o valor da chave ou calcula func( *args ) e guarda o resultado.
+
+            Input: Chave, função e argumentos
+            Output: Valor
+        """
+        valor = self.get( key, _MISSING )
+        if valor is not _MISSING:
+            return valor
+
+        with self.lock:
+            key_lock = self.inflight.setdefault( key, threading.Lock() )
+
+        with key_lock:
+            # Outra thread pode ter calculado enquanto esta esperava
+            with self.lock:
+                entrada = self.entries.get( key, _MISSING )
+                if entrada is not _MISSING:
+                    self.entries.move_to_end( key )
+                    self.hits += 1
+                    self.misses -= 1
+                    return entrada[0]
+
+            try:
+                valor = func( *args )
+                self.put( key, valor )
+            finally:
+                with self.lock:
+                    self.inflight.pop( key, None )
+
+        return valor
+
+    def clear( self ):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats( self ):
+        """ Esta função retorna os contadores do cache.
+
+            Input: Nenhum
+            Output: Dicionário com cache, entries, mb, budget_mb, hits, misses, evictions e hit_rate
+        """
+        with self.lock:
+            total = self.hits + self.misses
+
+            return { 'cache': self.name,
+                     'entries': len( self.entries ),
+                     'mb': round( self.nbytes / 2**20, 2 ),
+                     'budget_mb': None if self.max_bytes is None else round( self.max_bytes / 2**20, 2 ),
+                     'hits': self.hits,
+                     'misses': self.misses,
+                     'evictions': self.evictions,
+                     'hit_rate': round( self.hits / total, 3 ) if total else None }
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+_caches = []
+_caches_lock = threading.Lock()
+
+def register_cache( cache ):
+    """ Esta função registra o cache para os contadores de cache_stats.
+
+        Input: LRUCache
+        Output: Nenhum
+    """
+    with _caches_lock:
+        _caches.append( cache )
+
+# ================================================================================
+
+def cache_stats():
+    """ Esta função retorna os contadores de todos os caches do processo.
+
+        Input: Nenhum
+        Output: Lista de dicionários ( um por cache )
+    """
+    with _caches_lock:
+        return [ cache.stats() for cache in _caches ]
@@ -0,0 +1,156 @@
+# Libraries
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from utils.data import DATASET_PATH, dataset_version, load_snapshot
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Dimensões do cubo: todas as quebras e filtros usados pelos KPIs das páginas
+CUBE_DIMENSIONS = [ 'Order_Date', 'week_of_year', 'City', 'Road_traffic_density',
+                    'Weatherconditions', 'Festival', 'Type_of_order' ]
+
+# Medidas guardadas como momentos somáveis ( quantidade, soma e soma dos quadrados )
+CUBE_MEASURES = [ 'Time_taken(min)', 'Delivery_person_Ratings', 'distance' ]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def build_cube( df1 ):
+    """ Esta função monta o cubo pré-agregado a partir do dataframe limpo.
+
+        Cada linha do cubo é uma célula ( combinação única das dimensões ) com:
+        1. ID: quantidade de pedidos da célula ( mesmo nome do groupby().count() das páginas ).
+        2. <medida>_n, <medida>_sum e <medida>_sumsq: quantidade de valores não nulos,
+           soma e soma dos quadrados de cada medida.
+
+        Esses momentos podem ser somados entre células, então qualquer combinação de filtros
+        e agrupamentos é respondida somando células, sem voltar às linhas.
+
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por célula
+    """
+    df_aux = df1.loc[:, CUBE_DIMENSIONS].copy()
+    df_aux['ID'] = 1
+
+    for col in CUBE_MEASURES:
+        valores = df1[col].astype( 'float64' )
+        df_aux[col + '_n'] = valores.notna().astype( 'int64' )
+        df_aux[col + '_sum'] = valores
+        df_aux[col + '_sumsq'] = valores * valores
+
+    cube = ( df_aux.groupby( CUBE_DIMENSIONS, observed=True, dropna=False )
+                   .sum()
+                   .reset_index() )
+
+    return cube
+
+# ================================================================================
+
+def filter_cube( df_cube, date_limit, traffic_options=None, conditions_options=None ):
+    """ Esta função aplica os filtros da barra lateral sobre as células do cubo.
+
+        Input: Cubo, data limite ( exclusiva ), densidades de trânsito e condições climáticas
+               selecionadas ( None = sem filtro )
+        Output: Células do cubo que atendem aos filtros
+    """
+    # Outros backends ( utils.duck.DuckDBRows, utils.lazy.LazyRows ) aplicam os mesmos filtros
+    if not isinstance( df_cube, pd.DataFrame ):
+        return df_cube.filter( date_limit, traffic_options, conditions_options )
+
+    linhas_selecionadas = df_cube['Order_Date'].to_numpy() < np.datetime64( date_limit )
+
+    if traffic_options is not None:
+        linhas_selecionadas &= df_cube['Road_traffic_density'].isin( traffic_options ).to_numpy()
+
+    if conditions_options is not None:
+        linhas_selecionadas &= df_cube['Weatherconditions'].isin( conditions_options ).to_numpy()
+
+    return df_cube.loc[linhas_selecionadas, :]
+
+# ================================================================================
+
+def count_by( df_cube, dimensions ):
+    """ Esta função conta os pedidos por uma ou mais dimensões, somando as células.
+
+        Input: Células do cubo, lista de dimensões
+        Output: Dataframe com as dimensões e a coluna ID ( quantidade de pedidos )
+    """
+    if not isinstance( df_cube, pd.DataFrame ):
+        return df_cube.count_by( dimensions )
+
+    return ( df_cube.loc[:, dimensions + [ 'ID' ]]
+                    .groupby( dimensions, observed=True )
+                    .sum()
+                    .reset_index() )
+
+# ================================================================================
+
+def moments_by( df_cube, dimensions, measure ):
+    """ Esta função calcula a média e o desvio padrão ( amostral, como o .std() do pandas )
+        de uma medida por uma ou mais dimensões, somando os momentos das células.
+
+        Com a lista de dimensões vazia, retorna uma única linha com o total.
+
+        Input: Células do cubo, lista de dimensões, nome da medida
+        Output: Dataframe com as dimensões e as colunas mean e std
+    """
+    if not isinstance( df_cube, pd.DataFrame ):
+        return df_cube.moments_by( dimensions, measure )
+
+    cols = [ measure + '_n', measure + '_sum', measure + '_sumsq' ]
+
+    if dimensions:
+        df_aux = df_cube.loc[:, dimensions + cols].groupby( dimensions, observed=True ).sum()
+    else:
+        df_aux = df_cube.loc[:, cols].sum().to_frame().T
+    n, soma, soma_quadrados = ( df_aux[col].to_numpy( dtype='float64' ) for col in cols )
+
+    with np.errstate( divide='ignore', invalid='ignore' ):
+        media = soma / n
+        variancia = np.clip( soma_quadrados - soma * media, 0, None ) / ( n - 1 )
+
+    df_aux = df_aux.loc[:, []]
+    df_aux['mean'] = np.where( n > 0, media, np.nan )
+    df_aux['std'] = np.where( n > 1, np.sqrt( variancia ), np.nan )
+
+    return df_aux.reset_index() if dimensions else df_aux.reset_index( drop=True )
+
+# ================================================================================
+
+_cube_cache = {}
+_cube_lock = threading.Lock()
+
+def load_cube( path=DATASET_PATH ):
+    """ Esta função monta o cubo uma única vez por processo e versão do dataset.
+
+        As linhas lidas para montar o cubo são descartadas; só as células ficam em memória.
+        No modo streaming ( CURRY_STREAMING=1 ) o cubo é montado lendo o CSV em blocos.
+
+        Input: Caminho do arquivo CSV
+        Output: Cubo ( somente leitura, compartilhado entre sessões )
+    """
+    # Import local: utils.streaming depende das constantes deste módulo
+    from utils.streaming import STREAMING_MODE, stream_cube
+
+    version = dataset_version( path )
+
+    with _cube_lock:
+        cached = _cube_cache.get( path )
+
+        if cached is None or cached[0] != version:
+            if STREAMING_MODE:
+                df_cube = stream_cube( path )
+            else:
+                df_cube = build_cube( load_snapshot( path, columns=CUBE_DIMENSIONS + CUBE_MEASURES ) )
+
+            cached = ( version, df_cube )
+            _cube_cache[path] = cached
+
+    return cached[1]
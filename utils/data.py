@@ -0,0 +1,417 @@
+# Libraries
+import glob
+import hashlib
+import json
+import os
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from utils.geo import delivery_distance, grid_cell
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+DATASET_PATH = 'dataset/train.csv'
+
+# Pasta do cache em disco ( Parquet ) do dataset limpo
+SNAPSHOT_DIR = 'dataset/.cache'
+
+# Versão das regras de limpeza: incremente sempre que clean_code ( ou as colunas derivadas
+# de build_dataset ) mudar, para invalidar os snapshots já gravados
+CLEAN_VERSION = 5
+
+# Valor usado no CSV bruto para indicar dado faltante
+NAN_SENTINEL = 'NaN '
+
+# Colunas cujas linhas com NaN são removidas na limpeza
+NAN_COLUMNS = [ 'Delivery_person_Age', 'multiple_deliveries', 'Road_traffic_density',
+                'Weatherconditions', 'City', 'Festival' ]
+
+# Colunas de texto com espaços sobrando no CSV bruto
+STRIP_COLUMNS = [ 'ID', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle',
+                  'City', 'Delivery_person_ID', 'Festival' ]
+
+# Prefixo da coluna Time_taken(min) no CSV bruto
+TIME_PREFIX = '(min) '
+
+# Esquema do CSV bruto ( Order_Date é lida separadamente como data )
+RAW_DTYPES = {
+    'ID': 'object',
+    'Delivery_person_ID': 'object',
+    'Delivery_person_Age': 'float64',
+    'Delivery_person_Ratings': 'float64',
+    'Restaurant_latitude': 'float64',
+    'Restaurant_longitude': 'float64',
+    'Delivery_location_latitude': 'float64',
+    'Delivery_location_longitude': 'float64',
+    'Time_Orderd': 'object',
+    'Time_Order_picked': 'object',
+    'Weatherconditions': 'object',
+    'Road_traffic_density': 'object',
+    'Vehicle_condition': 'int64',
+    'Type_of_order': 'object',
+    'Type_of_vehicle': 'object',
+    'multiple_deliveries': 'float64',
+    'Festival': 'object',
+    'City': 'object',
+    'Time_taken(min)': 'object',
+}
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Colunas em que 'NaN ' é convertido para NaN já na leitura
+NA_VALUES = { col: [ NAN_SENTINEL ] for col in NAN_COLUMNS + [ 'Delivery_person_Ratings' ] }
+
+# Tipos compactos do dataset limpo: textos com poucos valores viram categorias e os
+# números usam o menor tipo que comporta os valores ( ID continua texto, é único por pedido )
+COMPACT_DTYPES = {
+    'Delivery_person_ID': 'category',
+    'Time_Orderd': 'category',
+    'Time_Order_picked': 'category',
+    'Weatherconditions': 'category',
+    'Road_traffic_density': 'category',
+    'Type_of_order': 'category',
+    'Type_of_vehicle': 'category',
+    'Festival': 'category',
+    'City': 'category',
+    'week_of_year': 'category',
+    'Delivery_person_Age': 'int8',
+    'Vehicle_condition': 'int8',
+    'multiple_deliveries': 'int8',
+    'Time_taken(min)': 'int16',
+    'Delivery_person_Ratings': 'float32',
+    'Restaurant_latitude': 'float32',
+    'Restaurant_longitude': 'float32',
+    'Delivery_location_latitude': 'float32',
+    'Delivery_location_longitude': 'float32',
+    'restaurant_cell': 'int32',
+    'delivery_cell': 'int32',
+}
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def map_unique( serie, func ):
+    """ Esta função aplica uma transformação vetorizada apenas nos valores distintos da série
+        e depois espalha o resultado para todas as linhas.
+
+        Em colunas com poucos valores distintos ( cidade, tráfego, entregador, tempo ) isso evita
+        repetir a mesma operação de string milhões de vezes.
+
+        Input: Série e função que recebe um Index com os valores distintos
+        Output: Série transformada, com o mesmo index e nome da original
+    """
+    codes, valores = pd.factorize( serie )
+    valores = func( pd.Index( valores ) )
+
+    # Código -1 indica NaN na série original
+    tem_nan = bool( ( codes < 0 ).any() )
+
+    return pd.Series( valores.take( codes, allow_fill=tem_nan, fill_value=np.nan ), index=serie.index, name=serie.name )
+
+# ================================================================================
+
+def clean_code( df1 ):
+    """ Esta função tem a responsabilidade de limpar o dataframe
+
+        Tipos de limpeza:
+        1. Remoção dos dados NaN
+        2. Mudança do tipo da coluna de dados
+        3. Remoção dos espaços das variáveis de texto
+        4. Formatação da coluna de datas
+        5. Limpeza da coluna de tempo ( remoção do texto da variável numérica )
+
+        Todas as linhas com 'NaN ' são removidas com uma única máscara e uma única cópia,
+        e o tempo de entrega é extraído com operações vetorizadas de string.
+
+        Aceita tanto o CSV bruto ( tudo texto ) quanto o lido por read_dataset ( já tipado
+        e talvez só com parte das colunas ); colunas ausentes são ignoradas.
+
+        Input: Dataframe
+        Output: Dataframe
+    """
+
+    # 1. removendo as linhas com NaN em qualquer coluna obrigatória ( uma única cópia )
+    linhas_selecionadas = np.logical_and.reduce( [ ( df1[col].notna() & ( df1[col] != NAN_SENTINEL ) ).to_numpy()
+                                                   for col in NAN_COLUMNS ] )
+    df1 = df1.loc[linhas_selecionadas, :].copy()
+
+    # 2. convertendo as colunas de texto para número
+    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype( 'int64' )
+    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype( 'int64' )
+
+    if 'Delivery_person_Ratings' in df1:
+        df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype( float )
+
+    # 3. convertendo a coluna order_date de texto para data
+    if 'Order_Date' in df1 and not pd.api.types.is_datetime64_dtype( df1['Order_Date'] ):
+        df1['Order_Date'] = pd.to_datetime( df1['Order_Date'], format=DATE_FORMAT )
+
+    # 4. retirando os espaços dentros das strings ( ID é único por pedido, as demais têm poucos valores )
+    if 'ID' in df1:
+        df1['ID'] = df1['ID'].str.strip()
+
+    for col in STRIP_COLUMNS:
+        if col != 'ID' and col in df1:
+            df1[col] = map_unique( df1[col], lambda valores: valores.str.strip() )
+
+    # 5. limpando a coluna de time taken: '(min) 24' -> 24
+    if 'Time_taken(min)' in df1:
+        df1['Time_taken(min)'] = map_unique( df1['Time_taken(min)'],
+                                             lambda valores: valores.str.slice( start=len( TIME_PREFIX ) ).astype( 'int64' ) )
+
+    return df1
+
+# ================================================================================
+
+def read_dataset( path=DATASET_PATH, columns=None, chunksize=None ):
+    """ Esta função lê o CSV bruto já com o esquema declarado.
+
+        1. Lê apenas as colunas pedidas, mais as colunas usadas para remover linhas com NaN
+           ( assim o conjunto de linhas é o mesmo para qualquer página ).
+        2. Converte 'NaN ' em NaN, as colunas numéricas e a data do pedido dentro do parser.
+        3. Com chunksize, lê o arquivo em blocos de chunksize linhas.
+
+        Input: Caminho do arquivo CSV, lista de colunas ( None = todas ), tamanho do bloco
+        Output: Dataframe tipado, ainda não limpo ( ou iterador de blocos )
+    """
+    if columns is not None:
+        columns = list( dict.fromkeys( list( columns ) + NAN_COLUMNS ) )
+
+    colunas_lidas = list( RAW_DTYPES ) + [ 'Order_Date' ] if columns is None else columns
+
+    return pd.read_csv( path,
+                        usecols=columns,
+                        dtype={ col: tipo for col, tipo in RAW_DTYPES.items() if col in colunas_lidas },
+                        na_values=NA_VALUES,
+                        parse_dates=[ 'Order_Date' ] if 'Order_Date' in colunas_lidas else False,
+                        date_format=DATE_FORMAT,
+                        chunksize=chunksize )
+
+# ================================================================================
+
+def dataset_version( path=DATASET_PATH ):
+    """ Esta função identifica a versão atual do arquivo do dataset.
+
+        A versão é formada pela data de modificação (mtime) e pelo tamanho do arquivo,
+        que podem ser lidos sem abrir o CSV.
+
+        Input: Caminho do arquivo CSV
+        Output: Tupla ( mtime em nanossegundos, tamanho em bytes )
+    """
+    stat = os.stat( path )
+
+    return ( stat.st_mtime_ns, stat.st_size )
+
+# ================================================================================
+
+def file_hash( path ):
+    """ Esta função calcula o hash ( blake2b ) do conteúdo do arquivo, lendo em blocos.
+
+        Input: Caminho do arquivo
+        Output: Hash em hexadecimal
+    """
+    digest = hashlib.blake2b( digest_size=16 )
+
+    with open( path, 'rb' ) as f:
+        for bloco in iter( lambda: f.read( 1 << 20 ), b'' ):
+            digest.update( bloco )
+
+    return digest.hexdigest()
+
+# ================================================================================
+
+def dataset_hash( path=DATASET_PATH ):
+    """ Esta função retorna o hash do CSV, reaproveitando o último valor calculado
+        enquanto o mtime e o tamanho do arquivo não mudarem.
+
+        O último hash fica gravado em um arquivo .json ao lado dos snapshots, para que
+        um processo novo não precise ler o CSV inteiro só para validar o cache.
+
+        Input: Caminho do arquivo CSV
+        Output: Hash em hexadecimal
+    """
+    version = dataset_version( path )
+    meta_path = os.path.join( SNAPSHOT_DIR, os.path.basename( path ) + '.meta.json' )
+
+    try:
+        with open( meta_path ) as f:
+            meta = json.load( f )
+        if tuple( meta['version'] ) == version:
+            return meta['hash']
+    except ( OSError, ValueError, KeyError ):
+        pass
+
+    csv_hash = file_hash( path )
+
+    try:
+        os.makedirs( SNAPSHOT_DIR, exist_ok=True )
+        with open( meta_path, 'w' ) as f:
+            json.dump( { 'version': version, 'hash': csv_hash }, f )
+    except OSError:
+        pass
+
+    return csv_hash
+
+# ================================================================================
+
+def snapshot_path( path=DATASET_PATH ):
+    """ Esta função monta o caminho do snapshot Parquet do dataset limpo.
+
+        O nome do arquivo combina o hash do CSV e a versão da limpeza, então qualquer
+        mudança em um dos dois aponta para um snapshot novo.
+
+        Input: Caminho do arquivo CSV
+        Output: Caminho do arquivo Parquet
+    """
+    nome = os.path.splitext( os.path.basename( path ) )[0]
+
+    return os.path.join( SNAPSHOT_DIR, f'{nome}_{dataset_hash( path )}_v{CLEAN_VERSION}.parquet' )
+
+# ================================================================================
+
+def add_derived_columns( df1 ):
+    """ Esta função acrescenta as colunas derivadas ao dataframe limpo.
+
+        1. week_of_year: semana do ano usada pelas visões semanais.
+        2. distance: distância restaurante -> local de entrega ( km ), calculada uma única vez.
+        3. restaurant_cell e delivery_cell: célula da grade espacial ( grid_cell ) do restaurante
+           e do local de entrega, usadas pelo índice espacial.
+
+        Input: Dataframe limpo
+        Output: Dataframe com as colunas derivadas
+    """
+    df1['week_of_year'] = df1['Order_Date'].dt.strftime( '%U' )
+    df1['distance'] = delivery_distance( df1 )
+    df1['restaurant_cell'] = grid_cell( df1['Restaurant_latitude'], df1['Restaurant_longitude'] )
+    df1['delivery_cell'] = grid_cell( df1['Delivery_location_latitude'], df1['Delivery_location_longitude'] )
+
+    return df1
+
+# ================================================================================
+
+def compact_dtypes( df1 ):
+    """ Esta função converte o dataframe limpo para os tipos compactos ( COMPACT_DTYPES ).
+
+        As categorias reduzem a memória e deixam os groupby mais rápidos; lembre de usar
+        observed=True nos groupby para não gerar combinações vazias.
+
+        Input: Dataframe limpo
+        Output: Dataframe com os tipos compactos
+    """
+    return df1.astype( { col: tipo for col, tipo in COMPACT_DTYPES.items() if col in df1 } )
+
+# ================================================================================
+
+def memory_usage_mb( df1 ):
+    """ Esta função calcula a memória ocupada pelo dataframe, incluindo o conteúdo dos textos.
+
+        Input: Dataframe
+        Output: Memória em MB
+    """
+    return df1.memory_usage( deep=True ).sum() / 2**20
+
+# ================================================================================
+
+def prepare_dataset( df1 ):
+    """ Esta função limpa um dataframe bruto, ordena as linhas por Order_Date, acrescenta
+        as colunas derivadas ( semana do ano, distância da entrega e células da grade ) e compacta os tipos.
+
+        Input: Dataframe bruto ( lido do CSV )
+        Output: Dataframe limpo com todas as colunas
+    """
+    df1 = clean_code( df1 )
+
+    # Linhas ordenadas pela data do pedido ( o filtro de data vira uma busca binária )
+    df1 = df1.sort_values( 'Order_Date', kind='stable' ).reset_index( drop=True )
+
+    return compact_dtypes( add_derived_columns( df1 ) )
+
+# ================================================================================
+
+def build_dataset( path=DATASET_PATH ):
+    """ Esta função lê o CSV completo e prepara o dataset limpo ( prepare_dataset ).
+
+        Input: Caminho do arquivo CSV
+        Output: Dataframe limpo com todas as colunas
+    """
+    return prepare_dataset( read_dataset( path ) )
+
+# ================================================================================
+
+def load_snapshot( path=DATASET_PATH, columns=None ):
+    """ Esta função carrega o dataset limpo a partir do snapshot Parquet.
+
+        1. Se o snapshot do hash/versão atual existe, lê apenas as colunas pedidas.
+        2. Se não existe, lê e limpa o CSV, grava o snapshot ( e apaga os antigos ) e
+           retorna as colunas pedidas.
+
+        Se a pasta não puder ser gravada, o dataset limpo é retornado mesmo assim.
+
+        Input: Caminho do arquivo CSV, colunas usadas pela página ( None = todas )
+        Output: Dataframe limpo
+    """
+    if columns is not None:
+        columns = list( dict.fromkeys( columns ) )
+        if 'Order_Date' in columns and 'week_of_year' not in columns:
+            columns.append( 'week_of_year' )
+
+    arquivo = snapshot_path( path )
+
+    if os.path.exists( arquivo ):
+        return pd.read_parquet( arquivo, columns=columns )
+
+    df1 = build_dataset( path )
+
+    try:
+        os.makedirs( SNAPSHOT_DIR, exist_ok=True )
+
+        # Grava em um arquivo temporário e troca de nome, para outro processo nunca ler um snapshot pela metade
+        temporario = f'{arquivo}.{os.getpid()}.tmp'
+        df1.to_parquet( temporario )
+        os.replace( temporario, arquivo )
+
+        nome = os.path.splitext( os.path.basename( path ) )[0]
+        for antigo in glob.glob( os.path.join( SNAPSHOT_DIR, f'{nome}_*.parquet' ) ):
+            if antigo != arquivo:
+                os.remove( antigo )
+    except OSError:
+        pass
+
+    return df1 if columns is None else df1.loc[:, columns]
+
+# ================================================================================
+
+_dataset_cache = {}
+_dataset_lock = threading.Lock()
+
+def load_dataset( path=DATASET_PATH, columns=None ):
+    """ Esta função carrega e limpa o dataset uma única vez por processo.
+
+        O dataframe limpo fica guardado em memória e é compartilhado por todas as
+        sessões e páginas do Streamlit. Ele só é carregado novamente quando a
+        versão do arquivo ( mtime/tamanho ) muda. A carga vem do snapshot Parquet
+        ( load_snapshot ), que evita refazer a leitura e a limpeza do CSV.
+
+        O dataframe retornado é somente leitura: as páginas devem filtrá-lo com .loc
+        ( que gera uma cópia ) e nunca alterar suas colunas diretamente.
+
+        Input: Caminho do arquivo CSV, colunas usadas pela página ( None = todas )
+        Output: Dataframe limpo
+    """
+    version = dataset_version( path )
+    key = ( path, None if columns is None else tuple( sorted( columns ) ) )
+
+    with _dataset_lock:
+        cached = _dataset_cache.get( key )
+
+        if cached is None or cached[0] != version:
+            cached = ( version, load_snapshot( path, columns ) )
+            _dataset_cache[key] = cached
+
+    return cached[1]
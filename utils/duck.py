@@ -0,0 +1,263 @@
+# Libraries
+import os
+import threading
+
+# bibliotecas necessarias
+import pandas as pd
+
+from utils.data import ( COMPACT_DTYPES, DATASET_PATH, SNAPSHOT_DIR, CLEAN_VERSION, add_derived_columns, clean_code,
+                         compact_dtypes, dataset_hash, dataset_version, load_snapshot, read_dataset, snapshot_path )
+
+# Dependência opcional: só é necessária com CURRY_BACKEND=duckdb ( pip install duckdb )
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Origem do banco DuckDB: parquet ( consulta o snapshot limpo, sem cópia ) ou csv ( tabela gravada em disco )
+DUCKDB_SOURCE = os.environ.get( 'CURRY_DUCKDB_SOURCE', 'parquet' )
+
+# Nome da tabela ( ou view ) com as linhas limpas
+DUCKDB_TABLE = 'entregas'
+
+# Linhas lidas por bloco ao montar a tabela a partir do CSV
+DUCKDB_CHUNKSIZE = int( os.environ.get( 'CURRY_CHUNKSIZE', 200_000 ) )
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _quote( coluna ):
+    # Nome de coluna entre aspas ( ex.: "Time_taken(min)" )
+    return '"' + coluna.replace( '"', '""' ) + '"'
+
+# ================================================================================
+
+def duckdb_path( path=DATASET_PATH ):
+    """ Esta função monta o caminho do banco DuckDB montado a partir do CSV.
+
+        Como o snapshot Parquet, o nome combina o hash do CSV e a versão da limpeza.
+
+        Input: Caminho do arquivo CSV
+        Output: Caminho do arquivo .duckdb
+    """
+    nome = os.path.splitext( os.path.basename( path ) )[0]
+
+    return os.path.join( SNAPSHOT_DIR, f'{nome}_{dataset_hash( path )}_v{CLEAN_VERSION}.duckdb' )
+
+# ================================================================================
+
+def build_duckdb_from_csv( path=DATASET_PATH, chunksize=DUCKDB_CHUNKSIZE ):
+    """ Esta função grava as linhas limpas do CSV em um banco DuckDB, bloco a bloco.
+
+        Cada bloco passa pelas mesmas regras de limpeza e tipos do snapshot ( clean_code,
+        add_derived_columns e compact_dtypes ), então a memória usada fica limitada a um bloco.
+
+        Input: Caminho do arquivo CSV, quantidade de linhas por bloco
+        Output: Caminho do arquivo .duckdb
+    """
+    arquivo = duckdb_path( path )
+    if os.path.exists( arquivo ):
+        return arquivo
+
+    os.makedirs( SNAPSHOT_DIR, exist_ok=True )
+
+    # Grava em um arquivo temporário e troca de nome, para outro processo nunca abrir um banco pela metade
+    temporario = f'{arquivo}.{os.getpid()}.tmp'
+    con = duckdb.connect( temporario )
+
+    try:
+        for i, chunk in enumerate( read_dataset( path, chunksize=chunksize ) ):
+            bloco = compact_dtypes( add_derived_columns( clean_code( chunk ) ) )
+
+            # Categorias de cada bloco são diferentes: as colunas vão como texto ( VARCHAR )
+            bloco = bloco.astype( { col: 'object' for col in bloco.columns if isinstance( bloco[col].dtype, pd.CategoricalDtype ) } )
+
+            con.register( 'bloco', bloco )
+            if i == 0:
+                con.execute( f'CREATE TABLE {DUCKDB_TABLE} AS SELECT * FROM bloco' )
+            else:
+                con.execute( f'INSERT INTO {DUCKDB_TABLE} SELECT * FROM bloco' )
+            con.unregister( 'bloco' )
+    finally:
+        con.close()
+
+    os.replace( temporario, arquivo )
+
+    return arquivo
+
+# ================================================================================
+
+def connect_duckdb( path=DATASET_PATH, source=DUCKDB_SOURCE ):
+    """ Esta função abre a conexão DuckDB com a tabela das linhas limpas.
+
+        1. parquet: view sobre o snapshot Parquet ( gravado por load_snapshot se ainda não existe );
+           o DuckDB lê só as colunas de cada consulta, em paralelo.
+        2. csv: banco gravado em disco a partir do CSV ( build_duckdb_from_csv ), aberto só para leitura.
+
+        Input: Caminho do arquivo CSV, origem ( parquet ou csv )
+        Output: Conexão DuckDB
+    """
+    if duckdb is None:
+        raise RuntimeError( 'CURRY_BACKEND=duckdb precisa do pacote duckdb ( pip install duckdb ).' )
+
+    if source == 'csv':
+        return duckdb.connect( build_duckdb_from_csv( path ), read_only=True )
+
+    if source != 'parquet':
+        raise ValueError( f'Origem do DuckDB desconhecida: {source} ( use parquet ou csv )' )
+
+    arquivo = snapshot_path( path )
+    if not os.path.exists( arquivo ):
+        load_snapshot( path, columns=[ 'ID' ] )
+
+    con = duckdb.connect()
+    con.execute( f"CREATE VIEW {DUCKDB_TABLE} AS SELECT * FROM read_parquet( '{arquivo}' )" )
+
+    return con
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class DuckDBRows:
+    """ Linhas do dataset no DuckDB com os filtros da barra lateral aplicados.
+
+        Responde às mesmas agregações do cubo e das linhas em pandas com SQL:
+        filter_cube, count_by, moments_by ( utils.cube ), orders_per_deliver_by_week
+        ( utils.visao_empresa ) e group_means ( utils.ranking ) chamam os métodos
+        desta classe quando recebem um DuckDBRows no lugar do dataframe. Assim as funções
+        das páginas ( order_metric, traffic_order_city, top_couriers, ... ) rodam sem mudanças.
+
+        Os resultados seguem as regras do pandas: grupos com dimensão nula são descartados
+        ( dropna ), as linhas saem ordenadas pelas dimensões e as dimensões categóricas do
+        dataset voltam como categorias com todos os valores da tabela ( como no cubo ).
+
+        Input: Conexão DuckDB, condições SQL e parâmetros dos filtros, categorias já lidas
+    """
+
+    def __init__( self, con, conditions=(), params=(), categories=None ):
+        self.con = con
+        self.conditions = tuple( conditions )
+        self.params = tuple( params )
+        self.categories = {} if categories is None else categories
+
+    def category_dtype( self, column ):
+        """ Esta função retorna o tipo categórico de uma coluna, com os valores distintos da
+            tabela inteira em ordem ( lidos uma única vez e compartilhados pelos filtros ).
+
+            Input: Nome da coluna
+            Output: pd.CategoricalDtype
+        """
+        if column not in self.categories:
+            col = _quote( column )
+            valores = self.con.cursor().execute( f'SELECT DISTINCT {col} FROM {DUCKDB_TABLE} '
+                                                 f'WHERE {col} IS NOT NULL ORDER BY {col}' ).df()[column]
+            self.categories[column] = pd.CategoricalDtype( valores.to_numpy() )
+
+        return self.categories[column]
+
+    def filter( self, date_limit, traffic_options=None, conditions_options=None ):
+        """ Esta função aplica os filtros da barra lateral ( mesmas regras de filter_cube ).
+
+            Input: Data limite ( exclusiva ), densidades de trânsito e condições climáticas ( None = sem filtro )
+            Output: DuckDBRows com os filtros acumulados
+        """
+        conditions = list( self.conditions ) + [ 'Order_Date < ?' ]
+        params = list( self.params ) + [ pd.Timestamp( date_limit ).to_pydatetime( warn=False ) ]
+
+        if traffic_options is not None:
+            conditions.append( 'list_contains( ?::VARCHAR[], Road_traffic_density )' )
+            params.append( list( traffic_options ) )
+
+        if conditions_options is not None:
+            conditions.append( 'list_contains( ?::VARCHAR[], Weatherconditions )' )
+            params.append( list( conditions_options ) )
+
+        return DuckDBRows( self.con, conditions, params, self.categories )
+
+    def query( self, select, dimensions ):
+        """ Esta função executa uma agregação por dimensões sobre as linhas filtradas.
+
+            Cada consulta usa um cursor próprio, então a conexão pode ser compartilhada entre threads.
+
+            Input: Expressões do SELECT ( além das dimensões ), lista de dimensões
+            Output: Dataframe com as dimensões e as colunas agregadas
+        """
+        colunas = [ _quote( col ) for col in dimensions ]
+        conditions = list( self.conditions ) + [ f'{col} IS NOT NULL' for col in colunas ]
+
+        sql = f'SELECT {", ".join( colunas + [ select ] )} FROM {DUCKDB_TABLE}'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join( conditions )
+        if colunas:
+            sql += f' GROUP BY {", ".join( colunas )} ORDER BY {", ".join( colunas )}'
+
+        df_aux = self.con.cursor().execute( sql, list( self.params ) ).df()
+
+        return df_aux.astype( { col: self.category_dtype( col ) for col in dimensions
+                                if COMPACT_DTYPES.get( col ) == 'category' } )
+
+    def count_by( self, dimensions ):
+        """ Esta função conta os pedidos por dimensões ( como count_by do cubo ).
+
+            Input: Lista de dimensões
+            Output: Dataframe com as dimensões e a coluna ID
+        """
+        return self.query( 'count(*) AS ID', dimensions )
+
+    def moments_by( self, dimensions, measure ):
+        """ Esta função calcula a média e o desvio padrão amostral de uma medida por dimensões.
+
+            Input: Lista de dimensões ( vazia = total ), nome da medida
+            Output: Dataframe com as dimensões e as colunas mean e std
+        """
+        col = _quote( measure )
+
+        return self.query( f'avg( {col}::DOUBLE ) AS mean, stddev_samp( {col}::DOUBLE ) AS std', dimensions )
+
+    def nunique_by( self, dimensions, column ):
+        """ Esta função conta os valores distintos de uma coluna por dimensões.
+
+            Input: Lista de dimensões, nome da coluna
+            Output: Dataframe com as dimensões e a coluna contada
+        """
+        return self.query( f'count( DISTINCT {_quote( column )} ) AS {_quote( column )}', dimensions )
+
+    def means_by( self, dimensions, measure ):
+        """ Esta função calcula a média de uma medida por dimensões ( como group_means ).
+
+            Input: Lista de dimensões, nome da medida
+            Output: Série com a média, indexada pelas dimensões e ordenada
+        """
+        col = _quote( measure )
+
+        return self.query( f'avg( {col}::DOUBLE ) AS {col}', dimensions ).set_index( dimensions )[measure]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+_duckdb_cache = {}
+_duckdb_lock = threading.Lock()
+
+def load_duckdb( path=DATASET_PATH, source=DUCKDB_SOURCE ):
+    """ Esta função abre o banco DuckDB uma única vez por processo, origem e versão do dataset.
+
+        Input: Caminho do arquivo CSV, origem ( parquet ou csv )
+        Output: DuckDBRows sem filtros ( compartilhado entre sessões )
+    """
+    version = dataset_version( path )
+
+    with _duckdb_lock:
+        cached = _duckdb_cache.get( ( path, source ) )
+
+        if cached is None or cached[0] != version:
+            cached = ( version, DuckDBRows( connect_duckdb( path, source ) ) )
+            _duckdb_cache[( path, source )] = cached
+
+    return cached[1]
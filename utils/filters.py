@@ -0,0 +1,104 @@
+# Libraries
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+
+from utils.data import DATASET_PATH, dataset_version, load_dataset, memory_usage_mb
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Colunas categóricas filtradas pela barra lateral
+FILTER_COLUMNS = [ 'Road_traffic_density', 'Weatherconditions' ]
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class FilterIndex:
+    """ Índice para aplicar os filtros da barra lateral sem varrer o dataframe inteiro.
+
+        1. As linhas ficam ordenadas por Order_Date, então o corte de data é uma busca
+           binária que devolve o tamanho do prefixo selecionado.
+        2. Cada valor de trânsito e de clima tem um bitmap ( np.packbits ) com as linhas
+           que possuem aquele valor.
+        3. A seleção combina os bitmaps com OR ( valores de uma mesma coluna ) e AND
+           ( entre colunas ) apenas no prefixo da data, e materializa as linhas uma única vez.
+
+        Input: Dataframe limpo ( somente leitura )
+    """
+
+    def __init__( self, df1, columns=FILTER_COLUMNS ):
+        if not df1['Order_Date'].is_monotonic_increasing:
+            df1 = df1.sort_values( 'Order_Date', kind='stable' )
+
+        self.df1 = df1
+        self.dates = df1['Order_Date'].to_numpy()
+        self.memory_mb = memory_usage_mb( df1 )
+        self.bitmaps = {}
+
+        for col in columns:
+            if col not in df1:
+                continue
+
+            codes, valores = df1[col].factorize()
+            self.bitmaps[col] = { valor: np.packbits( codes == i ) for i, valor in enumerate( valores ) }
+
+    def select( self, date_limit, traffic_options=None, conditions_options=None ):
+        """ Esta função retorna as linhas com Order_Date < date_limit e com trânsito e clima
+            entre os valores selecionados ( None = sem filtro na coluna ).
+
+            Input: Data limite ( exclusiva ), densidades de trânsito e condições climáticas
+            Output: Dataframe com as linhas selecionadas
+        """
+        n_linhas = int( np.searchsorted( self.dates, np.datetime64( date_limit ), side='left' ) )
+        n_bytes = ( n_linhas + 7 ) // 8
+
+        selecao = None
+
+        for col, options in ( ( 'Road_traffic_density', traffic_options ),
+                              ( 'Weatherconditions', conditions_options ) ):
+            if options is None:
+                continue
+
+            bitmap = np.zeros( n_bytes, dtype='uint8' )
+            for valor in options:
+                if valor in self.bitmaps[col]:
+                    bitmap |= self.bitmaps[col][valor][:n_bytes]
+
+            selecao = bitmap if selecao is None else selecao & bitmap
+
+        if selecao is None:
+            return self.df1.iloc[:n_linhas]
+
+        linhas = np.flatnonzero( np.unpackbits( selecao, count=n_linhas ) )
+
+        return self.df1.iloc[linhas]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+def load_filter_index( path=DATASET_PATH, columns=None ):
+    """ Esta função monta o índice de filtros uma única vez por processo, versão do dataset
+        e conjunto de colunas ( o mesmo usado em load_dataset ).
+
+        Input: Caminho do arquivo CSV, colunas usadas pela página ( None = todas )
+        Output: FilterIndex compartilhado entre sessões
+    """
+    version = dataset_version( path )
+    key = ( path, None if columns is None else tuple( sorted( columns ) ) )
+
+    with _index_lock:
+        cached = _index_cache.get( key )
+
+        if cached is None or cached[0] != version:
+            cached = ( version, FilterIndex( load_dataset( path, columns ) ) )
+            _index_cache[key] = cached
+
+    return cached[1]
@@ -0,0 +1,106 @@
+# bibliotecas necessarias
+import numpy as np
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Mesmo raio médio da Terra usado pela biblioteca haversine
+EARTH_RADIUS_KM = 6371.0088
+
+# Tamanho ( em graus ) das células da grade espacial ( ~1 km no equador )
+GRID_CELL_DEGREES = 0.01
+
+# Célula atribuída às coordenadas nulas
+NO_CELL = -1
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def haversine_np( lat1, lon1, lat2, lon2 ):
+    """ Esta função calcula a distância do grande círculo ( fórmula de haversine ) entre
+        dois conjuntos de pontos, de forma vetorizada com NumPy.
+
+        É equivalente a chamar haversine( (lat1, lon1), (lat2, lon2) ) linha a linha,
+        mas processa todas as linhas de uma vez.
+
+        Input: Arrays ( ou Séries ) de latitude e longitude em graus dos dois pontos
+        Output: Array com a distância em km
+    """
+    lat1, lon1, lat2, lon2 = ( np.radians( np.asarray( valores, dtype='float64' ) )
+                               for valores in ( lat1, lon1, lat2, lon2 ) )
+
+    d = ( np.sin( ( lat2 - lat1 ) * 0.5 ) ** 2
+          + np.cos( lat1 ) * np.cos( lat2 ) * np.sin( ( lon2 - lon1 ) * 0.5 ) ** 2 )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin( np.sqrt( d ) )
+
+# ================================================================================
+
+def delivery_distance( df1 ):
+    """ Esta função calcula a distância entre o restaurante e o local de entrega de cada pedido.
+
+        Input: Dataframe com as coordenadas do restaurante e do local de entrega
+        Output: Array float32 com a distância em km
+    """
+    distancia = haversine_np( df1['Restaurant_latitude'], df1['Restaurant_longitude'],
+                              df1['Delivery_location_latitude'], df1['Delivery_location_longitude'] )
+
+    return distancia.astype( 'float32' )
+
+# ================================================================================
+
+def grid_cell( latitudes, longitudes, cell_degrees=GRID_CELL_DEGREES ):
+    """ Esta função atribui cada coordenada a uma célula de uma grade regular de latitude/longitude.
+
+        A célula é um inteiro: linha * quantidade de colunas + coluna, contando a partir de
+        ( -90, -180 ). Coordenadas nulas recebem NO_CELL.
+
+        Input: Arrays de latitude e longitude em graus, tamanho da célula em graus
+        Output: Array int64 com a célula de cada coordenada
+    """
+    latitudes = np.asarray( latitudes, dtype='float64' )
+    longitudes = np.asarray( longitudes, dtype='float64' )
+
+    n_colunas = int( np.ceil( 360 / cell_degrees ) )
+    validos = ~( np.isnan( latitudes ) | np.isnan( longitudes ) )
+
+    with np.errstate( invalid='ignore' ):
+        linhas = np.floor( ( latitudes + 90 ) / cell_degrees )
+        colunas = np.floor( ( longitudes + 180 ) / cell_degrees ) % n_colunas
+
+    return np.where( validos, linhas * n_colunas + colunas, NO_CELL ).astype( 'int64' )
+
+# ================================================================================
+
+def cell_center( cells, cell_degrees=GRID_CELL_DEGREES ):
+    """ Esta função retorna a coordenada do centro de cada célula da grade ( inverso de grid_cell ).
+
+        Input: Array de células, tamanho da célula em graus
+        Output: Tupla ( latitudes, longitudes ) em graus
+    """
+    cells = np.asarray( cells, dtype='int64' )
+    n_colunas = int( np.ceil( 360 / cell_degrees ) )
+
+    return ( ( cells // n_colunas + 0.5 ) * cell_degrees - 90,
+             ( cells % n_colunas + 0.5 ) * cell_degrees - 180 )
+
+# ================================================================================
+
+def neighbor_cells( cell, radius=1, cell_degrees=GRID_CELL_DEGREES ):
+    """ Esta função lista as células de um quadrado de ( 2 * radius + 1 )² células em volta de uma célula.
+
+        Input: Célula central, raio em células, tamanho da célula em graus
+        Output: Array int64 com as células vizinhas ( incluindo a central )
+    """
+    n_colunas = int( np.ceil( 360 / cell_degrees ) )
+    n_linhas = int( np.ceil( 180 / cell_degrees ) )
+
+    deslocamentos = np.arange( -radius, radius + 1 )
+    linhas = cell // n_colunas + deslocamentos
+    colunas = ( cell % n_colunas + deslocamentos ) % n_colunas
+
+    linhas = linhas[( linhas >= 0 ) & ( linhas < n_linhas )]
+
+    return ( linhas[:, None] * n_colunas + colunas[None, :] ).ravel()
@@ -0,0 +1,175 @@
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+import folium
+from folium.plugins import HeatMap
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Tamanho da célula ( em graus ) usada para agrupar as entregas do mapa de calor ( ~1 km )
+MAP_CELL_DEGREES = 0.01
+
+# Quantidade máxima de células enviadas ao navegador: acima disso a célula dobra de tamanho
+MAX_HEAT_CELLS = 20_000
+
+# Altura e largura do mapa na página
+MAP_HEIGHT = 600
+MAP_WIDTH = 1024
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _aggregate_cells( linhas, colunas, pesos=None ):
+    """ Esta função soma os pesos das linhas que caem na mesma célula ( linha, coluna ) da grade.
+
+        Usa uma chave inteira por célula e pd.factorize ( hash, O(n) ) em vez de ordenar.
+
+        Input: Arrays com a linha e a coluna de cada ponto, pesos ( None = 1 por ponto )
+        Output: Tupla ( linhas, colunas, contagem ) com uma posição por célula ocupada
+    """
+    if len( linhas ) == 0:
+        vazio = np.zeros( 0, dtype='int64' )
+        return vazio, vazio, vazio
+
+    linha_min = linhas.min()
+    coluna_min = colunas.min()
+    largura = colunas.max() - coluna_min + 1
+
+    codigos, chaves = pd.factorize( ( linhas - linha_min ) * largura + ( colunas - coluna_min ) )
+    contagem = np.bincount( codigos, weights=pesos, minlength=len( chaves ) ).astype( 'int64' )
+
+    return chaves // largura + linha_min, chaves % largura + coluna_min, contagem
+
+# ================================================================================
+
+def bin_locations( latitudes, longitudes, cell_degrees=MAP_CELL_DEGREES, max_cells=MAX_HEAT_CELLS ):
+    """ Esta função agrupa as coordenadas em células de uma grade regular e conta as
+        entregas de cada célula.
+
+        O tamanho da saída depende só da quantidade de células ocupadas, não da quantidade
+        de entregas; se passar de max_cells, a célula dobra de tamanho ( juntando as células
+        já contadas, sem voltar às entregas ) até caber.
+
+        Input: Arrays de latitude e longitude, tamanho da célula em graus, máximo de células
+        Output: Dataframe com latitude e longitude do centro da célula e a quantidade ( count )
+    """
+    latitudes = np.asarray( latitudes, dtype='float64' )
+    longitudes = np.asarray( longitudes, dtype='float64' )
+
+    validos = ~( np.isnan( latitudes ) | np.isnan( longitudes ) )
+
+    linhas, colunas, contagem = _aggregate_cells( np.floor( latitudes[validos] / cell_degrees ).astype( 'int64' ),
+                                                  np.floor( longitudes[validos] / cell_degrees ).astype( 'int64' ) )
+
+    while len( contagem ) > max_cells:
+        cell_degrees *= 2
+        linhas, colunas, contagem = _aggregate_cells( linhas // 2, colunas // 2, contagem )
+
+    return pd.DataFrame( { 'latitude': ( linhas + 0.5 ) * cell_degrees,
+                           'longitude': ( colunas + 0.5 ) * cell_degrees,
+                           'count': contagem } )
+
+# ================================================================================
+
+def median_locations( df1 ):
+    """ Esta função calcula a mediana da localização das entregas por Cidade e por
+        densidade de tráfego.
+
+        Input: Dataframe
+        Output: Dataframe com City, Road_traffic_density e a mediana das coordenadas
+    """
+    return ( df1.loc[ :, ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']]
+                .groupby( ['City', 'Road_traffic_density'], observed=True )
+                .median()
+                .reset_index() )
+
+# ================================================================================
+
+def median_locations_approx( df_quantiles ):
+    """ Esta função calcula a mediana da localização das entregas por Cidade e por densidade
+        de tráfego pelos sketches de quantis do modo streaming, sem as linhas ( erro de até meia
+        faixa, utils.quantiles.LOCATION_BIN_DEGREES ).
+
+        Input: Sketches de quantis já filtrados, com as coordenadas ( utils.quantiles.stream_quantiles )
+        Output: Dataframe com City, Road_traffic_density e a mediana das coordenadas
+    """
+    dimensoes = ['City', 'Road_traffic_density']
+    colunas = ['Delivery_location_latitude', 'Delivery_location_longitude']
+
+    df_aux = [ df_quantiles.quantiles_by( col, dimensoes, [0.5] ).set_index( dimensoes ).set_axis( [col], axis=1 )
+               for col in colunas ]
+
+    return df_aux[0].join( df_aux[1], how='inner' ).reset_index()
+
+# ================================================================================
+
+def build_country_map( df1, df_medians=None ):
+    """ Esta função monta o mapa das entregas em duas camadas.
+
+        1. Mapa de calor com as entregas agrupadas em células ( bin_locations ), quando há linhas.
+        2. Marcadores com a mediana da localização por Cidade e densidade de tráfego.
+
+        Input: Dataframe ( None = só os marcadores ), medianas já calculadas ( None = median_locations )
+        Output: folium.Map
+    """
+    if df1 is None:
+        df_cells = bin_locations( [], [] )
+    else:
+        df_cells = bin_locations( df1['Delivery_location_latitude'].to_numpy(),
+                                  df1['Delivery_location_longitude'].to_numpy() )
+    df_aux = median_locations( df1 ) if df_medians is None else df_medians
+
+    map = folium.Map()
+
+    if len( df_cells ) > 0:
+        pesos = df_cells['count'].to_numpy() / df_cells['count'].max()
+        pontos = np.column_stack( [ df_cells['latitude'].to_numpy(), df_cells['longitude'].to_numpy(), pesos ] )
+
+        HeatMap( pontos.tolist(), name='Densidade de entregas', radius=12 ).add_to( map )
+
+        map.fit_bounds( [ [ df_cells['latitude'].min(), df_cells['longitude'].min() ],
+                          [ df_cells['latitude'].max(), df_cells['longitude'].max() ] ] )
+
+    elif len( df_aux ) > 0:
+        map.fit_bounds( [ [ df_aux['Delivery_location_latitude'].min(), df_aux['Delivery_location_longitude'].min() ],
+                          [ df_aux['Delivery_location_latitude'].max(), df_aux['Delivery_location_longitude'].max() ] ] )
+
+    marcadores = folium.FeatureGroup( name='Mediana por cidade e tráfego' )
+
+    for city, traffic, lat, lon in zip( df_aux['City'].to_numpy(), df_aux['Road_traffic_density'].to_numpy(),
+                                        df_aux['Delivery_location_latitude'].to_numpy(),
+                                        df_aux['Delivery_location_longitude'].to_numpy() ):
+        folium.Marker( [ lat, lon ], popup=f'{city} | {traffic}' ).add_to( marcadores )
+
+    marcadores.add_to( map )
+    folium.LayerControl().add_to( map )
+
+    return map
+
+# ================================================================================
+
+def render_map_html( map, height=MAP_HEIGHT ):
+    """ Esta função gera o HTML do mapa ( o mesmo que o folium_static envia ao navegador ).
+
+        Input: folium.Map, altura em pixels
+        Output: String com o HTML
+    """
+    fig = folium.Figure( height=height ).add_child( map )
+
+    return fig.render()
+
+# ================================================================================
+
+def country_map_html( df1, df_medians=None ):
+    """ Esta função monta o mapa das entregas e retorna o HTML.
+
+        O HTML é guardado por estado dos filtros no cache de artefatos das páginas
+        ( utils.reports.PageArtifacts ).
+
+        Input: Dataframe já filtrado ( None = só os marcadores ), medianas já calculadas ( None = median_locations )
+        Output: String com o HTML do mapa
+    """
+    return render_map_html( build_country_map( df1, df_medians ) )
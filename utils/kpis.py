@@ -0,0 +1,163 @@
+# Libraries
+import json
+import os
+
+# bibliotecas necessarias
+import pandas as pd
+
+from utils.cache import LRUCache
+from utils.cube import count_by, filter_cube, load_cube, moments_by
+from utils.data import DATASET_PATH, dataset_version
+from utils.duck import load_duckdb
+from utils.filters import load_filter_index
+from utils.lazy import load_lazy
+from utils.ranking import top_couriers
+from utils.streaming import ROWS_UNAVAILABLE_MESSAGE, STREAMING_MODE
+from utils.visao_empresa import orders_per_deliver_by_week, traffic_share
+from utils.visao_entregadores import ratings_by
+from utils.visao_restaurantes import avg_std_time_by
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Backend das agregações: pandas ( cubo e índice de filtros em memória ), duckdb ( SQL, utils.duck )
+# ou polars ( lazy frames, utils.lazy )
+BACKEND = os.environ.get( 'CURRY_BACKEND', 'pandas' )
+
+# Colunas das linhas usadas pelos KPIs que não saem do cubo
+KPI_COLUMNS = [ 'ID', 'Order_Date', 'City', 'Road_traffic_density', 'Weatherconditions',
+                'Delivery_person_ID', 'Time_taken(min)' ]
+
+# Sem data limite, todas as datas entram ( o filtro de data é exclusivo )
+NO_DATE_LIMIT = pd.Timestamp.max
+
+# Quantidade de respostas guardadas em memória, uma por ( filtros, KPIs )
+KPI_CACHE_SIZE = 256
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _records( df_aux ):
+    """ Esta função converte um dataframe em uma lista de dicionários serializável em JSON
+        ( datas em ISO 8601 e NaN como null ).
+
+        Input: Dataframe
+        Output: Lista de dicionários
+    """
+    return json.loads( df_aux.to_json( orient='records', date_format='iso' ) )
+
+# ================================================================================
+
+def _top_couriers( df1 ):
+    mais_rapidos, mais_lentos = top_couriers( df1, k=10 )
+
+    return { 'fastest': _records( mais_rapidos ), 'slowest': _records( mais_lentos ) }
+
+# ================================================================================
+
+# KPI: ( usa as linhas?, função que recebe ( df_cube, df1 ) e retorna um valor serializável )
+KPIS = {
+    'orders_by_day': ( False, lambda df_cube, df1: _records( count_by( df_cube, ['Order_Date'] ) ) ),
+    'orders_by_week': ( False, lambda df_cube, df1: _records( count_by( df_cube, ['week_of_year'] ) ) ),
+    'traffic_share': ( False, lambda df_cube, df1: _records( traffic_share( df_cube ) ) ),
+    'orders_by_city_traffic': ( False, lambda df_cube, df1: _records( count_by( df_cube, ['City', 'Road_traffic_density'] ) ) ),
+    'orders_per_courier_by_week': ( True, lambda df_cube, df1: _records( orders_per_deliver_by_week( df1 ) ) ),
+    'time_by_city': ( False, lambda df_cube, df1: _records( moments_by( df_cube, ['City'], 'Time_taken(min)' ) ) ),
+    'time_by_city_traffic': ( False, lambda df_cube, df1: _records( moments_by( df_cube, ['City', 'Road_traffic_density'], 'Time_taken(min)' ) ) ),
+    'time_by_city_order': ( False, lambda df_cube, df1: _records( moments_by( df_cube, ['City', 'Type_of_order'], 'Time_taken(min)' ) ) ),
+    'festival': ( False, lambda df_cube, df1: _records( avg_std_time_by( df_cube, 'Festival' ).reset_index() ) ),
+    'distance_mean': ( False, lambda df_cube, df1: _records( moments_by( df_cube, [], 'distance' ) )[0] ),
+    'ratings_by_traffic': ( False, lambda df_cube, df1: _records( ratings_by( df_cube, 'Road_traffic_density' ) ) ),
+    'ratings_by_weather': ( False, lambda df_cube, df1: _records( ratings_by( df_cube, 'Weatherconditions' ) ) ),
+    'top_couriers': ( True, lambda df_cube, df1: _top_couriers( df1 ) ),
+}
+
+# ================================================================================
+
+def filter_key( date_limit=None, traffic_options=None, conditions_options=None ):
+    """ Esta função normaliza os filtros em uma chave ( a ordem das opções não importa ).
+
+        Input: Data limite ( exclusiva, None = sem limite ), densidades de trânsito e condições
+               climáticas ( None = sem filtro )
+        Output: Tupla ( data, trânsito, clima ) usada nas chaves de cache
+    """
+    data = NO_DATE_LIMIT if date_limit is None else pd.Timestamp( date_limit )
+
+    return ( data.isoformat(),
+             None if traffic_options is None else tuple( sorted( set( traffic_options ) ) ),
+             None if conditions_options is None else tuple( sorted( set( conditions_options ) ) ) )
+
+# ================================================================================
+
+def compute_kpis( date_limit=None, traffic_options=None, conditions_options=None, names=None, path=DATASET_PATH ):
+    """ Esta função calcula os KPIs do dashboard para um conjunto de filtros, com as mesmas
+        funções de agregação das páginas.
+
+        No modo streaming ( CURRY_STREAMING=1 ) os KPIs que precisam das linhas voltam
+        como null e aparecem em unavailable. Com CURRY_BACKEND=duckdb ou polars as mesmas funções
+        agregam sobre as linhas no DuckDB ( utils.duck ) ou em lazy frames do Polars ( utils.lazy ),
+        inclusive as que precisam das linhas.
+
+        Input: Data limite ( exclusiva ), densidades de trânsito, condições climáticas,
+               nomes dos KPIs ( None = todos ), caminho do arquivo CSV
+        Output: Dicionário com filters, kpis e unavailable
+    """
+    names = list( KPIS ) if names is None else list( names )
+    desconhecidos = [ nome for nome in names if nome not in KPIS ]
+    if desconhecidos:
+        raise KeyError( f'KPIs desconhecidos: {", ".join( desconhecidos )}' )
+
+    data, traffic, weather = filter_key( date_limit, traffic_options, conditions_options )
+    data = pd.Timestamp( data )
+
+    if BACKEND == 'duckdb':
+        df_cube = df1 = filter_cube( load_duckdb( path ), data, traffic, weather )
+    elif BACKEND == 'polars':
+        df_cube = df1 = filter_cube( load_lazy( path ), data, traffic, weather )
+    else:
+        df_cube = filter_cube( load_cube( path ), data, traffic, weather )
+
+        df1 = None
+        if not STREAMING_MODE and any( KPIS[nome][0] for nome in names ):
+            df1 = load_filter_index( path, KPI_COLUMNS ).select( data, traffic, weather )
+
+    kpis = {}
+    indisponiveis = []
+
+    for nome in names:
+        usa_linhas, func = KPIS[nome]
+
+        if usa_linhas and df1 is None:
+            kpis[nome] = None
+            indisponiveis.append( nome )
+        else:
+            kpis[nome] = func( df_cube, df1 )
+
+    return { 'filters': { 'date_limit': None if date_limit is None else data.isoformat(),
+                          'traffic': traffic, 'weather': weather },
+             'kpis': kpis,
+             'unavailable': indisponiveis,
+             'message': ROWS_UNAVAILABLE_MESSAGE if indisponiveis else None }
+
+# ================================================================================
+
+_kpi_cache = LRUCache( 'kpis', max_entries=KPI_CACHE_SIZE )
+
+def cached_kpis( date_limit=None, traffic_options=None, conditions_options=None, names=None, path=DATASET_PATH ):
+    """ Esta função retorna os KPIs de compute_kpis já serializados em JSON, guardando a resposta
+        por versão do dataset, filtros e KPIs pedidos.
+
+        As últimas KPI_CACHE_SIZE respostas ficam em memória ( as mais antigas são descartadas ).
+        Requisições simultâneas com a mesma chave esperam um único cálculo.
+
+        Input: Os mesmos de compute_kpis
+        Output: String JSON
+    """
+    key = ( path, dataset_version( path ), filter_key( date_limit, traffic_options, conditions_options ),
+            None if names is None else tuple( sorted( set( names ) ) ) )
+
+    return _kpi_cache.get_or_compute( key, lambda: json.dumps( compute_kpis( date_limit, traffic_options,
+                                                                             conditions_options, names, path ),
+                                                               ensure_ascii=False ) )
@@ -0,0 +1,250 @@
+# Libraries
+import os
+import threading
+
+# bibliotecas necessarias
+import pandas as pd
+
+from utils.data import ( COMPACT_DTYPES, DATASET_PATH, DATE_FORMAT, NAN_COLUMNS, NAN_SENTINEL, STRIP_COLUMNS,
+                         TIME_PREFIX, dataset_version, load_snapshot, snapshot_path )
+from utils.geo import EARTH_RADIUS_KM, GRID_CELL_DEGREES, NO_CELL
+
+# Dependência opcional: só é necessária com CURRY_BACKEND=polars ( pip install polars )
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Origem dos lazy frames: csv ( leitura e limpeza do CSV no mesmo plano ) ou parquet ( snapshot já limpo )
+POLARS_SOURCE = os.environ.get( 'CURRY_POLARS_SOURCE', 'parquet' )
+
+# Colunas numéricas do CSV bruto ( as demais são texto )
+_FLOAT_COLUMNS = [ 'Delivery_person_Age', 'Delivery_person_Ratings', 'Restaurant_latitude', 'Restaurant_longitude',
+                   'Delivery_location_latitude', 'Delivery_location_longitude', 'multiple_deliveries' ]
+
+# Tipos do Polars equivalentes aos tipos compactos do snapshot ( as categorias ficam como texto até o pandas )
+_POLARS_DTYPES = { 'int8': 'Int8', 'int16': 'Int16', 'int32': 'Int32', 'float32': 'Float32', 'category': 'String' }
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _haversine_expr( lat1, lon1, lat2, lon2 ):
+    # Mesma fórmula de utils.geo.haversine_np, como expressão do Polars
+    lat1, lon1, lat2, lon2 = ( pl.col( col ).radians() for col in ( lat1, lon1, lat2, lon2 ) )
+
+    d = ( ( ( lat2 - lat1 ) * 0.5 ).sin() ** 2
+          + lat1.cos() * lat2.cos() * ( ( lon2 - lon1 ) * 0.5 ).sin() ** 2 )
+
+    return 2 * EARTH_RADIUS_KM * d.sqrt().arcsin()
+
+# ================================================================================
+
+def _grid_cell_expr( lat, lon, cell_degrees=GRID_CELL_DEGREES ):
+    # Mesma célula de utils.geo.grid_cell, como expressão do Polars
+    n_colunas = int( -( -360 // cell_degrees ) )
+    linhas = ( ( pl.col( lat ) + 90 ) / cell_degrees ).floor()
+    colunas = ( ( pl.col( lon ) + 180 ) / cell_degrees ).floor() % n_colunas
+
+    return ( pl.when( pl.col( lat ).is_not_null() & pl.col( lon ).is_not_null() )
+               .then( linhas * n_colunas + colunas )
+               .otherwise( NO_CELL ) )
+
+# ================================================================================
+
+def clean_lazy( lf ):
+    """ Esta função aplica as regras de limpeza de clean_code, as colunas derivadas de
+        add_derived_columns e os tipos de compact_dtypes como expressões de um lazy frame.
+
+        Nada é lido nem calculado aqui: o Polars executa só as colunas e linhas que a
+        consulta final pedir ( projeção e predicados empurrados até a leitura do CSV ).
+
+        Input: LazyFrame do CSV bruto ( todas as colunas como texto )
+        Output: LazyFrame com as mesmas colunas e tipos do snapshot limpo
+    """
+    # 1. removendo as linhas com NaN em qualquer coluna obrigatória
+    lf = lf.filter( pl.all_horizontal( [ pl.col( col ).is_not_null() & ( pl.col( col ) != NAN_SENTINEL )
+                                         for col in NAN_COLUMNS ] ) )
+
+    # 2. convertendo as colunas de texto para número ( 'NaN ' vira nulo ) e a data do pedido
+    lf = lf.with_columns(
+        [ pl.when( pl.col( col ) != NAN_SENTINEL ).then( pl.col( col ) ).cast( pl.Float64 ) for col in _FLOAT_COLUMNS ]
+        + [ pl.col( 'Vehicle_condition' ).cast( pl.Int64 ),
+            pl.col( 'Order_Date' ).str.strptime( pl.Date, DATE_FORMAT ).cast( pl.Datetime( 'ns' ) ),
+            # retirando os espaços das strings e limpando a coluna de time taken: '(min) 24' -> 24
+            pl.col( 'Time_taken(min)' ).str.slice( len( TIME_PREFIX ) ).cast( pl.Int64 ) ]
+        + [ pl.col( col ).str.strip_chars() for col in STRIP_COLUMNS ] )
+
+    # 3. colunas derivadas ( calculadas com as coordenadas em float64, como no pandas )
+    lf = lf.with_columns( pl.col( 'Order_Date' ).dt.strftime( '%U' ).alias( 'week_of_year' ),
+                          _haversine_expr( 'Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude',
+                                           'Delivery_location_longitude' ).alias( 'distance' ),
+                          _grid_cell_expr( 'Restaurant_latitude', 'Restaurant_longitude' ).alias( 'restaurant_cell' ),
+                          _grid_cell_expr( 'Delivery_location_latitude', 'Delivery_location_longitude' ).alias( 'delivery_cell' ) )
+
+    # 4. tipos compactos
+    return lf.with_columns( [ pl.col( col ).cast( getattr( pl, _POLARS_DTYPES[tipo] ) ) for col, tipo in COMPACT_DTYPES.items() ]
+                            + [ pl.col( 'distance' ).cast( pl.Float32 ) ] )
+
+# ================================================================================
+
+def scan_dataset( path=DATASET_PATH, source=POLARS_SOURCE ):
+    """ Esta função monta o lazy frame das linhas limpas.
+
+        1. csv: leitura do CSV bruto e limpeza ( clean_lazy ) no mesmo plano; cada consulta lê
+           só as colunas que usa e aplica os filtros durante a leitura.
+        2. parquet: leitura do snapshot limpo ( gravado por load_snapshot se ainda não existe ).
+
+        Input: Caminho do arquivo CSV, origem ( csv ou parquet )
+        Output: LazyFrame
+    """
+    if pl is None:
+        raise RuntimeError( 'CURRY_BACKEND=polars precisa do pacote polars ( pip install polars ).' )
+
+    if source == 'csv':
+        return clean_lazy( pl.scan_csv( path, infer_schema=False ) )
+
+    if source != 'parquet':
+        raise ValueError( f'Origem do Polars desconhecida: {source} ( use csv ou parquet )' )
+
+    arquivo = snapshot_path( path )
+    if not os.path.exists( arquivo ):
+        load_snapshot( path, columns=[ 'ID' ] )
+
+    categorias = [ col for col, tipo in COMPACT_DTYPES.items() if tipo == 'category' ]
+
+    return pl.scan_parquet( arquivo ).with_columns( pl.col( categorias ).cast( pl.String ) )
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class LazyRows:
+    """ Linhas do dataset em um lazy frame do Polars com os filtros da barra lateral aplicados.
+
+        Responde às mesmas agregações de utils.duck.DuckDBRows ( filter, count_by, moments_by,
+        nunique_by e means_by ), então as funções das páginas rodam sem mudanças. Cada
+        agregação é um único plano ( leitura, limpeza, filtros e groupby ) otimizado e executado
+        em paralelo pelo Polars; só o resultado agregado vira pandas, na entrada do gráfico.
+
+        Os resultados seguem as regras do pandas: grupos com dimensão nula são descartados
+        ( dropna ), as linhas saem ordenadas pelas dimensões e as dimensões categóricas
+        voltam como categorias com todos os valores do dataset.
+
+        Input: LazyFrame sem filtros, LazyFrame filtrado ( None = sem filtros ), categorias já lidas
+    """
+
+    def __init__( self, base, lf=None, categories=None ):
+        self.base = base
+        self.lf = base if lf is None else lf
+        self.categories = {} if categories is None else categories
+
+    def category_dtype( self, column ):
+        """ Esta função retorna o tipo categórico de uma coluna, com os valores distintos do
+            dataset inteiro em ordem ( lidos uma única vez e compartilhados pelos filtros ).
+
+            Input: Nome da coluna
+            Output: pd.CategoricalDtype
+        """
+        if column not in self.categories:
+            valores = self.base.select( pl.col( column ).drop_nulls().unique().sort() ).collect()[column]
+            self.categories[column] = pd.CategoricalDtype( valores.to_list() )
+
+        return self.categories[column]
+
+    def filter( self, date_limit, traffic_options=None, conditions_options=None ):
+        """ Esta função aplica os filtros da barra lateral ( mesmas regras de filter_cube ).
+
+            Input: Data limite ( exclusiva ), densidades de trânsito e condições climáticas ( None = sem filtro )
+            Output: LazyRows com os filtros acumulados
+        """
+        predicado = pl.col( 'Order_Date' ) < pd.Timestamp( date_limit ).to_pydatetime( warn=False )
+
+        if traffic_options is not None:
+            predicado &= pl.col( 'Road_traffic_density' ).is_in( list( traffic_options ) )
+
+        if conditions_options is not None:
+            predicado &= pl.col( 'Weatherconditions' ).is_in( list( conditions_options ) )
+
+        return LazyRows( self.base, self.lf.filter( predicado ), self.categories )
+
+    def query( self, aggregations, dimensions ):
+        """ Esta função executa uma agregação por dimensões sobre as linhas filtradas.
+
+            Input: Lista de expressões de agregação, lista de dimensões
+            Output: Dataframe do pandas com as dimensões e as colunas agregadas
+        """
+        if dimensions:
+            lf = ( self.lf.filter( pl.all_horizontal( [ pl.col( col ).is_not_null() for col in dimensions ] ) )
+                          .group_by( dimensions )
+                          .agg( aggregations )
+                          .sort( dimensions ) )
+        else:
+            lf = self.lf.select( aggregations )
+
+        df_aux = lf.collect().to_pandas()
+
+        return df_aux.astype( { col: self.category_dtype( col ) for col in dimensions
+                                if COMPACT_DTYPES.get( col ) == 'category' } )
+
+    def count_by( self, dimensions ):
+        """ Esta função conta os pedidos por dimensões ( como count_by do cubo ).
+
+            Input: Lista de dimensões
+            Output: Dataframe com as dimensões e a coluna ID
+        """
+        return self.query( [ pl.len().cast( pl.Int64 ).alias( 'ID' ) ], dimensions )
+
+    def moments_by( self, dimensions, measure ):
+        """ Esta função calcula a média e o desvio padrão amostral de uma medida por dimensões.
+
+            Input: Lista de dimensões ( vazia = total ), nome da medida
+            Output: Dataframe com as dimensões e as colunas mean e std
+        """
+        valores = pl.col( measure ).cast( pl.Float64 )
+
+        return self.query( [ valores.mean().alias( 'mean' ), valores.std().alias( 'std' ) ], dimensions )
+
+    def nunique_by( self, dimensions, column ):
+        """ Esta função conta os valores distintos de uma coluna por dimensões.
+
+            Input: Lista de dimensões, nome da coluna
+            Output: Dataframe com as dimensões e a coluna contada
+        """
+        return self.query( [ pl.col( column ).drop_nulls().n_unique().cast( pl.Int64 ) ], dimensions )
+
+    def means_by( self, dimensions, measure ):
+        """ Esta função calcula a média de uma medida por dimensões ( como group_means ).
+
+            Input: Lista de dimensões, nome da medida
+            Output: Série com a média, indexada pelas dimensões e ordenada
+        """
+        return self.query( [ pl.col( measure ).cast( pl.Float64 ).mean() ], dimensions ).set_index( dimensions )[measure]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+_lazy_cache = {}
+_lazy_lock = threading.Lock()
+
+def load_lazy( path=DATASET_PATH, source=POLARS_SOURCE ):
+    """ Esta função monta o lazy frame uma única vez por processo, origem e versão do dataset.
+
+        Input: Caminho do arquivo CSV, origem ( csv ou parquet )
+        Output: LazyRows sem filtros ( compartilhado entre sessões )
+    """
+    version = dataset_version( path )
+
+    with _lazy_lock:
+        cached = _lazy_cache.get( ( path, source ) )
+
+        if cached is None or cached[0] != version:
+            cached = ( version, LazyRows( scan_dataset( path, source ) ) )
+            _lazy_cache[( path, source )] = cached
+
+    return cached[1]
@@ -0,0 +1,181 @@
+# Libraries
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from utils.data import DATASET_PATH, dataset_version, load_dataset
+from utils.geo import EARTH_RADIUS_KM
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Colunas usadas para montar a árvore dos restaurantes
+RESTAURANT_COLUMNS = [ 'Restaurant_latitude', 'Restaurant_longitude' ]
+
+# Raios ( km ) do gráfico de cobertura
+COVERAGE_RADII_KM = [ 1, 2, 3, 5, 7.5, 10, 15, 20 ]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def unit_vectors( latitudes, longitudes ):
+    """ Esta função converte coordenadas em vetores unitários 3D ( x, y, z ) sobre a esfera.
+
+        Entre vetores unitários, a distância euclidiana ( corda ) cresce junto com a distância
+        do grande círculo, então uma KD-tree 3D responde consultas de vizinhos em haversine.
+
+        Input: Arrays de latitude e longitude em graus
+        Output: Array ( n, 3 ) float64
+    """
+    lat = np.radians( np.asarray( latitudes, dtype='float64' ) )
+    lon = np.radians( np.asarray( longitudes, dtype='float64' ) )
+
+    return np.column_stack( [ np.cos( lat ) * np.cos( lon ), np.cos( lat ) * np.sin( lon ), np.sin( lat ) ] )
+
+# ================================================================================
+
+def chord_to_km( chord ):
+    """ Esta função converte a corda entre vetores unitários na distância do grande círculo.
+
+        Input: Array de cordas
+        Output: Array de distâncias em km
+    """
+    return 2 * EARTH_RADIUS_KM * np.arcsin( np.clip( np.asarray( chord ) / 2, 0, 1 ) )
+
+# ================================================================================
+
+def km_to_chord( km ):
+    """ Esta função converte uma distância do grande círculo na corda equivalente ( inverso de chord_to_km ).
+
+        Input: Distância em km
+        Output: Corda entre vetores unitários
+    """
+    return 2 * np.sin( np.minimum( np.asarray( km, dtype='float64' ) / ( 2 * EARTH_RADIUS_KM ), np.pi / 2 ) )
+
+# ================================================================================
+
+def share_within( distances, radii ):
+    """ Esta função calcula a fração das distâncias menores ou iguais a cada raio.
+
+        Input: Array de distâncias em km, lista de raios em km
+        Output: Array com a fração para cada raio
+    """
+    distances = np.sort( np.asarray( distances, dtype='float64' ) )
+    distances = distances[~np.isnan( distances )]
+
+    if len( distances ) == 0:
+        return np.full( len( radii ), np.nan )
+
+    return np.searchsorted( distances, radii, side='right' ) / len( distances )
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class RestaurantTree:
+    """ Índice dos restaurantes para consultas de vizinhos a partir dos locais de entrega.
+
+        1. Os restaurantes são os pares únicos ( Restaurant_latitude, Restaurant_longitude ),
+           com a quantidade de pedidos de cada um.
+        2. As coordenadas viram vetores unitários 3D em uma cKDTree, montada uma única vez.
+        3. Consultas de raio e de k vizinhos usam a corda equivalente à distância em km,
+           sem calcular a haversine de todos os pedidos contra todos os restaurantes.
+
+        Input: Dataframe com as coordenadas dos restaurantes
+    """
+
+    def __init__( self, df1 ):
+        df_aux = ( df1.loc[:, RESTAURANT_COLUMNS]
+                      .dropna()
+                      .groupby( RESTAURANT_COLUMNS )
+                      .size()
+                      .reset_index( name='orders' ) )
+
+        df_aux.columns = [ 'latitude', 'longitude', 'orders' ]
+
+        self.restaurants = df_aux
+        self.tree = cKDTree( unit_vectors( df_aux['latitude'], df_aux['longitude'] ) )
+
+    def nearest( self, latitudes, longitudes, k=1 ):
+        """ Esta função encontra os k restaurantes mais próximos de cada ponto.
+
+            Input: Arrays de latitude e longitude dos pontos, quantidade k
+            Output: Tupla ( distâncias em km, posições em self.restaurants ), com forma ( n, k )
+        """
+        k = min( k, len( self.restaurants ) )
+
+        # Sem pontos ( filtros sem entregas ): arrays vazios com a mesma forma ( 0, k )
+        if len( latitudes ) == 0:
+            return np.empty( ( 0, k ) ), np.empty( ( 0, k ), dtype='int64' )
+
+        chord, posicoes = self.tree.query( unit_vectors( latitudes, longitudes ), k=k )
+
+        return chord_to_km( chord ).reshape( len( posicoes ), -1 ), np.asarray( posicoes ).reshape( len( posicoes ), -1 )
+
+    def within( self, latitude, longitude, radius_km ):
+        """ Esta função lista os restaurantes a até radius_km de um ponto.
+
+            Input: Latitude e longitude do ponto, raio em km
+            Output: Dataframe com os restaurantes e a distância ( distance_km ), do mais próximo ao mais distante
+        """
+        ponto = unit_vectors( [ latitude ], [ longitude ] )[0]
+        posicoes = self.tree.query_ball_point( ponto, km_to_chord( radius_km ) )
+
+        df_aux = self.restaurants.iloc[posicoes].copy()
+        df_aux['distance_km'] = chord_to_km( np.linalg.norm( self.tree.data[posicoes] - ponto, axis=1 ) )
+
+        return df_aux.sort_values( 'distance_km' )
+
+    def count_within( self, latitudes, longitudes, radius_km ):
+        """ Esta função conta os restaurantes a até radius_km de cada ponto.
+
+            Input: Arrays de latitude e longitude dos pontos, raio em km
+            Output: Array com a quantidade de restaurantes de cada ponto
+        """
+        return self.tree.query_ball_point( unit_vectors( latitudes, longitudes ), km_to_chord( radius_km ),
+                                           return_length=True )
+
+    def coverage_curve( self, df1, radii=COVERAGE_RADII_KM ):
+        """ Esta função calcula a curva de cobertura das entregas.
+
+            1. nearest_restaurant: fração das entregas com algum restaurante a até r km.
+            2. courier_distance: fração das entregas em que o entregador percorreu até r km
+               ( coluna distance, restaurante do pedido -> local de entrega ).
+
+            Sem entregas, as frações ficam NaN ( share_within ).
+
+            Input: Dataframe com as coordenadas de entrega e a coluna distance, lista de raios
+            Output: Dataframe com radius_km, nearest_restaurant e courier_distance
+        """
+        distancia, _ = self.nearest( df1['Delivery_location_latitude'], df1['Delivery_location_longitude'] )
+
+        return pd.DataFrame( { 'radius_km': radii,
+                               'nearest_restaurant': share_within( distancia[:, 0], radii ),
+                               'courier_distance': share_within( df1['distance'], radii ) } )
+
+# ================================================================================
+
+_tree_cache = {}
+_tree_lock = threading.Lock()
+
+def load_restaurant_tree( path=DATASET_PATH ):
+    """ Esta função monta a árvore dos restaurantes uma única vez por processo e versão do dataset.
+
+        Input: Caminho do arquivo CSV
+        Output: RestaurantTree compartilhada entre sessões e reruns
+    """
+    version = dataset_version( path )
+
+    with _tree_lock:
+        cached = _tree_cache.get( path )
+
+        if cached is None or cached[0] != version:
+            cached = ( version, RestaurantTree( load_dataset( path, RESTAURANT_COLUMNS ) ) )
+            _tree_cache[path] = cached
+
+    return cached[1]
@@ -0,0 +1,156 @@
+# Libraries
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from utils.cache import cache_stats
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Arquivo JSONL com um registro por rerun ( CURRY_PERF_LOG= vazio desliga o log )
+PERF_LOG_PATH = os.environ.get( 'CURRY_PERF_LOG', 'logs/perf.jsonl' )
+
+# Com CURRY_TRACEMALLOC=1 cada etapa também mede o pico de memória alocada pelo Python
+# ( tracemalloc deixa tudo mais lento; use só para investigar )
+TRACEMALLOC_ENABLED = os.environ.get( 'CURRY_TRACEMALLOC', '0' ) == '1'
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class RerunTimer:
+    """ Cronômetro das etapas de um rerun de uma página.
+
+        1. Cada etapa é medida com stage( nome ), em um bloco with.
+        2. Com tracemalloc ligado, guarda também o pico de memória da etapa ( em MB, acima
+           do que já estava alocado no início ). Como o tracemalloc é global, sessões
+           simultâneas entram no mesmo pico.
+        3. finish() fecha o rerun e grava o registro no log ( PERF_LOG_PATH ).
+
+        Input: Nome da página
+    """
+
+    def __init__( self, page, trace_memory=TRACEMALLOC_ENABLED, log_path=PERF_LOG_PATH ):
+        self.page = page
+        self.trace_memory = trace_memory
+        self.log_path = log_path
+        self.stages = []
+        self.start = time.perf_counter()
+        self.total = None
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage( self, name ):
+        """ Esta função mede o tempo ( e o pico de memória ) do bloco with.
+
+            Input: Nome da etapa
+            Output: Nenhum ( a medição é guardada em self.stages )
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memoria_inicio = tracemalloc.get_traced_memory()[0]
+
+        inicio = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            registro = { 'stage': name, 'seconds': time.perf_counter() - inicio }
+
+            if self.trace_memory:
+                registro['peak_mb'] = max( tracemalloc.get_traced_memory()[1] - memoria_inicio, 0 ) / 2**20
+
+            self.stages.append( registro )
+
+    def finish( self ):
+        """ Esta função fecha o rerun e grava o registro no log.
+
+            Input: Nenhum
+            Output: Dicionário com o registro do rerun
+        """
+        self.total = time.perf_counter() - self.start
+
+        registro = { 'timestamp': datetime.datetime.now().isoformat( timespec='milliseconds' ),
+                     'page': self.page,
+                     'pid': os.getpid(),
+                     'total_seconds': self.total,
+                     'stages': self.stages }
+
+        if self.log_path:
+            write_perf_record( registro, self.log_path )
+
+        return registro
+
+    def summary( self ):
+        """ Esta função resume as etapas para exibição, da mais lenta para a mais rápida.
+
+            Input: Nenhum
+            Output: Lista de dicionários com etapa, ms, % do total ( e pico em MB )
+        """
+        total = self.total if self.total is not None else time.perf_counter() - self.start
+        linhas = []
+
+        for registro in sorted( self.stages, key=lambda r: r['seconds'], reverse=True ):
+            linha = { 'etapa': registro['stage'],
+                      'ms': round( registro['seconds'] * 1000, 1 ),
+                      '% do rerun': round( 100 * registro['seconds'] / max( total, 1e-9 ), 1 ) }
+
+            if 'peak_mb' in registro:
+                linha['pico MB'] = round( registro['peak_mb'], 2 )
+
+            linhas.append( linha )
+
+        return linhas
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+_log_lock = threading.Lock()
+
+def write_perf_record( registro, log_path=PERF_LOG_PATH ):
+    """ Esta função acrescenta um registro ao log JSONL ( uma linha por rerun ).
+
+        Falhas de gravação são ignoradas: a instrumentação nunca derruba a página.
+
+        Input: Dicionário do registro, caminho do log
+        Output: Nenhum
+    """
+    try:
+        os.makedirs( os.path.dirname( log_path ) or '.', exist_ok=True )
+
+        with _log_lock, open( log_path, 'a', encoding='utf-8' ) as arquivo:
+            arquivo.write( json.dumps( registro ) + '\n' )
+    except OSError:
+        pass
+
+# ================================================================================
+
+def perf_panel( timer, container ):
+    """ Esta função fecha o rerun e mostra o painel de performance ( recolhido ) no container,
+        com o tempo das etapas e os contadores dos caches do processo.
+
+        Input: RerunTimer da página, container do Streamlit ( ex.: st.sidebar )
+        Output: Registro do rerun
+    """
+    registro = timer.finish()
+
+    painel = container.expander( 'Performance' )
+
+    legenda = f"Rerun: {registro['total_seconds'] * 1000:.0f} ms"
+    if timer.trace_memory:
+        legenda += ' | tracemalloc ligado'
+
+    painel.caption( legenda )
+    painel.dataframe( timer.summary(), hide_index=True, use_container_width=True )
+    painel.dataframe( cache_stats(), hide_index=True, use_container_width=True )
+
+    return registro
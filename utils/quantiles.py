@@ -0,0 +1,234 @@
+# Libraries
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from utils.cube import filter_cube
+from utils.data import ( DATASET_PATH, add_derived_columns, clean_code, dataset_version, load_snapshot,
+                         read_dataset )
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Dimensões das células dos sketches ( filtros das barras laterais e quebras dos gráficos de percentis )
+QUANTILE_DIMENSIONS = [ 'Order_Date', 'City', 'Road_traffic_density', 'Weatherconditions' ]
+
+# Medidas e largura da faixa de valores ( bin ) de cada uma: o tempo é inteiro em minutos ( percentis exatos )
+QUANTILE_MEASURES = { 'Time_taken(min)': 1.0 }
+
+# Coordenadas das entregas ( medianas do mapa ): só entram nos sketches do modo streaming, em que as linhas
+# não ficam em memória ( com as linhas o mapa usa a mediana exata, utils.geomap.median_locations ). A faixa
+# de 0.1° ( erro de até 0.05°, ~5.5 km ) limita cada coordenada a células x ( amplitude / 0.1 ) contagens,
+# ~200 faixas por célula nas coordenadas do dataset, qualquer que seja a quantidade de linhas
+LOCATION_BIN_DEGREES = 0.1
+LOCATION_MEASURES = { 'Delivery_location_latitude': LOCATION_BIN_DEGREES,
+                      'Delivery_location_longitude': LOCATION_BIN_DEGREES }
+
+# Percentis exibidos nas páginas
+PERCENTILES = [ 0.5, 0.9, 0.99 ]
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def percentile_name( q ):
+    """ Esta função retorna o nome da coluna de um percentil ( 0.5 -> p50, 0.99 -> p99 ).
+
+        Input: Percentil entre 0 e 1
+        Output: Nome da coluna
+    """
+    return f'p{q * 100:g}'
+
+# ================================================================================
+
+def bin_counts( df1, measure, width ):
+    """ Esta função conta as linhas de cada célula por faixa de valores de uma medida.
+
+        A faixa de um valor x é round( x / width ); valores nulos são ignorados ( como no median() do pandas ).
+
+        Input: Dataframe limpo ( ou um bloco dele ), nome da medida, largura da faixa
+        Output: Dataframe com as dimensões, bin e count
+    """
+    valores = df1[measure].to_numpy( dtype='float64' )
+    validos = ~np.isnan( valores )
+
+    df_aux = df1.loc[validos, QUANTILE_DIMENSIONS].copy()
+    df_aux['bin'] = np.rint( valores[validos] / width ).astype( 'int32' )
+    df_aux['count'] = 1
+
+    return ( df_aux.groupby( QUANTILE_DIMENSIONS + [ 'bin' ], observed=True, dropna=False )
+                   .sum()
+                   .reset_index() )
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class QuantileSketches:
+    """ Sketches de quantis das medidas por célula ( dia, cidade, trânsito e clima ).
+
+        1. Cada medida guarda a quantidade de valores por célula e faixa de valores ( bin ).
+        2. As contagens são somáveis, então os sketches de blocos do CSV ou de partições
+           são juntados somando, e qualquer combinação de filtros é respondida somando as células
+           selecionadas ( sem ordenar as linhas ).
+        3. Os percentis usam a mesma interpolação linear do quantile() do pandas sobre o valor
+           de cada faixa: exatos para valores inteiros com largura 1, e com erro de até meia
+           largura nas outras medidas.
+
+        Input: Dicionário medida -> dataframe de bin_counts, dicionário medida -> largura da faixa
+    """
+
+    def __init__( self, counts, widths ):
+        self.counts = counts
+        self.widths = widths
+        self.memory_mb = sum( df_aux.memory_usage( deep=True ).sum() for df_aux in counts.values() ) / 2**20
+
+    @classmethod
+    def from_rows( cls, df1, measures=QUANTILE_MEASURES ):
+        """ Esta função monta os sketches a partir das linhas do dataframe limpo.
+
+            Input: Dataframe limpo ( ou um bloco dele ), dicionário medida -> largura da faixa
+            Output: QuantileSketches
+        """
+        return cls( { measure: bin_counts( df1, measure, width ) for measure, width in measures.items() }, dict( measures ) )
+
+    def merge( self, other ):
+        """ Esta função junta dois conjuntos de sketches somando as contagens das mesmas células e faixas.
+
+            Input: QuantileSketches
+            Output: QuantileSketches com a união das células
+        """
+        counts = {}
+
+        for measure, df_aux in self.counts.items():
+            counts[measure] = ( pd.concat( [ df_aux, other.counts[measure] ], ignore_index=True )
+                                  .groupby( QUANTILE_DIMENSIONS + [ 'bin' ], observed=True, dropna=False )
+                                  .sum()
+                                  .reset_index() )
+
+        return QuantileSketches( counts, self.widths )
+
+    def filter( self, date_limit, traffic_options=None, conditions_options=None ):
+        """ Esta função seleciona as células dos filtros da barra lateral ( mesmas regras do cubo ).
+
+            Input: Data limite ( exclusiva ), densidades de trânsito e condições climáticas ( None = sem filtro )
+            Output: QuantileSketches com as células selecionadas
+        """
+        return QuantileSketches( { measure: filter_cube( df_aux, date_limit, traffic_options, conditions_options )
+                                   for measure, df_aux in self.counts.items() }, self.widths )
+
+    def quantiles_by( self, measure, dimensions, percentiles=PERCENTILES ):
+        """ Esta função calcula os percentis de uma medida por uma ou mais dimensões, somando as células.
+
+            1. Soma as contagens por dimensões e faixa ( ordenadas pela faixa dentro de cada grupo ).
+            2. A contagem acumulada localiza, por busca binária, a faixa das posições ( n - 1 ) * q
+               arredondadas para baixo e para cima.
+            3. O percentil interpola linearmente os valores das duas faixas.
+
+            Com a lista de dimensões vazia, retorna uma única linha com o total.
+
+            Input: Nome da medida, lista de dimensões, percentis entre 0 e 1
+            Output: Dataframe com as dimensões e uma coluna por percentil ( p50, p90, ... )
+        """
+        width = self.widths[measure]
+
+        df_aux = ( self.counts[measure].loc[:, dimensions + [ 'bin', 'count' ]]
+                                       .groupby( dimensions + [ 'bin' ], observed=True )
+                                       .sum()
+                                       .reset_index() )
+        df_aux = df_aux.loc[df_aux['count'].to_numpy() > 0, :]
+
+        if dimensions:
+            grupos = df_aux.groupby( dimensions, observed=True )
+            ids = grupos.ngroup().to_numpy()
+            df_quantiles = grupos.size().reset_index().loc[:, dimensions]
+        else:
+            ids = np.zeros( len( df_aux ), dtype='int64' )
+            df_quantiles = pd.DataFrame( index=range( 1 if len( df_aux ) else 0 ) )
+
+        contagem = df_aux['count'].to_numpy( dtype='int64' )
+        valores = df_aux['bin'].to_numpy( dtype='float64' ) * width
+        acumulado = np.cumsum( contagem )
+
+        n = np.bincount( ids, weights=contagem, minlength=len( df_quantiles ) ).astype( 'int64' )
+        inicio = np.cumsum( n ) - n
+
+        for q in percentiles:
+            posicao = ( n - 1 ) * q
+            baixo = np.floor( posicao ).astype( 'int64' )
+            alto = np.ceil( posicao ).astype( 'int64' )
+
+            valor_baixo = valores[np.searchsorted( acumulado, inicio + baixo, side='right' )]
+            valor_alto = valores[np.searchsorted( acumulado, inicio + alto, side='right' )]
+
+            df_quantiles[percentile_name( q )] = valor_baixo + ( posicao - baixo ) * ( valor_alto - valor_baixo )
+
+        return df_quantiles
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def stream_quantiles( path=DATASET_PATH, chunksize=None, measures=None ):
+    """ Esta função monta os sketches lendo o CSV em blocos ( modo streaming ).
+
+        Sem as linhas em memória, os sketches também guardam as coordenadas ( LOCATION_MEASURES ) para as
+        medianas do mapa.
+
+        Input: Caminho do arquivo CSV, quantidade de linhas por bloco ( None = CHUNKSIZE do modo streaming ),
+               dicionário medida -> largura da faixa ( None = tempo e coordenadas )
+        Output: QuantileSketches
+    """
+    if measures is None:
+        measures = { **QUANTILE_MEASURES, **LOCATION_MEASURES }
+
+    # Import local: utils.streaming depende de utils.cube, que é importado por este módulo
+    from utils.streaming import CHUNKSIZE
+
+    sketches = None
+
+    for chunk in read_dataset( path, chunksize=chunksize or CHUNKSIZE ):
+        parcial = QuantileSketches.from_rows( add_derived_columns( clean_code( chunk ) ), measures )
+        sketches = parcial if sketches is None else sketches.merge( parcial )
+
+    # Os blocos chegam com as dimensões em texto: categorias reduzem a memória das contagens
+    for measure, df_aux in sketches.counts.items():
+        sketches.counts[measure] = df_aux.astype( { col: 'category' for col in QUANTILE_DIMENSIONS
+                                                    if df_aux[col].dtype == object } )
+
+    return QuantileSketches( sketches.counts, sketches.widths )
+
+# ================================================================================
+
+_quantile_cache = {}
+_quantile_lock = threading.Lock()
+
+def load_quantiles( path=DATASET_PATH ):
+    """ Esta função monta os sketches de quantis uma única vez por processo e versão do dataset.
+
+        No modo streaming ( CURRY_STREAMING=1 ) os sketches são montados lendo o CSV em blocos e
+        incluem as coordenadas; com as linhas em memória guardam só o tempo de entrega.
+
+        Input: Caminho do arquivo CSV
+        Output: QuantileSketches ( somente leitura, compartilhado entre sessões )
+    """
+    from utils.streaming import STREAMING_MODE
+
+    version = dataset_version( path )
+
+    with _quantile_lock:
+        cached = _quantile_cache.get( path )
+
+        if cached is None or cached[0] != version:
+            if STREAMING_MODE:
+                sketches = stream_quantiles( path )
+            else:
+                sketches = QuantileSketches.from_rows( load_snapshot( path, columns=QUANTILE_DIMENSIONS + list( QUANTILE_MEASURES ) ) )
+
+            cached = ( version, sketches )
+            _quantile_cache[path] = cached
+
+    return cached[1]
@@ -0,0 +1,67 @@
+# bibliotecas necessarias
+import pandas as pd
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def group_means( df1, group, key, measure ):
+    """ Esta função calcula a média de uma medida por ( grupo, chave ) uma única vez.
+
+        Input: Dataframe, coluna do grupo ( ex.: City ), coluna da chave ( ex.: Delivery_person_ID )
+               e coluna da medida ( ex.: Time_taken(min) )
+        Output: Série com a média, indexada por ( grupo, chave ) e ordenada pela chave dentro do grupo
+    """
+    # Outros backends ( utils.duck.DuckDBRows, utils.lazy.LazyRows ) calculam as médias fora do pandas
+    if not isinstance( df1, pd.DataFrame ):
+        return df1.means_by( [group, key], measure )
+
+    return ( df1.loc[:, [group, key, measure]]
+                .groupby( [group, key], observed=True )[measure]
+                .mean() )
+
+# ================================================================================
+
+def top_k_by_group( medias, k=10 ):
+    """ Esta função seleciona, para cada grupo, as k menores e as k maiores médias.
+
+        Cada grupo passa por nsmallest / nlargest ( seleção parcial, sem ordenar a tabela
+        inteira ). As médias chegam ordenadas pela chave dentro do grupo, então keep='first'
+        desempata pela chave, como uma ordenação estável; médias nulas são ignoradas.
+
+        Input: Série de médias indexada por ( grupo, chave ), quantidade k
+        Output: Tupla ( menores, maiores ), dataframes com as colunas do índice e da medida
+    """
+    df_aux = medias.dropna().reset_index()
+    group, measure = df_aux.columns[0], df_aux.columns[-1]
+
+    menores = []
+    maiores = []
+
+    # Posições de cada grupo ( em ordem ); a seleção é feita só na coluna da medida
+    for posicoes in df_aux.groupby( group, observed=True, sort=True ).indices.values():
+        valores = df_aux[measure].iloc[posicoes]
+
+        menores.append( valores.nsmallest( k, keep='first' ).index )
+        maiores.append( valores.nlargest( k, keep='first' ).index )
+
+    if not menores:
+        return df_aux, df_aux.copy()
+
+    return ( df_aux.loc[menores[0].append( menores[1:] )].reset_index( drop=True ),
+             df_aux.loc[maiores[0].append( maiores[1:] )].reset_index( drop=True ) )
+
+# ================================================================================
+
+def top_couriers( df1, k=10 ):
+    """ Esta função retorna os k entregadores mais rápidos e os k mais lentos de cada cidade
+        encontrada nos dados, pela média do tempo de entrega.
+
+        Input: Dataframe, quantidade k
+        Output: Tupla ( mais rápidos, mais lentos ), com as colunas City, Delivery_person_ID
+                e Time_taken(min) arredondada em 2 casas
+    """
+    medias = group_means( df1, 'City', 'Delivery_person_ID', 'Time_taken(min)' )
+    mais_rapidos, mais_lentos = top_k_by_group( medias, k )
+
+    return mais_rapidos.round( 2 ), mais_lentos.round( 2 )
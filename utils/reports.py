@@ -0,0 +1,492 @@
+# Libraries
+import argparse
+import hashlib
+import html
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# bibliotecas necessarias
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.cache import CACHE_BUDGET_MB, LRUCache
+from utils.cube import filter_cube, load_cube
+from utils.data import CLEAN_VERSION, DATASET_PATH, SNAPSHOT_DIR, dataset_hash, dataset_version
+from utils.filters import load_filter_index
+from utils.geomap import country_map_html
+from utils.kpis import filter_key
+from utils.nearest import load_restaurant_tree
+from utils.quantiles import QuantileSketches
+from utils.ranking import top_couriers
+from utils.visao_empresa import ( order_by_week, order_metric, order_share_by_week, traffic_order_city,
+                                  traffic_order_share )
+from utils.visao_entregadores import overall_metrics, ratings_by, ratings_per_deliver
+from utils.visao_restaurantes import ( avg_std_time_by, avg_std_time_graph, avg_std_time_on_traffic, distance_mean,
+                                      restaurant_coverage_graph, single_couriers, time_by_city_order, time_percentiles,
+                                      time_percentiles_graph )
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Pasta dos relatórios ( uma subpasta por hash do CSV e versão da limpeza, como os snapshots )
+REPORTS_DIR = os.path.join( SNAPSHOT_DIR, 'reports' )
+
+# Colunas das linhas usadas por todas as páginas ( um único índice de filtros por processo )
+REPORT_COLUMNS = [ 'ID', 'Order_Date', 'City', 'Road_traffic_density', 'Weatherconditions', 'Delivery_person_ID',
+                   'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition', 'Time_taken(min)',
+                   'Delivery_location_latitude', 'Delivery_location_longitude', 'distance' ]
+
+# Opções das barras laterais ( a grade padrão é o estado inicial das páginas )
+TRAFFIC_OPTIONS = [ 'Low', 'Medium', 'High', 'Jam' ]
+WEATHER_OPTIONS = [ 'conditions Cloudy', 'conditions Fog', 'conditions Sandstorms', 'conditions Stormy',
+                    'conditions Sunny', 'conditions Windy' ]
+DEFAULT_DATE = '2022-04-13'
+
+# Relatórios lidos guardados em memória pelas páginas
+REPORT_CACHE_SIZE = 64
+
+# Artefatos de cada página: nome ( o mesmo da etapa no RerunTimer ) -> função ( df_cube, df1, path )
+# 'weather' indica se a página tem o filtro de condições climáticas
+REPORT_PAGES = {
+    'visao_empresa': {
+        'weather': False,
+        'artifacts': {
+            'order_metric': lambda df_cube, df1, path: order_metric( df_cube ),
+            'traffic_order_share': lambda df_cube, df1, path: traffic_order_share( df_cube ),
+            'traffic_order_city': lambda df_cube, df1, path: traffic_order_city( df_cube ),
+            'order_by_week': lambda df_cube, df1, path: order_by_week( df_cube ),
+            'order_share_by_week': lambda df_cube, df1, path: order_share_by_week( df1 ),
+            'country_maps': lambda df_cube, df1, path: country_map_html( df1 ),
+        },
+    },
+    'visao_entregadores': {
+        'weather': True,
+        'artifacts': {
+            'overall_metrics': lambda df_cube, df1, path: overall_metrics( df1 ),
+            'ratings_per_deliver': lambda df_cube, df1, path: ratings_per_deliver( df1 ),
+            'ratings_by_traffic': lambda df_cube, df1, path: ratings_by( df_cube, 'Road_traffic_density' ),
+            'ratings_by_weather': lambda df_cube, df1, path: ratings_by( df_cube, 'Weatherconditions' ),
+            'top_couriers': lambda df_cube, df1, path: top_couriers( df1, k=10 ),
+        },
+    },
+    'visao_restaurantes': {
+        'weather': True,
+        'artifacts': {
+            'single_couriers': lambda df_cube, df1, path: single_couriers( df1 ),
+            'distance_mean': lambda df_cube, df1, path: distance_mean( df_cube, fig=False ),
+            'avg_std_time_by': lambda df_cube, df1, path: avg_std_time_by( df_cube, 'Festival' ),
+            'avg_std_time_graph': lambda df_cube, df1, path: avg_std_time_graph( df_cube ),
+            'time_by_city_order': lambda df_cube, df1, path: time_by_city_order( df_cube ),
+            'distance_mean_fig': lambda df_cube, df1, path: distance_mean( df_cube, fig=True ),
+            'avg_std_time_on_traffic': lambda df_cube, df1, path: avg_std_time_on_traffic( df_cube ),
+            'time_percentiles': lambda df_cube, df1, path: time_percentiles( QuantileSketches.from_rows( df1 ) ),
+            'time_percentiles_city': lambda df_cube, df1, path: time_percentiles_graph( QuantileSketches.from_rows( df1 ), 'City' ),
+            'time_percentiles_traffic': lambda df_cube, df1, path: time_percentiles_graph( QuantileSketches.from_rows( df1 ), 'Road_traffic_density' ),
+            'restaurant_coverage_graph': lambda df_cube, df1, path: restaurant_coverage_graph( df1, load_restaurant_tree( path ) ),
+        },
+    },
+}
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class Report:
+    """ Relatório pré-calculado de uma página para um estado dos filtros.
+
+        1. Os artefatos ficam serializados e só são convertidos ( figura, tabela ) quando
+           a página pede, uma única vez.
+        2. get( nome, func, *args ) retorna o artefato pré-calculado ou, se ele não existe,
+           o resultado de func( *args ) — a página usa o mesmo código com ou sem relatório.
+
+        Input: Dicionário nome -> artefato serializado ( None = relatório vazio )
+    """
+
+    def __init__( self, artifacts=None ):
+        self.artifacts = artifacts or {}
+        self.loaded = {}
+
+    def __contains__( self, name ):
+        return name in self.artifacts
+
+    def __bool__( self ):
+        return bool( self.artifacts )
+
+    def get( self, name, func, *args ):
+        """ Esta função retorna o artefato do relatório ou calcula com func( *args ).
+
+            Input: Nome do artefato, função e argumentos usados quando ele não existe
+            Output: Figura, dataframe, tupla, dicionário ou valor
+        """
+        if name not in self.artifacts:
+            return func( *args )
+
+        # Duas sessões podem converter o mesmo artefato ao mesmo tempo; o resultado é o mesmo
+        if name not in self.loaded:
+            self.loaded[name] = load_artifact( self.artifacts[name] )
+
+        return self.loaded[name]
+
+# ================================================================================
+
+# Artefatos calculados ao vivo ( figuras, tabelas e métricas ), limitados por CURRY_CACHE_MB
+_artifact_cache = LRUCache( 'artefatos', max_bytes=int( CACHE_BUDGET_MB * 2**20 ) )
+
+class PageArtifacts:
+    """ Artefatos de uma página para o estado atual dos filtros.
+
+        1. get( nome, func, *args ) procura o artefato no relatório pré-calculado.
+        2. Sem relatório, procura no cache do processo ( por versão do dataset, página,
+           filtros e nome ), compartilhado entre sessões.
+        3. Só então calcula func( *args ) e guarda o resultado no cache; os menos usados são
+           descartados quando o cache passa do orçamento de memória ( CURRY_CACHE_MB ).
+
+        Os artefatos são somente leitura: as páginas não devem alterar as figuras e tabelas.
+
+        Input: Nome da página, chave de report_key, Report, caminho do arquivo CSV
+    """
+
+    def __init__( self, page, key, report, path=DATASET_PATH ):
+        self.page = page
+        self.key = key
+        self.report = report
+        self.prefix = ( path, dataset_version( path ), page, key )
+
+    def __contains__( self, name ):
+        if name in self.report:
+            return True
+
+        return self.prefix + ( name, ) in _artifact_cache
+
+    def get( self, name, func, *args ):
+        """ Esta função retorna o artefato do relatório, do cache ou calculado com func( *args ).
+
+            Input: Nome do artefato, função e argumentos usados quando ele não existe
+            Output: Figura, dataframe, tupla, dicionário ou valor
+        """
+        if name in self.report:
+            return self.report.get( name, func, *args )
+
+        return _artifact_cache.get_or_compute( self.prefix + ( name, ), func, *args )
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def dump_artifact( valor ):
+    """ Esta função serializa um artefato de página em um objeto JSON com o tipo.
+
+        Input: Figura do plotly, dataframe, tupla, dicionário, string ou número
+        Output: Dicionário { 'type': ..., 'data': ... }
+    """
+    if isinstance( valor, go.Figure ):
+        return { 'type': 'figure', 'data': json.loads( valor.to_json() ) }
+
+    if isinstance( valor, pd.DataFrame ):
+        return { 'type': 'table', 'data': json.loads( valor.to_json( orient='table', date_format='iso' ) ) }
+
+    if isinstance( valor, tuple ):
+        return { 'type': 'tuple', 'data': [ dump_artifact( item ) for item in valor ] }
+
+    if isinstance( valor, dict ):
+        return { 'type': 'dict', 'data': { chave: dump_artifact( item ) for chave, item in valor.items() } }
+
+    # Escalares do numpy ( ex.: np.float64 ) viram números do Python
+    return { 'type': 'value', 'data': valor.item() if hasattr( valor, 'item' ) else valor }
+
+# ================================================================================
+
+def load_artifact( artefato ):
+    """ Esta função reconstrói um artefato serializado por dump_artifact.
+
+        Input: Dicionário { 'type': ..., 'data': ... }
+        Output: Figura do plotly, dataframe, tupla, dicionário, string ou número
+    """
+    tipo, dados = artefato['type'], artefato['data']
+
+    if tipo == 'figure':
+        return go.Figure( dados )
+
+    if tipo == 'table':
+        return pd.read_json( io.StringIO( json.dumps( dados ) ), orient='table' )
+
+    if tipo == 'tuple':
+        return tuple( load_artifact( item ) for item in dados )
+
+    if tipo == 'dict':
+        return { chave: load_artifact( item ) for chave, item in dados.items() }
+
+    return dados
+
+# ================================================================================
+
+def report_key( page, date_limit=None, traffic_options=None, conditions_options=None ):
+    """ Esta função normaliza os filtros de uma página ( o clima é ignorado nas páginas sem esse filtro ).
+
+        Input: Nome da página, data limite ( exclusiva ), densidades de trânsito e condições climáticas
+        Output: Tupla ( data, trânsito, clima )
+    """
+    if not REPORT_PAGES[page]['weather']:
+        conditions_options = None
+
+    return filter_key( date_limit, traffic_options, conditions_options )
+
+# ================================================================================
+
+def report_path( page, key, path=DATASET_PATH ):
+    """ Esta função monta o caminho do relatório ( sem extensão ) de uma página e chave de filtros.
+
+        A pasta combina o hash do CSV e a versão da limpeza, então um dataset novo nunca
+        lê relatórios antigos.
+
+        Input: Nome da página, chave de report_key, caminho do arquivo CSV
+        Output: Caminho do relatório sem a extensão ( .json e .html )
+    """
+    nome = os.path.splitext( os.path.basename( path ) )[0]
+    pasta = os.path.join( REPORTS_DIR, f'{nome}_{dataset_hash( path )}_v{CLEAN_VERSION}', page )
+    arquivo = hashlib.blake2b( json.dumps( key ).encode(), digest_size=8 ).hexdigest()
+
+    return os.path.join( pasta, arquivo )
+
+# ================================================================================
+
+def build_page_report( page, date_limit=None, traffic_options=None, conditions_options=None, path=DATASET_PATH ):
+    """ Esta função calcula todos os artefatos de uma página para um estado dos filtros,
+        com as mesmas funções usadas pelas páginas.
+
+        Input: Nome da página, data limite ( exclusiva ), densidades de trânsito, condições
+               climáticas, caminho do arquivo CSV
+        Output: Dicionário nome -> artefato ( figura, dataframe, ... )
+    """
+    data, traffic, weather = report_key( page, date_limit, traffic_options, conditions_options )
+    data = pd.Timestamp( data )
+
+    df_cube = filter_cube( load_cube( path ), data, traffic, weather )
+    df1 = load_filter_index( path, REPORT_COLUMNS ).select( data, traffic, weather )
+
+    return { nome: func( df_cube, df1, path ) for nome, func in REPORT_PAGES[page]['artifacts'].items() }
+
+# ================================================================================
+
+def report_html( page, key, artefatos ):
+    """ Esta função monta a versão estática ( HTML ) do relatório: figuras interativas
+        do plotly, tabelas e métricas em uma única página.
+
+        Input: Nome da página, chave dos filtros, dicionário nome -> artefato
+        Output: String com o HTML
+    """
+    partes = [ f'<h1>{html.escape( page )}</h1>',
+               f'<p>Data limite: {key[0]} | Trânsito: {key[1] or "todos"} | Clima: {key[2] or "todos"}</p>' ]
+    plotlyjs = 'cdn'
+
+    def render( valor ):
+        nonlocal plotlyjs
+
+        if isinstance( valor, go.Figure ):
+            trecho = pio.to_html( valor, full_html=False, include_plotlyjs=plotlyjs )
+            plotlyjs = False
+            return trecho
+
+        if isinstance( valor, pd.DataFrame ):
+            return valor.to_html()
+
+        if isinstance( valor, tuple ):
+            return ''.join( render( item ) for item in valor )
+
+        if isinstance( valor, dict ):
+            return '<ul>' + ''.join( f'<li>{html.escape( str( k ) )}: {html.escape( str( v ) )}</li>'
+                                     for k, v in valor.items() ) + '</ul>'
+
+        if isinstance( valor, str ) and valor.lstrip().startswith( '<' ):
+            # Mapa do folium: documento HTML completo, embutido em um iframe
+            return f'<iframe srcdoc="{html.escape( valor )}" width="100%" height="620" style="border:0"></iframe>'
+
+        return f'<p>{html.escape( str( valor ) )}</p>'
+
+    for nome, valor in artefatos.items():
+        partes.append( f'<h2>{html.escape( nome )}</h2>' )
+        partes.append( render( valor ) )
+
+    return '<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>' + '\n'.join( partes ) + '</body></html>'
+
+# ================================================================================
+
+def _write_atomic( arquivo, conteudo ):
+    # Grava em um arquivo temporário e troca de nome, para a página nunca ler um relatório pela metade
+    temporario = f'{arquivo}.{os.getpid()}.tmp'
+
+    with open( temporario, 'w', encoding='utf-8' ) as f:
+        f.write( conteudo )
+
+    os.replace( temporario, arquivo )
+
+# ================================================================================
+
+def write_page_report( page, date_limit=None, traffic_options=None, conditions_options=None, path=DATASET_PATH ):
+    """ Esta função calcula e grava o relatório de uma página ( .json para as páginas e .html estático ).
+
+        Input: Nome da página, data limite ( exclusiva ), densidades de trânsito, condições
+               climáticas, caminho do arquivo CSV
+        Output: Tupla ( caminho do relatório sem extensão, segundos gastos )
+    """
+    inicio = time.perf_counter()
+
+    key = report_key( page, date_limit, traffic_options, conditions_options )
+    artefatos = build_page_report( page, date_limit, traffic_options, conditions_options, path )
+    destino = report_path( page, key, path )
+
+    os.makedirs( os.path.dirname( destino ), exist_ok=True )
+
+    conteudo = { 'page': page, 'filters': key,
+                 'artifacts': { nome: dump_artifact( valor ) for nome, valor in artefatos.items() } }
+    _write_atomic( destino + '.json', json.dumps( conteudo ) )
+    _write_atomic( destino + '.html', report_html( page, key, artefatos ) )
+
+    return destino, time.perf_counter() - inicio
+
+# ================================================================================
+
+def report_grid( dates, traffic_sets, weather_sets, pages=None ):
+    """ Esta função lista os estados dos filtros da grade ( data x trânsito x clima ) por página,
+        sem repetir estados equivalentes ( ex.: o clima nas páginas sem esse filtro ).
+
+        Input: Listas de datas, conjuntos de trânsito e conjuntos de clima, páginas ( None = todas )
+        Output: Lista de tuplas ( página, data, trânsito, clima )
+    """
+    tarefas = {}
+
+    for page in pages or REPORT_PAGES:
+        for data, traffic, weather in itertools.product( dates, traffic_sets, weather_sets ):
+            key = report_key( page, data, traffic, weather )
+            tarefas.setdefault( ( page, key ), ( page, data, traffic, weather ) )
+
+    return list( tarefas.values() )
+
+# ================================================================================
+
+def build_reports( dates, traffic_sets, weather_sets, pages=None, workers=None, path=DATASET_PATH ):
+    """ Esta função grava os relatórios de toda a grade em um pool de processos.
+
+        O cubo e o índice de filtros são carregados antes de criar o pool: com o fork
+        ( Linux ) os processos herdam os dados já carregados em vez de ler o snapshot de novo.
+
+        Input: Listas de datas, conjuntos de trânsito e de clima, páginas ( None = todas ),
+               quantidade de processos ( None = os.cpu_count(); 1 = sem pool ), caminho do CSV
+        Output: Lista de tuplas ( página, caminho do relatório, segundos )
+    """
+    tarefas = report_grid( dates, traffic_sets, weather_sets, pages )
+
+    load_cube( path )
+    load_filter_index( path, REPORT_COLUMNS )
+    load_restaurant_tree( path )
+
+    if workers == 1:
+        return [ ( tarefa[0], *write_page_report( *tarefa, path=path ) ) for tarefa in tarefas ]
+
+    resultados = []
+
+    with ProcessPoolExecutor( max_workers=workers ) as pool:
+        futuros = { pool.submit( write_page_report, *tarefa, path=path ): tarefa[0] for tarefa in tarefas }
+
+        for futuro in as_completed( futuros ):
+            resultados.append( ( futuros[futuro], *futuro.result() ) )
+
+    return resultados
+
+# ================================================================================
+
+_report_cache = LRUCache( 'relatorios', max_entries=REPORT_CACHE_SIZE )
+
+def load_report( page, date_limit=None, traffic_options=None, conditions_options=None, path=DATASET_PATH ):
+    """ Esta função procura o relatório pré-calculado do estado atual dos filtros da página.
+
+        Os últimos REPORT_CACHE_SIZE relatórios lidos ficam em memória ( por arquivo e mtime ),
+        compartilhados entre sessões.
+
+        Input: Nome da página, data limite ( exclusiva ), densidades de trânsito, condições
+               climáticas, caminho do arquivo CSV
+        Output: Report ( vazio quando não há relatório para estes filtros )
+    """
+    arquivo = report_path( page, report_key( page, date_limit, traffic_options, conditions_options ), path ) + '.json'
+
+    try:
+        stat = os.stat( arquivo )
+    except OSError:
+        return Report()
+
+    key = ( arquivo, stat.st_mtime_ns )
+
+    report = _report_cache.get( key )
+    if report is not None:
+        return report
+
+    try:
+        with open( arquivo, encoding='utf-8' ) as f:
+            report = Report( json.load( f )['artifacts'] )
+    except ( OSError, ValueError, KeyError ):
+        return Report()
+
+    # Tamanho aproximado pelo arquivo ( os artefatos só são convertidos quando usados )
+    _report_cache.put( key, report, size=stat.st_size )
+
+    return report
+
+# ================================================================================
+
+def load_page_artifacts( page, date_limit=None, traffic_options=None, conditions_options=None, path=DATASET_PATH ):
+    """ Esta função prepara os artefatos da página para o estado atual dos filtros
+        ( relatório pré-calculado, se existir, e cache do processo ).
+
+        Input: Nome da página, data limite ( exclusiva ), densidades de trânsito, condições
+               climáticas, caminho do arquivo CSV
+        Output: PageArtifacts
+    """
+    key = report_key( page, date_limit, traffic_options, conditions_options )
+
+    return PageArtifacts( page, key, load_report( page, date_limit, traffic_options, conditions_options, path ), path )
+
+# ================================================================================
+
+def parse_sets( valores, todos ):
+    """ Esta função converte os conjuntos da linha de comando ( 'Low,Jam' ou 'all' ) em listas.
+
+        Input: Lista de strings, lista com todas as opções
+        Output: Lista de listas de opções
+    """
+    return [ list( todos ) if valor == 'all' else [ opcao.strip() for opcao in valor.split( ',' ) if opcao.strip() ]
+             for valor in valores ]
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Pré-calcula os gráficos e tabelas das páginas para uma grade de filtros.' )
+    parser.add_argument( '--dataset', default=DATASET_PATH, help='Caminho do arquivo CSV' )
+    parser.add_argument( '--dates', nargs='+', default=[ DEFAULT_DATE ], help='Datas limite ( YYYY-MM-DD, exclusivas )' )
+    parser.add_argument( '--traffic', nargs='+', default=[ 'all' ],
+                         help="Conjuntos de trânsito separados por vírgula ( ex.: all Low,Jam High )" )
+    parser.add_argument( '--weather', nargs='+', default=[ 'all' ],
+                         help="Conjuntos de clima separados por vírgula ( ex.: all 'conditions Sunny' )" )
+    parser.add_argument( '--pages', nargs='+', choices=list( REPORT_PAGES ), help='Páginas ( padrão: todas )' )
+    parser.add_argument( '--workers', type=int, default=None, help='Processos do pool ( padrão: os.cpu_count() )' )
+    args = parser.parse_args()
+
+    traffic_sets = parse_sets( args.traffic, TRAFFIC_OPTIONS )
+    weather_sets = parse_sets( args.weather, WEATHER_OPTIONS )
+
+    inicio = time.perf_counter()
+    resultados = build_reports( args.dates, traffic_sets, weather_sets, args.pages, args.workers, args.dataset )
+
+    for page, destino, segundos in sorted( resultados ):
+        print( f'{page:>20} {segundos:>8.2f}s {destino}.html' )
+
+    print( f'{len( resultados )} relatórios em {time.perf_counter() - inicio:.1f}s' )
+
+
+if __name__ == '__main__':
+    main()
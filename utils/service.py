@@ -0,0 +1,184 @@
+# Libraries
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# bibliotecas necessarias
+import pandas as pd
+
+from utils.data import DATASET_PATH
+from utils.cache import cache_stats
+from utils.kpis import BACKEND, KPIS, cached_kpis
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def parse_list( valor ):
+    """ Esta função separa uma lista de opções por vírgula ( vazio ou ausente = sem filtro ).
+
+        Input: String ( ex.: 'Low,Jam' ) ou None
+        Output: Lista de opções ou None
+    """
+    if not valor:
+        return None
+
+    return [ opcao.strip() for opcao in valor.split( ',' ) if opcao.strip() ]
+
+# ================================================================================
+
+def parse_filters( query ):
+    """ Esta função lê os filtros de uma query string: date ( YYYY-MM-DD, exclusiva ),
+        traffic e weather ( listas separadas por vírgula ) e names ( KPIs pedidos ).
+
+        Input: Dicionário de parse_qs
+        Output: Dicionário com os argumentos de cached_kpis
+    """
+    def primeiro( nome ):
+        return query.get( nome, [ None ] )[0]
+
+    data = primeiro( 'date' )
+    if data:
+        try:
+            data = pd.Timestamp( data )
+        except ValueError:
+            raise ValueError( f'date inválida: {data!r} ( use YYYY-MM-DD )' )
+
+    names = parse_list( primeiro( 'names' ) )
+    if names:
+        desconhecidos = [ nome for nome in names if nome not in KPIS ]
+        if desconhecidos:
+            raise ValueError( f'KPIs desconhecidos: {", ".join( desconhecidos )}' )
+
+    return { 'date_limit': data or None,
+             'traffic_options': parse_list( primeiro( 'traffic' ) ),
+             'conditions_options': parse_list( primeiro( 'weather' ) ),
+             'names': names }
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class KpiHandler( BaseHTTPRequestHandler ):
+    """ Rotas do serviço de KPIs ( somente GET, respostas em JSON ):
+
+        GET /health              -> status e contadores dos caches
+        GET /kpis?date=&traffic=&weather=&names=
+                                 -> KPIs filtrados ( names = todos por padrão )
+        GET /kpis/<nome>?...     -> um único KPI
+    """
+
+    dataset_path = DATASET_PATH
+
+    def do_GET( self ):
+        url = urlparse( self.path )
+        partes = [ parte for parte in url.path.split( '/' ) if parte ]
+
+        try:
+            if partes == [ 'health' ]:
+                self.send_json( 200, json.dumps( { 'status': 'ok', 'backend': BACKEND, 'cache': cache_stats(),
+                                                   'kpis': list( KPIS ) } ) )
+
+            elif partes and partes[0] == 'kpis' and len( partes ) <= 2:
+                filtros = parse_filters( parse_qs( url.query ) )
+
+                if len( partes ) == 2:
+                    if partes[1] not in KPIS:
+                        self.send_json( 404, json.dumps( { 'error': f'KPI desconhecido: {partes[1]}' } ) )
+                        return
+                    filtros['names'] = [ partes[1] ]
+
+                self.send_json( 200, cached_kpis( **filtros, path=self.dataset_path ) )
+
+            else:
+                self.send_json( 404, json.dumps( { 'error': f'rota desconhecida: {url.path}' } ) )
+
+        except ValueError as erro:
+            self.send_json( 400, json.dumps( { 'error': str( erro ) }, ensure_ascii=False ) )
+
+    def send_json( self, status, corpo ):
+        dados = corpo.encode( 'utf-8' )
+
+        self.send_response( status )
+        self.send_header( 'Content-Type', 'application/json; charset=utf-8' )
+        self.send_header( 'Content-Length', str( len( dados ) ) )
+        self.end_headers()
+        self.wfile.write( dados )
+
+    def log_message( self, format, *args ):
+        # Uma linha por requisição no stderr, sem o prefixo de data do BaseHTTPRequestHandler
+        sys.stderr.write( f'{self.address_string()} {format % args}\n' )
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def serve( host=DEFAULT_HOST, port=DEFAULT_PORT, path=DATASET_PATH ):
+    """ Esta função sobe o serviço HTTP ( uma thread por requisição ).
+
+        O cubo e o índice de filtros são carregados uma vez e compartilhados entre as threads;
+        as respostas ficam no cache de utils.kpis.
+
+        Input: Host, porta, caminho do arquivo CSV
+        Output: Nenhum ( bloqueia até Ctrl+C )
+    """
+    KpiHandler.dataset_path = path
+
+    # Aquece o cache com a resposta sem filtros antes de aceitar conexões
+    cached_kpis( path=path )
+
+    servidor = ThreadingHTTPServer( ( host, port ), KpiHandler )
+    servidor.daemon_threads = True
+    print( f'Servindo KPIs em http://{host}:{port}/kpis', flush=True )
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Serviço e CLI de KPIs do dashboard, sem rodar o Streamlit.' )
+    parser.add_argument( '--dataset', default=DATASET_PATH, help='Caminho do arquivo CSV' )
+    comandos = parser.add_subparsers( dest='comando', required=True )
+
+    servidor = comandos.add_parser( 'serve', help='Sobe o serviço HTTP/JSON' )
+    servidor.add_argument( '--host', default=DEFAULT_HOST )
+    servidor.add_argument( '--port', type=int, default=DEFAULT_PORT )
+
+    cli = comandos.add_parser( 'kpis', help='Imprime os KPIs em JSON' )
+    cli.add_argument( '--date', help='Data limite exclusiva ( YYYY-MM-DD )' )
+    cli.add_argument( '--traffic', help='Densidades de trânsito separadas por vírgula ( ex.: Low,Jam )' )
+    cli.add_argument( '--weather', help='Condições climáticas separadas por vírgula' )
+    cli.add_argument( '--names', help=f'KPIs separados por vírgula ( padrão: todos; opções: {", ".join( KPIS )} )' )
+
+    args = parser.parse_args()
+
+    if args.comando == 'serve':
+        serve( args.host, args.port, args.dataset )
+        return
+
+    query = { nome: [ valor ] for nome, valor in ( ( 'date', args.date ), ( 'traffic', args.traffic ),
+                                                   ( 'weather', args.weather ), ( 'names', args.names ) ) if valor }
+    try:
+        filtros = parse_filters( query )
+    except ValueError as erro:
+        parser.error( str( erro ) )
+
+    print( cached_kpis( **filtros, path=args.dataset ) )
+
+
+if __name__ == '__main__':
+    main()
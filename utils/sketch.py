@@ -0,0 +1,285 @@
+# Libraries
+import os
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from utils.cube import filter_cube
+from utils.data import ( DATASET_PATH, add_derived_columns, clean_code, dataset_version, load_snapshot,
+                         read_dataset )
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Com CURRY_APPROX_DISTINCT=1 as contagens de entregadores únicos usam os sketches mesmo com as linhas
+# em memória ( no modo streaming os sketches são o único caminho para essas contagens )
+APPROX_DISTINCT = os.environ.get( 'CURRY_APPROX_DISTINCT', '0' ) == '1'
+
+# Dimensões das células dos sketches ( as mesmas dos filtros ); a semana sai da data de cada célula
+SKETCH_DIMENSIONS = [ 'Order_Date', 'City', 'Road_traffic_density', 'Weatherconditions' ]
+
+# Dimensões calculadas a partir das células ( mesma regra de add_derived_columns )
+DERIVED_DIMENSIONS = { 'week_of_year': lambda cells: cells['Order_Date'].dt.strftime( '%U' ) }
+
+# Coluna contada ( valores distintos )
+SKETCH_COLUMN = 'Delivery_person_ID'
+
+# Precisão p do HyperLogLog: 2**p registradores por célula, guardados só quando não são zero
+HLL_PRECISION = 11
+HLL_REGISTERS = 2 ** HLL_PRECISION
+
+# Erro padrão relativo da estimativa ( 1.04 / sqrt( m ) ~ 2.3% com p = 11 ); ~95% das
+# estimativas ficam a menos de 2 erros padrão do valor exato
+HLL_RELATIVE_ERROR = 1.04 / np.sqrt( HLL_REGISTERS )
+
+# Legenda dos indicadores estimados pelos sketches
+APPROX_MESSAGE = f'Entregadores únicos estimados por HyperLogLog ( erro padrão de ±{HLL_RELATIVE_ERROR:.1%} ).'
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def hash_values( serie ):
+    """ Esta função calcula o hash de 64 bits de cada valor não nulo da série.
+
+        O hash depende só do valor ( não da ordem das categorias ), então sketches de
+        blocos diferentes do CSV podem ser juntados.
+
+        Input: Série ( categórica ou de strings )
+        Output: Tupla ( hashes uint64, máscara das linhas não nulas )
+    """
+    if isinstance( serie.dtype, pd.CategoricalDtype ):
+        codes = serie.cat.codes.to_numpy()
+        valido = codes >= 0
+        hashes = pd.util.hash_array( serie.cat.categories.to_numpy( dtype=object ) )[codes[valido]]
+    else:
+        valido = serie.notna().to_numpy()
+        hashes = pd.util.hash_array( serie.to_numpy( dtype=object )[valido] )
+
+    return hashes, valido
+
+# ================================================================================
+
+def register_ranks( hashes, precision=HLL_PRECISION ):
+    """ Esta função separa cada hash em registrador ( p bits mais altos ) e posto
+        ( posição do primeiro bit 1 nos bits restantes ).
+
+        O tamanho em bits é calculado em duas metades de 32 bits, exatas em float64.
+
+        Input: Hashes uint64, precisão p
+        Output: Tupla ( registradores int64, postos uint8 )
+    """
+    registros = ( hashes >> np.uint64( 64 - precision ) ).astype( 'int64' )
+    resto = hashes << np.uint64( precision )
+
+    alto = ( resto >> np.uint64( 32 ) ).astype( 'float64' )
+    baixo = ( resto & np.uint64( 0xFFFFFFFF ) ).astype( 'float64' )
+    bits = np.where( alto > 0, 32 + np.frexp( alto )[1], np.frexp( baixo )[1] )
+
+    postos = np.minimum( 64 - bits + 1, 64 - precision + 1 ).astype( 'uint8' )
+
+    return registros, postos
+
+# ================================================================================
+
+def estimate( registers ):
+    """ Esta função estima a quantidade de valores distintos de cada linha de registradores
+        ( HyperLogLog com a correção para contagens pequenas ).
+
+        Input: Array ( k x m ) de registradores
+        Output: Array com k estimativas
+    """
+    registers = np.atleast_2d( registers )
+    m = registers.shape[1]
+    alpha = 0.7213 / ( 1 + 1.079 / m )
+
+    estimativa = alpha * m * m / np.exp2( -registers.astype( 'float64' ) ).sum( axis=1 )
+    zeros = ( registers == 0 ).sum( axis=1 )
+
+    # Poucos valores: contagem linear pelos registradores vazios
+    with np.errstate( divide='ignore' ):
+        linear = m * np.log( m / zeros )
+
+    return np.where( ( estimativa <= 2.5 * m ) & ( zeros > 0 ), linear, estimativa )
+
+# ================================================================================
+
+def _cell_ids( df_aux, dimensions ):
+    # Número da célula de cada linha, na ordem das chaves ordenadas ( a mesma do groupby )
+    grupos = df_aux.groupby( dimensions, observed=True, dropna=False )
+
+    return grupos.ngroup().to_numpy(), grupos.size().reset_index().loc[:, dimensions]
+
+# ================================================================================
+
+def _max_pairs( cell_ids, registros, postos, m ):
+    # Maior posto de cada ( célula, registrador ): uma entrada por registrador não zero
+    chaves, inverso = np.unique( cell_ids.astype( 'int64' ) * m + registros, return_inverse=True )
+
+    maximos = np.zeros( len( chaves ), dtype='uint8' )
+    np.maximum.at( maximos, inverso, postos )
+
+    return ( chaves // m ).astype( 'int32' ), ( chaves % m ).astype( 'int16' ), maximos
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class CourierSketches:
+    """ Sketches HyperLogLog dos entregadores únicos por célula ( dia, cidade, trânsito e clima ).
+
+        1. Cada célula tem 2**p registradores com o maior posto visto dos hashes dos entregadores.
+           Só os registradores não zero são guardados, como triplas ( célula, registrador, posto ):
+           a memória fica limitada por min( linhas, células x 2**p ) triplas de 7 bytes, e não
+           cresce com os registradores vazios das células com poucas entregas.
+        2. Sketches são juntados pelo máximo registrador a registrador, então qualquer
+           combinação de filtros é respondida juntando as células selecionadas ( sem as linhas ).
+        3. A estimativa tem erro padrão relativo de HLL_RELATIVE_ERROR.
+
+        Input: Dataframe das células ( SKETCH_DIMENSIONS ), arrays das triplas ( célula, registrador, posto ), precisão p
+    """
+
+    def __init__( self, cells, cell_ids, registers, ranks, precision=HLL_PRECISION ):
+        self.cells = cells.reset_index( drop=True )
+        self.cell_ids = cell_ids
+        self.registers = registers
+        self.ranks = ranks
+        self.precision = precision
+        self.memory_mb = ( cell_ids.nbytes + registers.nbytes + ranks.nbytes
+                           + self.cells.memory_usage( deep=True ).sum() ) / 2**20
+
+    @classmethod
+    def from_rows( cls, df1, precision=HLL_PRECISION ):
+        """ Esta função monta os sketches a partir das linhas do dataframe limpo.
+
+            Input: Dataframe limpo ( ou um bloco dele ), precisão p
+            Output: CourierSketches
+        """
+        cell_ids, cells = _cell_ids( df1, SKETCH_DIMENSIONS )
+        hashes, valido = hash_values( df1[SKETCH_COLUMN] )
+        registros, postos = register_ranks( hashes, precision )
+
+        return cls( cells, *_max_pairs( cell_ids[valido], registros, postos, 2 ** precision ), precision )
+
+    def merge( self, other ):
+        """ Esta função junta dois conjuntos de sketches ( células iguais viram uma só ).
+
+            Input: CourierSketches
+            Output: CourierSketches com a união das células
+        """
+        cells = pd.concat( [ self.cells, other.cells ], ignore_index=True )
+        cell_ids, merged = _cell_ids( cells, SKETCH_DIMENSIONS )
+
+        # Número da célula de cada tripla no conjunto juntado
+        novos = np.concatenate( [ cell_ids[:len( self.cells )][self.cell_ids],
+                                  cell_ids[len( self.cells ):][other.cell_ids] ] )
+
+        return CourierSketches( merged, *_max_pairs( novos, np.concatenate( [ self.registers, other.registers ] ),
+                                                     np.concatenate( [ self.ranks, other.ranks ] ), 2 ** self.precision ),
+                                self.precision )
+
+    def filter( self, date_limit, traffic_options=None, conditions_options=None ):
+        """ Esta função seleciona as células dos filtros da barra lateral ( mesmas regras do cubo ).
+
+            Input: Data limite ( exclusiva ), densidades de trânsito e condições climáticas ( None = sem filtro )
+            Output: CourierSketches com as células selecionadas
+        """
+        linhas = filter_cube( self.cells, date_limit, traffic_options, conditions_options ).index.to_numpy()
+
+        # Novo número de cada célula selecionada ( -1 = fora do filtro )
+        novos = np.full( len( self.cells ), -1, dtype='int32' )
+        novos[linhas] = np.arange( len( linhas ), dtype='int32' )
+
+        cell_ids = novos[self.cell_ids]
+        selecionadas = cell_ids >= 0
+
+        return CourierSketches( self.cells.iloc[linhas], cell_ids[selecionadas], self.registers[selecionadas],
+                                self.ranks[selecionadas], self.precision )
+
+    def _registers_by( self, codes, n_grupos ):
+        # Registradores densos ( grupos x m ) com o maior posto de cada grupo de células ( código -1 = nulo, ignorado )
+        grupos = codes[self.cell_ids]
+        validos = grupos >= 0
+
+        registers = np.zeros( ( n_grupos, 2 ** self.precision ), dtype='uint8' )
+        np.maximum.at( registers, ( grupos[validos], self.registers[validos] ), self.ranks[validos] )
+
+        return registers
+
+    def distinct( self ):
+        """ Esta função estima a quantidade de entregadores únicos em todas as células.
+
+            Input: Nenhum
+            Output: Estimativa ( float )
+        """
+        return float( estimate( self._registers_by( np.zeros( len( self.cells ), dtype='int64' ), 1 ) )[0] )
+
+    def distinct_by( self, dimension ):
+        """ Esta função estima os entregadores únicos por valor de uma dimensão, juntando as células.
+
+            A semana ( week_of_year ) é calculada pela data de cada célula ( DERIVED_DIMENSIONS ).
+
+            Input: Nome da dimensão ( ex.: week_of_year )
+            Output: Dataframe com a dimensão e a coluna Delivery_person_ID ( estimativa )
+        """
+        valores = DERIVED_DIMENSIONS[dimension]( self.cells ) if dimension in DERIVED_DIMENSIONS else self.cells[dimension]
+        codes, valores = pd.factorize( valores, sort=True )
+
+        registers = self._registers_by( codes, len( valores ) )
+
+        return pd.DataFrame( { dimension: valores, SKETCH_COLUMN: estimate( registers ) if len( valores ) else [] } )
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def stream_sketches( path=DATASET_PATH, chunksize=None ):
+    """ Esta função monta os sketches lendo o CSV em blocos ( modo streaming ).
+
+        Input: Caminho do arquivo CSV, quantidade de linhas por bloco ( None = CHUNKSIZE do modo streaming )
+        Output: CourierSketches
+    """
+    # Import local: utils.streaming depende de utils.cube, que é importado por este módulo
+    from utils.streaming import CHUNKSIZE
+
+    sketches = None
+
+    for chunk in read_dataset( path, chunksize=chunksize or CHUNKSIZE ):
+        parcial = CourierSketches.from_rows( add_derived_columns( clean_code( chunk ) ) )
+        sketches = parcial if sketches is None else sketches.merge( parcial )
+
+    return sketches
+
+# ================================================================================
+
+_sketch_cache = {}
+_sketch_lock = threading.Lock()
+
+def load_sketches( path=DATASET_PATH ):
+    """ Esta função monta os sketches uma única vez por processo e versão do dataset.
+
+        No modo streaming ( CURRY_STREAMING=1 ) os sketches são montados lendo o CSV em blocos.
+
+        Input: Caminho do arquivo CSV
+        Output: CourierSketches ( somente leitura, compartilhado entre sessões )
+    """
+    from utils.streaming import STREAMING_MODE
+
+    version = dataset_version( path )
+
+    with _sketch_lock:
+        cached = _sketch_cache.get( path )
+
+        if cached is None or cached[0] != version:
+            if STREAMING_MODE:
+                sketches = stream_sketches( path )
+            else:
+                sketches = CourierSketches.from_rows( load_snapshot( path, columns=SKETCH_DIMENSIONS + [ SKETCH_COLUMN ] ) )
+
+            cached = ( version, sketches )
+            _sketch_cache[path] = cached
+
+    return cached[1]
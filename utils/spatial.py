@@ -0,0 +1,185 @@
+# Libraries
+import threading
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+
+from utils.data import DATASET_PATH, dataset_version, load_dataset
+from utils.geo import EARTH_RADIUS_KM, GRID_CELL_DEGREES, NO_CELL, cell_center, grid_cell, neighbor_cells
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Colunas carregadas pelo índice espacial
+SPATIAL_COLUMNS = [ 'ID', 'Order_Date', 'City', 'restaurant_cell', 'delivery_cell', 'Time_taken(min)', 'distance',
+                    'Restaurant_latitude', 'Restaurant_longitude',
+                    'Delivery_location_latitude', 'Delivery_location_longitude' ]
+
+# ===============================================================
+# Classes
+# ===============================================================
+
+class SpatialIndex:
+    """ Índice espacial dos pedidos sobre uma grade regular de latitude/longitude.
+
+        1. As linhas são ordenadas pela célula ( restaurante ou local de entrega ), então os
+           pedidos de uma célula ocupam um intervalo contínuo ( início, quantidade ).
+        2. Para cada célula ocupada guarda a quantidade de pedidos, o tempo médio de entrega,
+           a distância média e o centro da célula ( tabela stats ).
+
+        Consultas de hot spots, cobertura e vizinhança passam a ser buscas na tabela
+        de células, sem varrer as linhas.
+
+        Input: Dataframe limpo ( somente leitura ), coluna de célula usada no índice
+    """
+
+    def __init__( self, df1, cell_column='delivery_cell', cell_degrees=GRID_CELL_DEGREES ):
+        self.df1 = df1
+        self.cell_column = cell_column
+        self.cell_degrees = cell_degrees
+
+        cells = df1[cell_column].to_numpy( dtype='int64' )
+        self.order = np.argsort( cells, kind='stable' )
+
+        celulas, self.starts, contagem = np.unique( cells[self.order], return_index=True, return_counts=True )
+
+        tempo = df1['Time_taken(min)'].to_numpy( dtype='float64' )[self.order]
+        distancia = df1['distance'].to_numpy( dtype='float64' )[self.order]
+        latitudes, longitudes = cell_center( celulas, cell_degrees )
+
+        self.stats = pd.DataFrame( { 'count': contagem,
+                                     'time_mean': _segment_mean( tempo, self.starts ),
+                                     'distance_mean': _segment_mean( distancia, self.starts ),
+                                     'latitude': latitudes,
+                                     'longitude': longitudes },
+                                   index=pd.Index( celulas, name='cell' ) )
+
+        self.stats = self.stats.drop( index=NO_CELL, errors='ignore' )
+
+    def cell_of( self, latitude, longitude ):
+        """ Esta função retorna a célula que contém uma coordenada.
+
+            Input: Latitude e longitude em graus
+            Output: Célula ( inteiro )
+        """
+        return int( grid_cell( [ latitude ], [ longitude ], self.cell_degrees )[0] )
+
+    def lookup( self, latitude, longitude ):
+        """ Esta função retorna os agregados da célula que contém uma coordenada.
+
+            Input: Latitude e longitude em graus
+            Output: Série com count, time_mean, distance_mean e o centro, ou None se a célula está vazia
+        """
+        cell = self.cell_of( latitude, longitude )
+
+        if cell not in self.stats.index:
+            return None
+
+        return self.stats.loc[cell]
+
+    def rows( self, latitude, longitude ):
+        """ Esta função retorna os pedidos da célula que contém uma coordenada.
+
+            Input: Latitude e longitude em graus
+            Output: Dataframe com as linhas da célula
+        """
+        cell = self.cell_of( latitude, longitude )
+        posicao = self.stats.index.get_indexer( [ cell ] )[0]
+
+        if posicao < 0:
+            return self.df1.iloc[:0]
+
+        # self.starts inclui a célula NO_CELL ( se existir ), que fica sempre em primeiro
+        posicao += len( self.starts ) - len( self.stats )
+        inicio = self.starts[posicao]
+        fim = self.starts[posicao + 1] if posicao + 1 < len( self.starts ) else len( self.order )
+
+        return self.df1.iloc[np.sort( self.order[inicio:fim] )]
+
+    def nearby( self, latitude, longitude, radius=1 ):
+        """ Esta função retorna os agregados das células ocupadas em volta de uma coordenada.
+
+            Input: Latitude e longitude em graus, raio em células
+            Output: Dataframe com as células ocupadas do quadrado ( 2 * radius + 1 )²
+        """
+        vizinhas = neighbor_cells( self.cell_of( latitude, longitude ), radius, self.cell_degrees )
+
+        return self.stats.loc[self.stats.index.intersection( vizinhas )]
+
+    def hot_spots( self, n=10, by='count', min_orders=1 ):
+        """ Esta função retorna as n células com o maior valor de uma estatística.
+
+            Input: Quantidade de células, coluna usada na ordenação ( count, time_mean ou
+                   distance_mean ), mínimo de pedidos para a célula ser considerada
+            Output: Dataframe com as n células
+        """
+        stats = self.stats
+
+        if min_orders > 1:
+            stats = stats.loc[stats['count'] >= min_orders]
+
+        return stats.nlargest( n, by )
+
+    def coverage( self, min_orders=1 ):
+        """ Esta função resume a área coberta pelos pedidos.
+
+            A área de cada célula considera o encolhimento da longitude com a latitude.
+
+            Input: Mínimo de pedidos para a célula contar como coberta
+            Output: Dicionário com a quantidade de células, a área em km² e a fração dos pedidos
+        """
+        cobertas = self.stats.loc[self.stats['count'] >= min_orders]
+
+        lado_km = np.radians( self.cell_degrees ) * EARTH_RADIUS_KM
+        area = ( lado_km * lado_km * np.cos( np.radians( cobertas['latitude'].to_numpy() ) ) ).sum()
+
+        return { 'cells': len( cobertas ),
+                 'area_km2': float( area ),
+                 'orders_share': float( cobertas['count'].sum() / max( len( self.df1 ), 1 ) ) }
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _segment_mean( valores, starts ):
+    """ Esta função calcula a média ( ignorando nulos ) de cada intervalo contínuo de um array.
+
+        Input: Array ordenado pela célula, início de cada intervalo
+        Output: Array com a média de cada intervalo
+    """
+    if len( starts ) == 0:
+        return np.zeros( 0, dtype='float64' )
+
+    validos = ~np.isnan( valores )
+
+    soma = np.add.reduceat( np.where( validos, valores, 0.0 ), starts )
+    quantidade = np.add.reduceat( validos.astype( 'int64' ), starts )
+
+    with np.errstate( divide='ignore', invalid='ignore' ):
+        return np.where( quantidade > 0, soma / np.maximum( quantidade, 1 ), np.nan )
+
+# ================================================================================
+
+_spatial_cache = {}
+_spatial_lock = threading.Lock()
+
+def load_spatial_index( path=DATASET_PATH, cell_column='delivery_cell' ):
+    """ Esta função monta o índice espacial uma única vez por processo, versão do dataset
+        e coluna de célula.
+
+        Input: Caminho do arquivo CSV, coluna de célula ( restaurant_cell ou delivery_cell )
+        Output: SpatialIndex compartilhado entre sessões
+    """
+    version = dataset_version( path )
+    key = ( path, cell_column )
+
+    with _spatial_lock:
+        cached = _spatial_cache.get( key )
+
+        if cached is None or cached[0] != version:
+            cached = ( version, SpatialIndex( load_dataset( path, SPATIAL_COLUMNS ), cell_column ) )
+            _spatial_cache[key] = cached
+
+    return cached[1]
@@ -0,0 +1,129 @@
+# Libraries
+import os
+
+# bibliotecas necessarias
+import numpy as np
+
+from utils.cube import CUBE_DIMENSIONS, CUBE_MEASURES
+from utils.data import DATASET_PATH, add_derived_columns, clean_code, read_dataset
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Com CURRY_STREAMING=1 o dashboard não carrega as linhas em memória: o cubo é montado
+# lendo o CSV em blocos e só os gráficos respondidos pelo cubo são exibidos
+STREAMING_MODE = os.environ.get( 'CURRY_STREAMING', '0' ) == '1'
+
+# Quantidade de linhas lidas por bloco
+CHUNKSIZE = int( os.environ.get( 'CURRY_CHUNKSIZE', 200_000 ) )
+
+# Mensagem exibida no lugar dos gráficos que dependem das linhas
+ROWS_UNAVAILABLE_MESSAGE = 'Indisponível no modo streaming ( CURRY_STREAMING=1 ): este indicador precisa das linhas do dataset.'
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def chunk_moments( df1 ):
+    """ Esta função calcula os momentos de um bloco do dataset por célula do cubo.
+
+        Para cada medida guarda a quantidade de valores ( _n ), a média ( _mean ) e a soma
+        dos quadrados dos desvios em relação à média ( _m2, o M2 de Welford ).
+
+        Input: Bloco do dataframe limpo
+        Output: Dataframe indexado pelas dimensões do cubo
+    """
+    df_aux = df1.loc[:, CUBE_DIMENSIONS + CUBE_MEASURES].astype( { col: 'float64' for col in CUBE_MEASURES } )
+    grupos = df_aux.groupby( CUBE_DIMENSIONS, observed=True, dropna=False )
+
+    df_moments = grupos.size().to_frame( 'ID' )
+
+    for col in CUBE_MEASURES:
+        stats = grupos[col].agg( [ 'count', 'mean', 'var' ] )
+
+        df_moments[col + '_n'] = stats['count']
+        df_moments[col + '_mean'] = stats['mean']
+        df_moments[col + '_m2'] = ( stats['var'] * ( stats['count'] - 1 ) ).fillna( 0.0 )
+
+    return df_moments
+
+# ================================================================================
+
+def merge_moments( df_a, df_b ):
+    """ Esta função junta os momentos de dois conjuntos de linhas ( fórmula paralela de
+        Chan et al. para média e variância ), célula a célula.
+
+        n = na + nb
+        delta = mean_b - mean_a
+        mean = mean_a + delta * nb / n
+        m2 = m2_a + m2_b + delta² * na * nb / n
+
+        Input: Dois dataframes de momentos ( saída de chunk_moments )
+        Output: Dataframe de momentos com a união das células
+    """
+    df_a, df_b = df_a.align( df_b, join='outer', fill_value=0 )
+
+    df_merged = df_a[['ID']] + df_b[['ID']]
+
+    for col in CUBE_MEASURES:
+        na = df_a[col + '_n'].to_numpy( dtype='float64' )
+        nb = df_b[col + '_n'].to_numpy( dtype='float64' )
+        mean_a = df_a[col + '_mean'].fillna( 0.0 ).to_numpy()
+        mean_b = df_b[col + '_mean'].fillna( 0.0 ).to_numpy()
+
+        n = na + nb
+        delta = mean_b - mean_a
+
+        with np.errstate( divide='ignore', invalid='ignore' ):
+            mean = np.where( n > 0, mean_a + delta * nb / n, np.nan )
+            m2 = df_a[col + '_m2'].to_numpy() + df_b[col + '_m2'].to_numpy() + np.where( n > 0, delta * delta * na * nb / n, 0.0 )
+
+        df_merged[col + '_n'] = n.astype( 'int64' )
+        df_merged[col + '_mean'] = mean
+        df_merged[col + '_m2'] = m2
+
+    return df_merged
+
+# ================================================================================
+
+def moments_to_cube( df_moments ):
+    """ Esta função converte os momentos ( n, média, M2 ) para o formato do cubo
+        ( n, soma, soma dos quadrados ), usado por count_by e moments_by.
+
+        Input: Dataframe de momentos
+        Output: Cubo com uma linha por célula
+    """
+    df_cube = df_moments[['ID']].copy()
+
+    for col in CUBE_MEASURES:
+        n = df_moments[col + '_n'].to_numpy( dtype='float64' )
+        mean = df_moments[col + '_mean'].fillna( 0.0 ).to_numpy()
+
+        df_cube[col + '_n'] = df_moments[col + '_n']
+        df_cube[col + '_sum'] = n * mean
+        df_cube[col + '_sumsq'] = df_moments[col + '_m2'].to_numpy() + n * mean * mean
+
+    return df_cube.sort_index().reset_index()
+
+# ================================================================================
+
+def stream_cube( path=DATASET_PATH, chunksize=CHUNKSIZE ):
+    """ Esta função monta o cubo lendo o CSV em blocos, sem carregar o arquivo inteiro.
+
+        1. Lê um bloco com o esquema declarado e aplica as regras de limpeza.
+        2. Calcula os momentos do bloco por célula ( chunk_moments ).
+        3. Junta com os momentos acumulados ( merge_moments ).
+
+        A memória usada fica limitada a um bloco mais as células do cubo.
+
+        Input: Caminho do arquivo CSV, quantidade de linhas por bloco
+        Output: Cubo com uma linha por célula
+    """
+    df_moments = None
+
+    for chunk in read_dataset( path, chunksize=chunksize ):
+        df_chunk = chunk_moments( add_derived_columns( clean_code( chunk ) ) )
+        df_moments = df_chunk if df_moments is None else merge_moments( df_moments, df_chunk )
+
+    return moments_to_cube( df_moments )
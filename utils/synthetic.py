@@ -0,0 +1,285 @@
+# Libraries
+import argparse
+import os
+
+# bibliotecas necessarias
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from utils.data import DATASET_PATH, DATE_FORMAT, NAN_SENTINEL, TIME_PREFIX
+
+# ===============================================================
+# Constantes
+# ===============================================================
+
+# Colunas do CSV bruto, na ordem do arquivo original
+RAW_COLUMNS = [ 'ID', 'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings',
+                'Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude',
+                'Delivery_location_longitude', 'Order_Date', 'Time_Orderd', 'Time_Order_picked',
+                'Weatherconditions', 'Road_traffic_density', 'Vehicle_condition', 'Type_of_order',
+                'Type_of_vehicle', 'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)' ]
+
+# Cidades dos códigos de entregador ( prefixo do Delivery_person_ID ) e o centro aproximado de cada uma
+CITY_CODES = {
+    'INDO': ( 22.72, 75.86 ), 'BANG': ( 12.97, 77.59 ), 'COIMB': ( 11.02, 76.96 ), 'CHEN': ( 13.08, 80.27 ),
+    'HYD': ( 17.39, 78.49 ), 'RANCHI': ( 23.34, 85.31 ), 'MYS': ( 12.30, 76.64 ), 'DEH': ( 30.32, 78.03 ),
+    'KOC': ( 9.93, 76.27 ), 'PUNE': ( 18.52, 73.86 ), 'LUDH': ( 30.90, 75.86 ), 'KNP': ( 26.45, 80.33 ),
+    'MUM': ( 19.08, 72.88 ), 'KOL': ( 22.57, 88.36 ), 'JAP': ( 26.91, 75.79 ), 'SUR': ( 21.17, 72.83 ),
+    'GOA': ( 15.50, 73.83 ), 'AURG': ( 19.88, 75.34 ), 'AGR': ( 27.18, 78.01 ), 'VAD': ( 22.31, 73.18 ),
+    'ALH': ( 25.44, 81.85 ), 'BHP': ( 23.26, 77.41 ),
+}
+
+# Restaurantes por código de cidade e entregadores por restaurante
+RESTAURANTS_PER_CITY = 20
+COURIERS_PER_RESTAURANT = 3
+
+# Distribuições das colunas categóricas ( valor do CSV bruto: probabilidade ), próximas às do dataset original.
+# NAN_SENTINEL entra como um valor a mais nas colunas que têm dados faltantes.
+CITY_SHARES = { 'Metropolitian ': 0.745, 'Urban ': 0.223, 'Semi-Urban ': 0.004, NAN_SENTINEL: 0.028 }
+TRAFFIC_SHARES = { 'Low ': 0.34, 'Jam ': 0.31, 'Medium ': 0.24, 'High ': 0.097, NAN_SENTINEL: 0.013 }
+WEATHER_SHARES = { 'conditions Fog': 0.168, 'conditions Stormy': 0.166, 'conditions Cloudy': 0.166,
+                   'conditions Sandstorms': 0.165, 'conditions Windy': 0.164, 'conditions Sunny': 0.158,
+                   'conditions NaN': 0.013 }
+FESTIVAL_SHARES = { 'No ': 0.975, 'Yes ': 0.02, NAN_SENTINEL: 0.005 }
+ORDER_SHARES = { 'Snack ': 0.252, 'Meal ': 0.25, 'Drinks ': 0.249, 'Buffet ': 0.249 }
+VEHICLE_SHARES = { 'motorcycle ': 0.58, 'scooter ': 0.335, 'electric_scooter ': 0.084, 'bicycle ': 0.001 }
+MULTIPLE_SHARES = { '0': 0.31, '1': 0.62, '2': 0.044, '3': 0.004, NAN_SENTINEL: 0.022 }
+
+# Acréscimo no tempo de entrega ( min ) por trânsito, clima, festival e cidade
+TRAFFIC_DELAY = { 'Low ': 0, 'Medium ': 6, 'High ': 8, 'Jam ': 12, NAN_SENTINEL: 4 }
+WEATHER_DELAY = { 'conditions Sunny': -4, 'conditions Cloudy': 4, 'conditions Fog': 4, 'conditions Windy': 0,
+                  'conditions Sandstorms': 0, 'conditions Stormy': 0, 'conditions NaN': 0 }
+FESTIVAL_DELAY = { 'No ': 0, 'Yes ': 20, NAN_SENTINEL: 0 }
+CITY_DELAY = { 'Metropolitian ': 2, 'Urban ': -3, 'Semi-Urban ': 20, NAN_SENTINEL: 0 }
+
+# Período dos pedidos e fração de dados faltantes nas colunas numéricas
+FIRST_DATE = '2022-02-11'
+LAST_DATE = '2022-04-06'
+NAN_SHARE = 0.04
+
+# Linhas geradas e gravadas por bloco
+GENERATOR_CHUNKSIZE = 500_000
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def _choice( rng, shares, n_rows ):
+    """ Esta função sorteia valores de uma distribuição categórica.
+
+        Input: Gerador aleatório, dicionário valor: probabilidade, quantidade de linhas
+        Output: Array de índices sorteados e array com os valores ( na ordem do dicionário )
+    """
+    valores = np.array( list( shares ), dtype=object )
+    probabilidades = np.array( list( shares.values() ), dtype='float64' )
+
+    return rng.choice( len( valores ), size=n_rows, p=probabilidades / probabilidades.sum() ), valores
+
+# ================================================================================
+
+def _with_nan( rng, textos, n_rows, share=NAN_SHARE ):
+    """ Esta função troca uma fração dos textos pelo marcador de dado faltante ( 'NaN ' ).
+
+        Input: Gerador aleatório, array de textos, quantidade de linhas, fração de faltantes
+        Output: Array de textos
+    """
+    textos[rng.random( n_rows ) < share] = NAN_SENTINEL
+
+    return textos
+
+# ================================================================================
+
+def restaurant_pool( seed ):
+    """ Esta função monta os restaurantes e entregadores fixos de uma semente.
+
+        Cada restaurante tem coordenadas perto do centro da sua cidade e COURIERS_PER_RESTAURANT
+        entregadores ( CODIGORESnnDEL0k ); os blocos da mesma semente compartilham o mesmo conjunto.
+
+        Input: Semente
+        Output: Dataframe com code, latitude, longitude e a lista de entregadores de cada restaurante
+    """
+    rng = np.random.default_rng( np.random.SeedSequence( seed ).spawn( 1 )[0] )
+
+    codigos = np.repeat( list( CITY_CODES ), RESTAURANTS_PER_CITY )
+    centros = np.array( [ CITY_CODES[codigo] for codigo in codigos ] )
+    numeros = np.tile( np.arange( 1, RESTAURANTS_PER_CITY + 1 ), len( CITY_CODES ) )
+
+    couriers = [ [ f'{codigo}RES{numero:02d}DEL{k:02d} ' for k in range( 1, COURIERS_PER_RESTAURANT + 1 ) ]
+                 for codigo, numero in zip( codigos, numeros ) ]
+
+    return pd.DataFrame( { 'code': codigos,
+                           'latitude': centros[:, 0] + rng.uniform( -0.15, 0.15, len( codigos ) ),
+                           'longitude': centros[:, 1] + rng.uniform( -0.15, 0.15, len( codigos ) ),
+                           'couriers': couriers } )
+
+# ================================================================================
+
+def generate_chunk( n_rows, rng, restaurants, start_id=0 ):
+    """ Esta função gera um bloco do CSV bruto, no mesmo formato do dataset original.
+
+        1. Textos com espaço sobrando ( 'Urban ', 'Jam ' ), o marcador 'NaN ' e os rótulos
+           'conditions X' do clima.
+        2. Datas em dd-mm-YYYY e o tempo de entrega como '(min) NN'.
+        3. O tempo de entrega depende da distância, do trânsito, do clima, do festival, da
+           cidade e das entregas múltiplas, para os gráficos terem diferenças reais.
+
+        Tudo é sorteado de forma vetorizada; os textos vêm de tabelas pré-montadas.
+
+        Input: Quantidade de linhas, gerador aleatório, restaurantes ( restaurant_pool ),
+               número do primeiro pedido
+        Output: Dataframe bruto com as colunas RAW_COLUMNS
+    """
+    # Restaurante e entregador de cada pedido
+    restaurante = rng.integers( 0, len( restaurants ), n_rows )
+    entregadores = np.array( [ nome for lista in restaurants['couriers'] for nome in lista ], dtype=object )
+    entregador = entregadores[restaurante * COURIERS_PER_RESTAURANT + rng.integers( 0, COURIERS_PER_RESTAURANT, n_rows )]
+
+    rest_lat = restaurants['latitude'].to_numpy()[restaurante]
+    rest_lon = restaurants['longitude'].to_numpy()[restaurante]
+    deslocamento_lat = rng.uniform( 0.01, 0.09, n_rows ) * rng.choice( [ -1, 1 ], n_rows )
+    deslocamento_lon = rng.uniform( 0.01, 0.09, n_rows ) * rng.choice( [ -1, 1 ], n_rows )
+
+    # Colunas categóricas
+    city, city_valores = _choice( rng, CITY_SHARES, n_rows )
+    traffic, traffic_valores = _choice( rng, TRAFFIC_SHARES, n_rows )
+    weather, weather_valores = _choice( rng, WEATHER_SHARES, n_rows )
+    festival, festival_valores = _choice( rng, FESTIVAL_SHARES, n_rows )
+    order, order_valores = _choice( rng, ORDER_SHARES, n_rows )
+    vehicle, vehicle_valores = _choice( rng, VEHICLE_SHARES, n_rows )
+    multiple, multiple_valores = _choice( rng, MULTIPLE_SHARES, n_rows )
+
+    # Datas e horários
+    datas = pd.date_range( FIRST_DATE, LAST_DATE ).strftime( DATE_FORMAT ).to_numpy( dtype=object )
+    minutos = np.arange( 8 * 60, 24 * 60, 5 )
+    horarios = np.array( [ f'{m // 60:02d}:{m % 60:02d}:00' for m in minutos ], dtype=object )
+
+    horario = rng.integers( 0, len( horarios ) - 3, n_rows )
+    pedido = _with_nan( rng, horarios[horario], n_rows )
+    retirada = horarios[horario + rng.integers( 1, 4, n_rows )]
+
+    # Tempo de entrega: distância ( ~0.5 min/km ) + atrasos + ruído, entre 10 e 54 minutos
+    distancia = np.hypot( deslocamento_lat, deslocamento_lon * np.cos( np.radians( rest_lat ) ) ) * 111
+    multiplas = np.array( [ 1 if v == NAN_SENTINEL else int( v ) for v in multiple_valores ], dtype='float64' )[multiple]
+
+    tempo = ( 12 + 0.5 * distancia + 4 * multiplas
+              + np.array( [ TRAFFIC_DELAY[v] for v in traffic_valores ] )[traffic]
+              + np.array( [ WEATHER_DELAY[v] for v in weather_valores ] )[weather]
+              + np.array( [ FESTIVAL_DELAY[v] for v in festival_valores ] )[festival]
+              + np.array( [ CITY_DELAY[v] for v in city_valores ] )[city]
+              + rng.normal( 0, 4, n_rows ) )
+    tempo = np.clip( np.rint( tempo ), 10, 54 ).astype( 'int64' )
+    tempos = np.array( [ f'{TIME_PREFIX}{t}' for t in range( 55 ) ], dtype=object )
+
+    # Idade e avaliação ( textos, com 'NaN ' )
+    idades = np.array( [ str( idade ) for idade in range( 100 ) ], dtype=object )
+    avaliacoes = np.array( [ f'{nota / 10:.1f}' for nota in range( 61 ) ], dtype=object )
+    nota = np.clip( np.rint( rng.normal( 46, 3, n_rows ) ), 25, 50 ).astype( 'int64' )
+
+    ids = np.arange( start_id, start_id + n_rows )
+
+    df_raw = pd.DataFrame( {
+        'ID': pd.Series( ids ).map( '0x{:x} '.format ).to_numpy(),
+        'Delivery_person_ID': entregador,
+        'Delivery_person_Age': _with_nan( rng, idades[rng.integers( 20, 40, n_rows )], n_rows ),
+        'Delivery_person_Ratings': _with_nan( rng, avaliacoes[nota], n_rows ),
+        'Restaurant_latitude': rest_lat,
+        'Restaurant_longitude': rest_lon,
+        'Delivery_location_latitude': rest_lat + deslocamento_lat,
+        'Delivery_location_longitude': rest_lon + deslocamento_lon,
+        'Order_Date': datas[rng.integers( 0, len( datas ), n_rows )],
+        'Time_Orderd': pedido,
+        'Time_Order_picked': retirada,
+        'Weatherconditions': weather_valores[weather],
+        'Road_traffic_density': traffic_valores[traffic],
+        'Vehicle_condition': rng.choice( 4, n_rows, p=[ 0.33, 0.33, 0.33, 0.01 ] ),
+        'Type_of_order': order_valores[order],
+        'Type_of_vehicle': vehicle_valores[vehicle],
+        'multiple_deliveries': multiple_valores[multiple],
+        'Festival': festival_valores[festival],
+        'City': city_valores[city],
+        'Time_taken(min)': tempos[tempo],
+    } )
+
+    return df_raw.loc[:, RAW_COLUMNS]
+
+# ================================================================================
+
+def iter_chunks( n_rows, seed=42, chunksize=GENERATOR_CHUNKSIZE ):
+    """ Esta função gera o dataset sintético bloco a bloco.
+
+        Cada bloco usa um gerador derivado da semente e do número do bloco ( SeedSequence ),
+        então a mesma semente e o mesmo chunksize sempre produzem o mesmo arquivo.
+
+        Input: Quantidade total de linhas, semente, linhas por bloco
+        Output: Iterador de dataframes brutos
+    """
+    restaurants = restaurant_pool( seed )
+    n_blocos = ( n_rows + chunksize - 1 ) // chunksize
+    sementes = np.random.SeedSequence( seed ).spawn( n_blocos + 1 )[1:]
+
+    for bloco, semente in enumerate( sementes ):
+        inicio = bloco * chunksize
+        yield generate_chunk( min( chunksize, n_rows - inicio ), np.random.default_rng( semente ), restaurants, inicio )
+
+# ================================================================================
+
+def generate_raw( n_rows, seed=42, chunksize=GENERATOR_CHUNKSIZE ):
+    """ Esta função gera o dataset sintético inteiro em memória ( para benchmarks ).
+
+        Input: Quantidade de linhas, semente, linhas por bloco
+        Output: Dataframe bruto
+    """
+    return pd.concat( iter_chunks( n_rows, seed, chunksize ), ignore_index=True )
+
+# ================================================================================
+
+def write_synthetic_csv( path, n_rows, seed=42, chunksize=GENERATOR_CHUNKSIZE ):
+    """ Esta função grava o dataset sintético em CSV, bloco a bloco, sem manter o arquivo em memória.
+
+        As coordenadas são arredondadas em 6 casas decimais, como no dataset original. Os blocos
+        são gravados pelo escritor de CSV do pyarrow ( bem mais rápido que o DataFrame.to_csv ),
+        sem aspas, no mesmo formato do arquivo original.
+
+        Input: Caminho do arquivo, quantidade de linhas, semente, linhas por bloco
+        Output: Caminho do arquivo gravado
+    """
+    os.makedirs( os.path.dirname( path ) or '.', exist_ok=True )
+
+    # Grava em um arquivo temporário e troca de nome no final, para o dashboard nunca ler um arquivo pela metade
+    temporario = f'{path}.{os.getpid()}.tmp'
+    opcoes = pa_csv.WriteOptions( include_header=False, quoting_style='none' )
+    coordenadas = [ 'Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude' ]
+
+    with open( temporario, 'wb' ) as arquivo:
+        arquivo.write( ( ','.join( RAW_COLUMNS ) + '\n' ).encode( 'utf-8' ) )
+
+        for df_raw in iter_chunks( n_rows, seed, chunksize ):
+            df_raw[coordenadas] = df_raw[coordenadas].round( 6 )
+            pa_csv.write_csv( pa.Table.from_pandas( df_raw, preserve_index=False ), arquivo, opcoes )
+
+    os.replace( temporario, path )
+
+    return path
+
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser( description='Gera um train.csv sintético no formato do dataset original.' )
+    parser.add_argument( 'rows', type=int, help='Quantidade de linhas' )
+    parser.add_argument( '--output', default=DATASET_PATH )
+    parser.add_argument( '--seed', type=int, default=42 )
+    parser.add_argument( '--chunksize', type=int, default=GENERATOR_CHUNKSIZE )
+    parser.add_argument( '--force', action='store_true', help='Sobrescreve o arquivo de saída se ele existir' )
+    args = parser.parse_args()
+
+    if os.path.exists( args.output ) and not args.force:
+        parser.error( f'{args.output} já existe; use --force para sobrescrever' )
+
+    write_synthetic_csv( args.output, args.rows, args.seed, args.chunksize )
+    print( f'{args.rows:,} linhas gravadas em {args.output}' )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# Libraries
+import plotly.express as px
+
+# bibliotecas necessarias
+import pandas as pd
+
+from utils.cube import count_by
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def order_metric( df_cube ):
+    """ Esta função tem a responsabilidade de plotar um gráfico de barras
+    com a quantidade de pedidos realizados por dia.
+
+    1. Ele soma a quantidade de pedidos por dia, somando as células do cubo.
+    
+            
+    Input: Células do cubo já filtradas
+    Output: Gráfico de barras com a quantidade de pedidos feito por dia.
+        
+    """       
+# Seleção de células por agrupamento
+    df_aux = count_by( df_cube, ['Order_Date'] )
+
+# Desenhar o gráfico de linhas
+    fig = px.bar( df_aux, x='Order_Date', y='ID' )
+
+    return fig
+
+# ================================================================================
+
+def traffic_share( df_cube ):
+    """ Esta função calcula a porcentagem de pedidos por densidade de trânsito, somando as células do cubo.
+
+    Input: Células do cubo já filtradas
+    Output: Dataframe com Road_traffic_density, ID ( pedidos ) e entregas_perc.
+
+    """
+    df_aux = count_by( df_cube, ['Road_traffic_density'] )
+    df_aux['entregas_perc'] = df_aux['ID'] / df_aux['ID'].sum()
+
+    return df_aux
+
+# ================================================================================
+
+def traffic_order_share( df_cube ):
+    """ Esta função tem a responsabilidade de plotar um gráfico de pizza
+    onde tem a porcentagem de entregas realizados por cada densidade de trânsito.
+
+    1. Ele soma a porcentagem de pedidos por densidades de trânsito, somando as células do cubo ( traffic_share ).
+    
+            
+    Input: Células do cubo já filtradas
+    Output: Gráfico de pizza com a porcentagem de pedidos feito por densidades de trânsito.
+        
+    """
+    df_aux = traffic_share( df_cube )
+
+    fig = px.pie( df_aux, values='entregas_perc', names='Road_traffic_density')
+
+    return fig
+
+# ================================================================================
+
+def traffic_order_city( df_cube ):
+    """ Esta função tem a responsabilidade de plotar um gráfico de bolhas
+    onde tem a quantidade de pedidos realizados por Cidade e por Densidade de trânsito.
+
+    1. Ele conta a quantidade de pedidos por cidade e por densidade de trânsito, somando as células do cubo.
+    
+            
+    Input: Células do cubo já filtradas
+    Output: Gráfico de bolhas com a quantidade de pedidos feito por semana e densidade de trânsito.
+        
+    """
+    df_aux = count_by( df_cube, ['City', 'Road_traffic_density'] )
+
+    # Dimensões como texto: o plotly falha com categorias sem nenhuma linha ( filtros sem pedidos )
+    df_aux[['City', 'Road_traffic_density']] = df_aux[['City', 'Road_traffic_density']].astype( str )
+    
+    fig = px.scatter( df_aux, x='City', y='Road_traffic_density', size='ID', color='City')
+                    
+    return fig
+
+# ================================================================================
+
+def order_by_week(df_cube):
+    """ Esta função tem a responsabilidade de plotar um gráfico de linhas 
+    com a quantidade de pedidos realizados por semana.
+
+        1. Ele conta o total de pedidos por cada semana, somando as células do cubo.
+        
+    
+        Input: Células do cubo já filtradas
+        Output: Gráfico de linhas com a quantidade de pedidos feito pelos entregadores por semana.
+        
+    """
+
+    df_aux = count_by( df_cube, ['week_of_year'] )
+
+    fig = px.line(df_aux, x='week_of_year' , y='ID')
+            
+    return fig
+
+# ================================================================================
+
+def orders_per_deliver_by_week( df1 ):
+    """ Esta função calcula a quantidade de pedidos por entregador em cada semana.
+
+        1. Ele conta o número de pedidos por semanas.
+        2. Ele conta o número de entregadores únicos por semana.
+
+        Input: Dataframe
+        Output: Dataframe com week_of_year, ID ( pedidos ), Delivery_person_ID ( entregadores únicos )
+                e order_by_deliver.
+
+    """
+    if isinstance( df1, pd.DataFrame ):
+        df_aux01 = ( df1.loc[:, [ 'ID', 'week_of_year' ]]
+                            .groupby( 'week_of_year', observed=True )
+                            .count()
+                            .reset_index() )
+                
+        df_aux02 = ( df1.loc[:, [ 'Delivery_person_ID', 'week_of_year' ]]
+                            .groupby( 'week_of_year', observed=True )
+                            .nunique()
+                            .reset_index() )
+    else:
+        # Outros backends ( utils.duck.DuckDBRows, utils.lazy.LazyRows ) contam fora do pandas
+        df_aux01 = df1.count_by( [ 'week_of_year' ] )
+        df_aux02 = df1.nunique_by( [ 'week_of_year' ], 'Delivery_person_ID' )
+
+    df_aux = pd.merge( df_aux01, df_aux02, how='inner' )
+
+    df_aux[ 'order_by_deliver' ] = df_aux[ 'ID' ] / df_aux[ 'Delivery_person_ID' ]
+
+    return df_aux
+
+# ================================================================================
+
+def order_share_by_week( df1 ):
+    """ Esta função tem a responsabilidade de plotar um gráfico de linhas 
+    onde tem a quantidade de pedidos realizados pelos entregadores por semana ( orders_per_deliver_by_week ).
+
+        Input: Dataframe
+        Output: Gráfico de linhas com a quantidade de pedidos feito pelos entregadores por semana.
+        
+    """
+    df_aux = orders_per_deliver_by_week( df1 )
+
+    fig = px.line( df_aux, x='week_of_year', y='order_by_deliver' )
+            
+    return fig
+
+# ================================================================================
+
+def orders_per_deliver_by_week_approx( df_cube, df_sketch ):
+    """ Esta função calcula a quantidade de pedidos por entregador em cada semana sem as linhas.
+
+        1. Os pedidos por semana vêm do cubo.
+        2. Os entregadores únicos por semana são estimados pelos sketches HyperLogLog ( utils.sketch ).
+
+        Input: Células do cubo e sketches já filtrados
+        Output: Dataframe com as mesmas colunas de orders_per_deliver_by_week.
+
+    """
+    df_aux = pd.merge( count_by( df_cube, [ 'week_of_year' ] ), df_sketch.distinct_by( 'week_of_year' ), how='inner' )
+
+    df_aux[ 'order_by_deliver' ] = df_aux[ 'ID' ] / df_aux[ 'Delivery_person_ID' ]
+
+    return df_aux
+
+# ================================================================================
+
+def order_share_by_week_approx( df_cube, df_sketch ):
+    """ Esta função plota o mesmo gráfico de order_share_by_week com os entregadores únicos
+    estimados pelos sketches ( orders_per_deliver_by_week_approx ).
+
+        Input: Células do cubo e sketches já filtrados
+        Output: Gráfico de linhas com a quantidade aproximada de pedidos por entregador por semana.
+        
+    """
+    df_aux = orders_per_deliver_by_week_approx( df_cube, df_sketch )
+
+    fig = px.line( df_aux, x='week_of_year', y='order_by_deliver' )
+            
+    return fig
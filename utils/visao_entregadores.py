@@ -0,0 +1,50 @@
+# bibliotecas necessarias
+from utils.cube import moments_by
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def overall_metrics( df1 ):
+    """ Esta função calcula as métricas gerais dos entregadores: maior e menor idade,
+        melhor e pior condição dos veículos.
+        Input: Dataframe
+        Output: Dicionário com maior_idade, menor_idade, melhor_condicao e pior_condicao.
+
+    """
+    idades = df1.loc[:, 'Delivery_person_Age']
+    condicoes = df1.loc[:, 'Vehicle_condition']
+
+    return { 'maior_idade': idades.max(), 'menor_idade': idades.min(),
+             'melhor_condicao': condicoes.max(), 'pior_condicao': condicoes.min() }
+
+# ================================================================================
+
+def ratings_per_deliver( df1 ):
+    """ Esta função calcula a avaliação média de cada entregador.
+        Input: Dataframe
+        Output: Dataframe com a avaliação média por entregador.
+
+    """
+    df_aux = ( df1.loc[:, ['Delivery_person_ID', 'Delivery_person_Ratings']]
+                  .groupby('Delivery_person_ID', observed=True)
+                  .mean()
+                  .reset_index() )
+
+    return df_aux
+
+# ================================================================================
+
+def ratings_by( df_cube, dimension ):
+    """ Esta função calcula a média e o desvio padrão das avaliações por uma dimensão
+        ( Road_traffic_density ou Weatherconditions ).
+        Input: Células do cubo já filtradas, nome da dimensão
+        Output: Dataframe com a dimensão e as colunas Delivery_mean e Delivery_std.
+
+    """
+    df_aux = moments_by( df_cube, [dimension], 'Delivery_person_Ratings' )
+
+    # Mudança de nome das colunas
+    df_aux.columns = [dimension, 'Delivery_mean', 'Delivery_std']
+
+    return df_aux
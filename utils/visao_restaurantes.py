@@ -0,0 +1,213 @@
+# Libraries
+import plotly.express as px
+import plotly.graph_objects as go
+
+# bibliotecas necessarias
+import numpy as np
+
+from utils.cube import count_by, moments_by
+from utils.nearest import load_restaurant_tree
+from utils.quantiles import PERCENTILES, percentile_name
+
+# ===============================================================
+# Funções
+# ===============================================================
+
+def single_couriers( df1 ):
+    """ Esta função conta os entregadores únicos.
+        Input: Dataframe
+        Output: Quantidade de entregadores distintos
+    """
+    return df1['Delivery_person_ID'].nunique()
+
+# ================================================================================
+
+def single_couriers_approx( df_sketch ):
+    """ Esta função estima os entregadores únicos pelos sketches HyperLogLog ( utils.sketch ).
+        Input: Sketches já filtrados
+        Output: Quantidade aproximada de entregadores distintos
+    """
+    return int( round( df_sketch.distinct() ) )
+
+# ================================================================================
+
+def avg_std_time_on_traffic( df_cube ):
+    """ Esta função calcula o tempo médio e o desvio padrão do tempo por cidade e densidade de trânsito.
+        Input: Células do cubo já filtradas
+        Output: Gráfico de sunburst com o tempo médio e o desvio padrão da Cidade e densidade de trânsito.
+
+    """
+
+    df1_aux = moments_by( df_cube, ['City','Road_traffic_density'], 'Time_taken(min)' )
+                    
+    df1_aux.columns = ['City', 'Road_traffic_density', 'mean_time_by_city_density', 'std_time_by_city_density']
+
+    # Dimensões como texto: o plotly falha com categorias sem nenhuma linha ( filtros sem pedidos )
+    df1_aux[['City', 'Road_traffic_density']] = df1_aux[['City', 'Road_traffic_density']].astype( str )
+
+    fig= px.sunburst( df1_aux, path=['City', 'Road_traffic_density'], values='mean_time_by_city_density',
+                                    color='std_time_by_city_density',color_continuous_scale='RdBu',
+                                    color_continuous_midpoint=np.average(df1_aux['std_time_by_city_density']))
+    return fig
+
+# ================================================================================
+
+def avg_std_time_graph( df_cube ):
+    """ Esta função calcula o tempo médio e o desvio padrão do tempo por cidade.
+        Input: Células do cubo já filtradas
+        Output: Gráfico de barras com o tempo médio e o desvio padrão.
+
+    """
+
+    df1_aux = moments_by( df_cube, ['City'], 'Time_taken(min)' )
+    df1_aux.columns = ['City', 'mean_time_by_City', 'std_time_by_city']
+                        
+    fig = go.Figure()
+    fig.add_trace( go.Bar( name='Control',x=df1_aux['City'], y=df1_aux['mean_time_by_City'],
+                                            error_y=dict(type='data', array=df1_aux['std_time_by_city'] ) ) )
+    fig.update_layout(barmode='group')
+
+    return fig
+
+# ================================================================================
+
+def time_by_city_order( df_cube ):
+    """ Esta função calcula o tempo médio e o desvio padrão do tempo por cidade e tipo de pedido.
+        Input: Células do cubo já filtradas
+        Output: Dataframe com a média e o desvio padrão por Cidade e tipo de pedido.
+
+    """
+    df1_aux = moments_by( df_cube, ['City','Type_of_order'], 'Time_taken(min)' )
+
+    df1_aux.columns = ['City', 'Type_of_order', 'mean_time_by_city_order', 'std_time_by_city_order']
+
+    return df1_aux
+
+# ================================================================================
+
+def avg_std_time_by(df_cube, dimension='Festival'):
+    """ Esta função calcula, de uma só vez, o tempo médio, o desvio padrão e a quantidade
+        de entregas para cada valor de uma dimensão ( por padrão, Festival ).
+            Parâmetros:
+                input:
+                    - df_cube: Células do cubo já filtradas.
+
+                    - dimension: Dimensão usada na comparação.
+                        'Festival': Yes / No
+                        'Weatherconditions': condições climáticas
+                        'Road_traffic_density': densidades de trânsito
+
+                output:
+                    - Dataframe indexado pelos valores da dimensão, com as colunas
+                      avg_time, std_time e count.
+    """
+    df1_aux = moments_by( df_cube, [dimension], 'Time_taken(min)' )
+           
+    df1_aux.columns = [dimension, 'avg_time' , 'std_time']
+    df1_aux = df1_aux.merge( count_by( df_cube, [dimension] ).rename( columns={ 'ID': 'count' } ), on=dimension )
+
+    return df1_aux.set_index( dimension ).round(2)
+
+# ================================================================================
+
+def stat_value(df_stats, value, op):
+    """ Esta função seleciona um valor da tabela de avg_std_time_by para exibir em um metric.
+            Parâmetros:
+                input:
+                    - df_stats: Tabela gerada por avg_std_time_by.
+
+                    - value: Valor da dimensão ( ex.: 'Yes' ou 'No' para Festival ).
+
+                    - op: Coluna que precisa ser exibida.
+                        'avg_time': Tempo médio.
+                        'std_time': Desvio padrão do tempo.
+                        'count': Quantidade de entregas.
+
+                output:
+                    - Valor da célula, ou '-' se o valor não aparece nos dados filtrados.
+    """
+    if value not in df_stats.index:
+        return '-'
+
+    return df_stats.loc[value, op]
+
+# ================================================================================
+
+def distance_mean(df_cube, fig):
+    """ 1 part:
+            Esta função calcula a média de distância dos restaurantes e locais de entregas.
+            Input: Células do cubo já filtradas
+            Output: Valor com a média de distância
+        
+        2 part:
+            Esta função calcula a porcentagem média de distância dos restaurantes e locais de entregas por cidade
+            Input: Células do cubo já filtradas
+            Output: gráfico de pizza com a média da coluna distacia por cidade.
+
+
+    """
+    # A distância ( km ) já vem calculada na carga do dataset e somada nas células do cubo
+    if fig == False:
+
+        avg_distance = moments_by( df_cube, [], 'distance' ).loc[0, 'mean'].round(2)
+
+        return avg_distance
+    
+    else:
+        
+        avg_distance = moments_by( df_cube, ['City'], 'distance' ).rename( columns={ 'mean': 'distance' } )
+
+        fig = go.Figure(data=[go.Pie( labels=avg_distance['City'], values=avg_distance['distance'], pull=[0, 0.1, 0])])
+            
+        return fig
+
+# ================================================================================
+
+def time_percentiles( df_quantiles ):
+    """ Esta função calcula a mediana, o p90 e o p99 do tempo de entrega pelos sketches de quantis.
+        Input: Sketches de quantis já filtrados ( utils.quantiles )
+        Output: Dicionário p50, p90 e p99 ( minutos ), ou '-' sem entregas nos filtros
+    """
+    df1_aux = df_quantiles.quantiles_by( 'Time_taken(min)', [] )
+
+    if len( df1_aux ) == 0:
+        return { percentile_name( q ): '-' for q in PERCENTILES }
+
+    return df1_aux.iloc[0].round( 2 ).to_dict()
+
+# ================================================================================
+
+def time_percentiles_graph( df_quantiles, dimension='City' ):
+    """ Esta função plota a mediana, o p90 e o p99 do tempo de entrega por valor de uma dimensão.
+        Input: Sketches de quantis já filtrados, dimensão ( City ou Road_traffic_density )
+        Output: Gráfico de barras agrupadas com um percentil por cor.
+    """
+    df1_aux = df_quantiles.quantiles_by( 'Time_taken(min)', [dimension] )
+    df1_aux = df1_aux.melt( id_vars=dimension, var_name='percentil', value_name='Time_taken(min)' )
+
+    fig = px.bar( df1_aux, x=dimension, y='Time_taken(min)', color='percentil', barmode='group' )
+
+    return fig
+
+# ================================================================================
+
+def restaurant_coverage_graph( df1, tree=None ):
+    """ Esta função tem a responsabilidade de plotar a curva de cobertura dos restaurantes.
+
+        1. Para cada entrega, busca o restaurante mais próximo na árvore dos restaurantes ( KD-tree ).
+        2. Calcula a fração das entregas com algum restaurante a até r km e a fração das entregas
+           em que o entregador percorreu até r km.
+
+        Input: Dataframe, árvore dos restaurantes ( None = load_restaurant_tree() )
+        Output: Gráfico de linhas com a cobertura por raio.
+    """
+    if tree is None:
+        tree = load_restaurant_tree()
+
+    df_aux = tree.coverage_curve( df1 )
+    df_aux = df_aux.melt( id_vars='radius_km', var_name='curva', value_name='entregas_perc' )
+
+    fig = px.line( df_aux, x='radius_km', y='entregas_perc', color='curva', markers=True )
+    fig.update_layout( yaxis_tickformat='.0%' )
+
+    return fig